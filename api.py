@@ -0,0 +1,323 @@
+"""Read-only HTTP API over the latest scraped materials.
+
+    uvicorn api:app --port 8000
+
+The source is data/materials.json by default; point MATERIALS_SOURCE at a
+.json file or at the SQLite database written by `--output sqlite` to serve
+something else. Items are loaded once into MaterialIndex, which keeps:
+
+- item ids per supplier, category and brand (case-insensitive)
+- item ids sorted by price, with a parallel price array for bisect
+
+so /items answers filters by intersecting the smallest matching id lists
+and slicing the price array, never by walking every item. The source file's
+mtime and size are checked at most every MATERIALS_RELOAD_S seconds; when a
+new snapshot lands the index is rebuilt and swapped in, and a snapshot that
+fails to parse (say, one caught mid-write) leaves the previous index serving.
+
+/search ranks items by name, brand and category with search.SearchIndex. The
+loader keeps one search index across reloads and syncs each new snapshot into
+it, so only products whose text changed are re-indexed.
+
+Responses carry an ETag derived from the snapshot and the query, and
+If-None-Match is answered with 304.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from bisect import bisect_left, bisect_right
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple
+
+from fastapi import FastAPI, HTTPException, Query, Request, Response
+from fastapi.responses import JSONResponse
+
+from search import SearchIndex
+from storage import iter_sqlite_items
+
+log = logging.getLogger(__name__)
+
+DEFAULT_SOURCE = Path(__file__).parent.resolve() / "data" / "materials.json"
+SORTS = ("price", "-price", "name", "-name")
+MAX_LIMIT = 500
+
+
+def load_items(source: Path) -> List[Dict[str, Any]]:
+    if source.suffix == ".db":
+        return list(iter_sqlite_items(source))
+    return json.loads(source.read_text(encoding="utf-8"))["items"]
+
+
+def _norm(value: Optional[str]) -> str:
+    return (value or "").strip().casefold()
+
+
+class MaterialIndex:
+    """Immutable lookup structures over one snapshot of items."""
+
+    def __init__(self, items: List[Dict[str, Any]], version: str):
+        self.items = items
+        self.version = version
+        self.by_supplier: Dict[str, List[int]] = {}
+        self.by_category: Dict[str, List[int]] = {}
+        self.by_brand: Dict[str, List[int]] = {}
+        priced: List[Tuple[float, int]] = []
+        self.unpriced: List[int] = []
+        for i, item in enumerate(items):
+            self.by_supplier.setdefault(_norm(item.get("supplier")), []).append(i)
+            self.by_category.setdefault(_norm(item.get("category")), []).append(i)
+            self.by_brand.setdefault(_norm(item.get("brand")), []).append(i)
+            if isinstance(item.get("price"), (int, float)):
+                priced.append((float(item["price"]), i))
+            else:
+                self.unpriced.append(i)
+        # Membership sets for probing while walking a shorter list
+        self._sets: Dict[int, Set[int]] = {
+            id(ids): set(ids)
+            for index in (self.by_supplier, self.by_category, self.by_brand)
+            for ids in index.values()
+        }
+        priced.sort()
+        self.prices = [p for p, _ in priced]
+        self.price_order = [i for _, i in priced]
+        self._name_order: Optional[List[int]] = None
+        self._lock = threading.Lock()
+
+    @property
+    def name_order(self) -> List[int]:
+        # Built on first use; most clients sort by price or not at all
+        with self._lock:
+            if self._name_order is None:
+                self._name_order = sorted(range(len(self.items)), key=lambda i: _norm(self.items[i].get("name")))
+            return self._name_order
+
+    def _set(self, ids: List[int]) -> Set[int]:
+        found = self._sets.get(id(ids))
+        return found if found is not None else set(ids)
+
+    def _price_slice(self, min_price: Optional[float], max_price: Optional[float]) -> List[int]:
+        lo = 0 if min_price is None else bisect_left(self.prices, min_price)
+        hi = len(self.prices) if max_price is None else bisect_right(self.prices, max_price)
+        return self.price_order[lo:hi]
+
+    def query(
+        self,
+        supplier: Optional[str] = None,
+        category: Optional[str] = None,
+        brand: Optional[str] = None,
+        min_price: Optional[float] = None,
+        max_price: Optional[float] = None,
+        sort: Optional[str] = None,
+        offset: int = 0,
+        limit: int = 50,
+    ) -> Tuple[int, List[Dict[str, Any]]]:
+        """(total matches, one page of {"id", **item}); ids are snapshot positions."""
+        lists = [
+            index.get(_norm(value), [])
+            for index, value in ((self.by_supplier, supplier), (self.by_category, category), (self.by_brand, brand))
+            if value is not None
+        ]
+        price_ids: Optional[List[int]] = None
+        if min_price is not None or max_price is not None:
+            price_ids = self._price_slice(min_price, max_price)
+            lo = float("-inf") if min_price is None else min_price
+            hi = float("inf") if max_price is None else max_price
+
+        # Equality filters are intersected as sets, smallest first. The price
+        # range is either walked (when its slice is the smaller side, keeping
+        # price order) or checked by value on the intersection.
+        lists.sort(key=len)
+        by_price = price_ids is not None and (not lists or len(price_ids) < len(lists[0]))
+        matched: Optional[Set[int]] = None
+        if len(lists) > 1:
+            matched = self._set(lists[0]).intersection(*(self._set(other) for other in lists[1:]))
+        if by_price:
+            if lists:
+                probe = matched if matched is not None else self._set(lists[0])
+                ids = [i for i in price_ids if i in probe]
+            else:
+                ids = price_ids
+        elif lists:
+            ids = sorted(matched) if matched is not None else list(lists[0])
+            if price_ids is not None:
+                prices = [self.items[i]["price"] for i in ids]
+                ids = [i for i, p in zip(ids, prices) if isinstance(p, (int, float)) and lo <= p <= hi]
+        else:
+            ids = range(len(self.items))  # every item, without building the list
+        filtered = bool(lists) or price_ids is not None
+
+        if sort in ("price", "-price"):
+            if not filtered:
+                priced, unpriced = self.price_order, self.unpriced
+            elif by_price:
+                priced, unpriced = ids, []
+            else:
+                priced = sorted((i for i in ids if self.items[i].get("price") is not None),
+                                key=lambda i: self.items[i]["price"])
+                unpriced = [i for i in ids if self.items[i].get("price") is None]
+            # Unpriced items stay last in both directions
+            parts = [(priced, sort == "-price"), (unpriced, False)]
+        elif sort in ("name", "-name"):
+            named = self.name_order if not filtered else sorted(ids, key=lambda i: _norm(self.items[i].get("name")))
+            parts = [(named, sort == "-name")]
+        else:
+            parts = [(sorted(ids) if by_price else ids, False)]
+
+        total = sum(len(part) for part, _ in parts)
+        return total, [{"id": i, **self.items[i]} for i in _page(parts, offset, limit)]
+
+
+def _page(parts: List[Tuple[Sequence[int], bool]], offset: int, limit: int) -> List[int]:
+    """Ids offset..offset+limit of `parts` laid end to end, each one reversed if flagged.
+
+    Only the page itself is copied, so an unfiltered query over the whole
+    snapshot costs no more than a filtered one.
+    """
+    page: List[int] = []
+    for ids, reverse in parts:
+        n = len(ids)
+        if offset >= n:
+            offset -= n
+            continue
+        take = min(limit - len(page), n - offset)
+        page.extend(reversed(ids[n - offset - take:n - offset]) if reverse else ids[offset:offset + take])
+        offset = 0
+        if len(page) >= limit:
+            break
+    return page
+
+
+class SnapshotLoader:
+    """Serves the current MaterialIndex and swaps in new snapshots as they land."""
+
+    def __init__(self, source: Path, reload_interval_s: float = 2.0):
+        self.source = Path(source)
+        self.reload_interval_s = reload_interval_s
+        self._lock = threading.Lock()
+        self._index = MaterialIndex([], "empty")
+        self._signature: Optional[Tuple[int, int]] = None
+        self._checked = 0.0
+        self.reloads = 0
+        self.search = SearchIndex()
+
+    def _stat(self) -> Optional[Tuple[int, int]]:
+        try:
+            paths = [self.source]
+            wal = self.source.with_name(self.source.name + "-wal")
+            if self.source.suffix == ".db" and wal.exists():
+                paths.append(wal)  # committed writes land in the WAL first
+            stats = [p.stat() for p in paths]
+        except OSError:
+            return None
+        return max(s.st_mtime_ns for s in stats), sum(s.st_size for s in stats)
+
+    def current(self) -> MaterialIndex:
+        now = time.monotonic()
+        if now - self._checked < self.reload_interval_s:
+            return self._index
+        with self._lock:
+            if now - self._checked < self.reload_interval_s:
+                return self._index
+            self._checked = now
+            signature = self._stat()
+            if signature is not None and signature != self._signature:
+                try:
+                    items = load_items(self.source)
+                except Exception as e:
+                    log.warning("Could not load %s, keeping the previous snapshot: %s", self.source, e)
+                else:
+                    version = hashlib.sha1(repr(signature).encode()).hexdigest()[:16]
+                    changes = self.search.sync(items)
+                    if self.reloads:
+                        log.info("Search index synced: %s", changes)
+                    self._index = MaterialIndex(items, version)
+                    self._signature = signature
+                    self.reloads += 1
+            return self._index
+
+
+def _etag(index: MaterialIndex, request: Request) -> str:
+    query = "&".join(sorted(f"{k}={v}" for k, v in request.query_params.multi_items()))
+    digest = hashlib.sha1(f"{request.url.path}?{query}".encode()).hexdigest()[:16]
+    return f'W/"{index.version}-{digest}"'
+
+
+def _not_modified(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match", "")
+    return etag in [tag.strip() for tag in header.split(",")] or header.strip() == "*"
+
+
+def create_app(source: Path = DEFAULT_SOURCE, reload_interval_s: float = 2.0) -> FastAPI:
+    loader = SnapshotLoader(source, reload_interval_s)
+    app = FastAPI(title="Material Scraper API")
+    app.state.loader = loader
+
+    def respond(request: Request, build) -> Response:
+        index = loader.current()
+        etag = _etag(index, request)
+        if _not_modified(request, etag):
+            return Response(status_code=304, headers={"ETag": etag})
+        # Items are plain JSON already; skip FastAPI's per-field encoding
+        return JSONResponse(build(index), headers={"ETag": etag})
+
+    @app.get("/health")
+    def health() -> Dict[str, Any]:
+        index = loader.current()
+        return {"items": len(index.items), "version": index.version, "reloads": loader.reloads}
+
+    @app.get("/items")
+    def list_items(
+        request: Request,
+        supplier: Optional[str] = None,
+        category: Optional[str] = None,
+        brand: Optional[str] = None,
+        min_price: Optional[float] = Query(None, ge=0),
+        max_price: Optional[float] = Query(None, ge=0),
+        sort: Optional[str] = Query(None, description="price, -price, name or -name"),
+        offset: int = Query(0, ge=0),
+        limit: int = Query(50, ge=1, le=MAX_LIMIT),
+    ):
+        if sort is not None and sort not in SORTS:
+            raise HTTPException(status_code=422, detail=f"sort must be one of {', '.join(SORTS)}")
+
+        def build(index: MaterialIndex) -> Dict[str, Any]:
+            total, page = index.query(supplier, category, brand, min_price, max_price, sort, offset, limit)
+            return {"total": total, "offset": offset, "limit": limit, "items": page}
+
+        return respond(request, build)
+
+    @app.get("/search")
+    def search_items(
+        request: Request,
+        q: str = Query(..., min_length=1),
+        offset: int = Query(0, ge=0),
+        limit: int = Query(20, ge=1, le=MAX_LIMIT),
+    ):
+        def build(index: MaterialIndex) -> Dict[str, Any]:
+            total, hits = loader.search.search(q, limit=limit, offset=offset)
+            items = [{"score": round(score, 4), **item} for score, item in hits]
+            return {"total": total, "offset": offset, "limit": limit, "items": items}
+
+        return respond(request, build)
+
+    @app.get("/items/{item_id}")
+    def get_item(item_id: int, request: Request):
+        def build(index: MaterialIndex) -> Dict[str, Any]:
+            if not 0 <= item_id < len(index.items):
+                raise HTTPException(status_code=404, detail="Item not found")
+            return {"id": item_id, **index.items[item_id]}
+
+        return respond(request, build)
+
+    return app
+
+
+app = create_app(
+    Path(os.environ.get("MATERIALS_SOURCE", str(DEFAULT_SOURCE))),
+    float(os.environ.get("MATERIALS_RELOAD_S", "2")),
+)
@@ -0,0 +1,206 @@
+"""Crawl the local fixture site end to end and record throughput.
+
+    python benchmarks/bench_crawl.py --cards 48 --pages 10 --latency-ms 50
+    python benchmarks/bench_crawl.py --engine async --concurrency 3 --fetch hybrid
+
+Runs scrape_all (or scrape_all_async) against benchmarks/fixture_site.py with
+the shipped extraction plans and reports cards/s, pages/s, peak RSS (of
+Python, and summed over the browser's process tree) and the time spent per
+crawl phase, wait kind and fetch tier. Each run is saved as
+JSON under benchmarks/results/ and compared with the latest earlier run that
+used the same parameters.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import threading
+import time
+from dataclasses import replace
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from fixture_site import FixtureSite, SiteSpec, expected_items, fixture_config  # noqa: E402
+from scraper import CrawlSession, scrape_all  # noqa: E402
+
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+# Compared run over run; a higher value is better for the first two
+COMPARED = (("cards_per_s", 1), ("pages_per_s", 1), ("wall_s", -1), ("python_peak_rss_mb", -1))
+
+
+def python_peak_rss_mb() -> Optional[float]:
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    # ru_maxrss is in KiB on Linux
+    return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+
+
+def descendants_rss_kb(root: int) -> Optional[int]:
+    """Summed RSS of every live descendant of `root`, read from /proc; None elsewhere."""
+    proc = Path("/proc")
+    if not (proc / "self" / "statm").exists():
+        return None
+    children: Dict[int, List[int]] = {}
+    for stat in proc.glob("[0-9]*/stat"):
+        try:
+            # The command name is in parentheses and may contain spaces
+            fields = stat.read_text().rsplit(")", 1)[1].split()
+        except (OSError, IndexError):
+            continue  # exited while we were reading
+        children.setdefault(int(fields[1]), []).append(int(stat.parent.name))
+    page_kb = os.sysconf("SC_PAGE_SIZE") // 1024
+    total, todo = 0, list(children.get(root, []))
+    while todo:
+        pid = todo.pop()
+        todo.extend(children.get(pid, []))
+        try:
+            total += int((proc / str(pid) / "statm").read_text().split()[1]) * page_kb
+        except (OSError, IndexError):
+            continue
+    return total
+
+
+class TreeRssSampler:
+    """Peak of the summed RSS of the browser's process tree, sampled while the crawl runs.
+
+    Chromium runs as a browser process plus GPU, network and one renderer
+    per tab, under the Playwright driver. Only their sum is its footprint,
+    and it has to be read while they are alive.
+    """
+
+    def __init__(self, interval_s: float = 0.1):
+        self.interval_s = interval_s
+        self.peak_kb: Optional[int] = None
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while True:
+            kb = descendants_rss_kb(os.getpid())
+            if kb is None:
+                return
+            self.peak_kb = max(self.peak_kb or 0, kb)
+            if self._stop.wait(self.interval_s):
+                return
+
+    def __enter__(self) -> "TreeRssSampler":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+    @property
+    def peak_mb(self) -> Optional[float]:
+        return round(self.peak_kb / 1024, 1) if self.peak_kb is not None else None
+
+
+def phases(session: CrawlSession) -> Dict[str, Any]:
+    waits = {
+        kind: {"count": int(w["count"]), "seconds": round(w["seconds"], 3),
+               "mean_ms": round(1000 * w["seconds"] / w["count"], 1) if w["count"] else 0.0}
+        for kind, w in session.waits.summary().items()
+    }
+    return {"waits": waits, "tiers": list(session.tiers.rows), "spans": session.profile.to_dict()["phases"]}
+
+
+def run(args) -> Dict[str, Any]:
+    spec = SiteSpec(cards=args.cards, pages=args.pages, latency_ms=args.latency_ms)
+    with FixtureSite(spec) as site:
+        cfg = replace(
+            fixture_config(site, keep_rate_limits=args.rate_limits),
+            fetch=args.fetch,
+            concurrency=args.concurrency,
+            headless=True,
+        )
+        session = CrawlSession.for_config(cfg)
+        target = expected_items(spec)
+        started = time.perf_counter()
+        with TreeRssSampler() as tree:
+            if args.engine == "async":
+                from scraper_async import scrape_all_async
+                items = asyncio.run(scrape_all_async(cfg, target, session=session))
+            else:
+                items = scrape_all(cfg, target, session=session)
+        wall = time.perf_counter() - started
+        pages = sum(site.pages.values())
+        return {
+            "started_at": int(time.time()),
+            "params": {
+                "engine": args.engine, "fetch": args.fetch, "concurrency": args.concurrency,
+                "cards": args.cards, "pages": args.pages, "latency_ms": args.latency_ms,
+                "rate_limits": args.rate_limits,
+            },
+            "items": len(items),
+            "expected_items": target,
+            "pages": pages,
+            "pages_by_supplier": dict(site.pages),
+            "requests": site.requests,
+            "wall_s": round(wall, 3),
+            "cards_per_s": round(len(items) / wall, 1),
+            "pages_per_s": round(pages / wall, 2),
+            "python_peak_rss_mb": python_peak_rss_mb(),
+            "browser_peak_rss_mb": tree.peak_mb,
+            "phases": phases(session),
+        }
+
+
+def previous_result(params: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    for path in sorted(RESULTS_DIR.glob("crawl-*.json"), reverse=True):
+        result = json.loads(path.read_text(encoding="utf-8"))
+        if result.get("params") == params:
+            return result
+    return None
+
+
+def print_result(result: Dict[str, Any], previous: Optional[Dict[str, Any]]):
+    print(f"items: {result['items']}/{result['expected_items']} over {result['pages']} pages "
+          f"in {result['wall_s']:.2f}s")
+    for key, better in COMPARED:
+        value = result[key]
+        line = f"  {key:>20}: {value}"
+        if previous and previous.get(key) and value is not None:
+            change = (value - previous[key]) / previous[key] * 100
+            worse = change * better < -5
+            line += f"  ({change:+.1f}% vs {previous[key]}{', REGRESSION' if worse else ''})"
+        print(line)
+    print(f"  {'browser_peak_rss_mb':>20}: {result['browser_peak_rss_mb']}")
+    for kind, w in sorted(result["phases"]["waits"].items()):
+        print(f"  wait {kind:>15}: {w['count']:>5} x {w['mean_ms']:>7.1f} ms = {w['seconds']:.2f}s")
+    for phase, h in sorted(result["phases"]["spans"].items()):
+        print(f"  span {phase:>15}: {h['count']:>5} x {h['mean_ms']:>7.1f} ms, p95 {h['p95_ms']:g} ms")
+    for row in result["phases"]["tiers"]:
+        print(f"  tier {row['supplier']:>15}: {row['tier']} {row['seconds']:.2f}s {'ok' if row['ok'] else row['reason']}")
+
+
+def main():
+    ap = argparse.ArgumentParser(description="End-to-end crawl benchmark on a local fixture site")
+    ap.add_argument("--cards", type=int, default=24, help="Cards per listing page or scroll batch")
+    ap.add_argument("--pages", type=int, default=5, help="Listing pages (or scroll batches) per supplier")
+    ap.add_argument("--latency-ms", type=int, default=0, help="Delay added to every response")
+    ap.add_argument("--engine", choices=["sync", "async"], default="sync")
+    ap.add_argument("--fetch", choices=["browser", "hybrid"], default="browser")
+    ap.add_argument("--concurrency", type=int, default=1, help="Browser contexts crawling at once")
+    ap.add_argument("--rate-limits", action="store_true", help="Keep the shipped per-host rate limits")
+    ap.add_argument("--out", type=str, default=None, help="Result file (default benchmarks/results/crawl-<time>.json)")
+    args = ap.parse_args()
+
+    result = run(args)
+    previous = previous_result(result["params"])
+    print_result(result, previous)
+    out = Path(args.out) if args.out else RESULTS_DIR / time.strftime("crawl-%Y%m%d-%H%M%S.json")
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(result, indent=2), encoding="utf-8")
+    print(f"saved {out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""Compare per-card locator extraction with the single-round-trip bulk path.
+
+Renders a local fixture page of Castorama-shaped product tiles and reports
+cards/second for both modes:
+
+    python benchmarks/bench_extraction.py --cards 60 --rounds 3
+"""
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+from playwright.sync_api import sync_playwright
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from scraper import CONFIG_PATH, extract_cards_bulk, extract_from_card, load_config  # noqa: E402
+
+CARD = "[data-test-id='product-tile']"
+SUPPLIER = "Castorama"
+BASE_URL = "https://www.castorama.fr"
+PLAN = next(s.plan for s in load_config(CONFIG_PATH).suppliers if s.supplier == SUPPLIER)
+
+
+def fixture_html(n_cards: int) -> str:
+    tiles = "\n".join(
+        f"""
+        <div data-test-id="product-tile">
+          <a href="/p/product-{i}" title="Product {i}">
+            <img src="https://media.castorama.fr/is/image/{i}.jpg" alt="Product {i}">
+          </a>
+          <h3 data-test-id="product-title">Carrelage sol {i} 30x30cm</h3>
+          <span data-test-id="brand">GoodHome</span>
+          <div data-test-id="price">{10 + i % 50},90 €</div>
+          <span class="unit">m²</span>
+        </div>"""
+        for i in range(n_cards)
+    )
+    return f"<!DOCTYPE html><html><body>{tiles}</body></html>"
+
+
+def bench_locator(page) -> int:
+    cards = page.locator(CARD)
+    n = cards.count()
+    for i in range(n):
+        extract_from_card(cards.nth(i), "Bench", SUPPLIER, BASE_URL, plan=PLAN)
+    return n
+
+
+def bench_bulk(page) -> int:
+    return len(extract_cards_bulk(page.locator(CARD), "Bench", SUPPLIER, BASE_URL, plan=PLAN))
+
+
+def run(n_cards: int, rounds: int):
+    with sync_playwright() as p:
+        browser = p.chromium.launch()
+        page = browser.new_page()
+        page.set_content(fixture_html(n_cards))
+
+        results = {}
+        for label, fn in (("locator", bench_locator), ("bulk", bench_bulk)):
+            total_cards = 0
+            started = time.perf_counter()
+            for _ in range(rounds):
+                total_cards += fn(page)
+            elapsed = time.perf_counter() - started
+            results[label] = total_cards / elapsed if elapsed else float("inf")
+            print(f"{label:>8}: {total_cards} cards in {elapsed:.2f}s -> {results[label]:.1f} cards/s")
+
+        browser.close()
+
+    if results["locator"]:
+        print(f"speedup: {results['bulk'] / results['locator']:.1f}x")
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Card extraction benchmark")
+    ap.add_argument("--cards", type=int, default=60, help="Cards on the fixture page")
+    ap.add_argument("--rounds", type=int, default=3, help="Extraction passes per mode")
+    args = ap.parse_args()
+    run(args.cards, args.rounds)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""Build the product search index over synthetic French listings and time queries.
+
+    python benchmarks/bench_search.py --items 1000000 --queries 500
+
+Reports index build time, incremental re-sync time (1% of products renamed)
+and query latency percentiles for a mix of exact, prefix, typo and
+dimension queries.
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from search import SearchIndex  # noqa: E402
+
+PRODUCTS = [
+    "Abri de jardin", "Carrelage sol", "Carrelage mural", "Peinture murale", "Perceuse visseuse",
+    "Parquet stratifié", "Plan de travail", "Lame de terrasse", "Panneau isolant", "Robinet mitigeur",
+    "Meuble vasque", "Porte d'entrée", "Fenêtre PVC", "Laine de verre", "Plaque de plâtre",
+    "Scie circulaire", "Échelle télescopique", "Radiateur électrique", "Spot LED encastrable", "Câble électrique",
+]
+MATERIALS = ["résine", "bois", "acier", "grès cérame", "chêne", "aluminium", "béton", "faïence", "pin", "inox"]
+COLOURS = ["blanc", "gris", "noir", "vert kaki", "beige", "anthracite", "naturel", "taupe", "bleu", "rouge"]
+BRANDS = ["Keter", "GoodHome", "Artens", "Dexter", "Bosch", "Makita", "Luxens", "Isover", "Sensea", "Geom"]
+CATEGORIES = ["Jardin", "Carrelage", "Peinture", "Outillage", "Isolation", "Plomberie", "Électricité", "Menuiserie"]
+DIMENSIONS = ["30x30cm", "60 x 60 cm", "4,63 m²", "120x60 cm", "2,5 mm", "10 L", "18V", "1200W", "2,4 m", "45x90 mm"]
+QUERIES = [
+    "abri resine", "carrelage 60x60", "4,63 m²", "perceuse bosch 18v", "parquet chene", "peinture blanc 10l",
+    "carrel", "laine de ver", "radiatuer electrique", "scie circ", "plaque platre", "gres cerame gris",
+    "robinet", "keter", "meuble vasque 120x60", "echelle",
+]
+
+
+def synthetic_items(n: int, seed: int = 11):
+    rng = random.Random(seed)
+    items = []
+    for i in range(n):
+        brand = rng.choice(BRANDS)
+        name = " ".join([
+            rng.choice(PRODUCTS), rng.choice(MATERIALS), rng.choice(COLOURS), rng.choice(DIMENSIONS),
+            f"réf {rng.randrange(10_000, 99_999)}", brand,
+        ])
+        items.append({
+            "supplier": rng.choice(["Castorama", "Leroy Merlin", "ManoMano"]),
+            "category": rng.choice(CATEGORIES),
+            "name": name,
+            "brand": brand,
+            "url": f"https://example.com/p/{i}",
+            "unit": None,
+            "price": round(rng.uniform(1, 900), 2),
+        })
+    return items
+
+
+def percentile(values, q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def run(n_items: int, n_queries: int):
+    items = synthetic_items(n_items)
+    index = SearchIndex()
+
+    started = time.perf_counter()
+    index.sync(items)
+    print(f"build: {n_items} items, {len(index.postings)} terms in {time.perf_counter() - started:.1f}s")
+
+    rng = random.Random(3)
+    for item in rng.sample(items, max(1, n_items // 100)):
+        item["name"] += " promo"
+    started = time.perf_counter()
+    changes = index.sync(items)
+    print(f"re-sync with 1% renamed: {changes} in {time.perf_counter() - started:.1f}s")
+
+    for q in QUERIES:  # warm impact caches
+        index.search(q)
+    latencies = []
+    for i in range(n_queries):
+        q = QUERIES[i % len(QUERIES)]
+        started = time.perf_counter()
+        index.search(q, limit=20)
+        latencies.append(time.perf_counter() - started)
+    print(f"queries: p50 {percentile(latencies, 0.5) * 1000:.2f} ms, p95 {percentile(latencies, 0.95) * 1000:.2f} ms, "
+          f"max {max(latencies) * 1000:.2f} ms")
+    for q in QUERIES:
+        started = time.perf_counter()
+        total, _ = index.search(q)
+        print(f"  {q!r:>28}: {total:>8} matches, {(time.perf_counter() - started) * 1000:7.2f} ms")
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Search index benchmark")
+    ap.add_argument("--items", type=int, default=200_000, help="Synthetic products to index")
+    ap.add_argument("--queries", type=int, default=500, help="Timed queries")
+    args = ap.parse_args()
+    run(args.items, args.queries)
+
+
+if __name__ == "__main__":
+    main()
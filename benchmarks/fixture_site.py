@@ -0,0 +1,216 @@
+"""A local, synthetic copy of the three supplier listings for crawl benchmarks.
+
+FixtureSite serves generated catalogues whose markup matches what the
+shipped config expects from each supplier:
+
+- /castorama/?page=N: static product tiles with a rel="next" link
+- /leroymerlin/?page=N: li.product-thumbnail cards, a didomi-style consent
+  button and .a-pagination__link[rel="next"]
+- /manomano/: an empty shell whose script draws product links from
+  /manomano/batch?n=N, one batch on load and one more per scroll to the
+  bottom, behind a cookie banner
+
+Every request waits `latency_ms` before it is answered. The server counts the
+listing pages and scroll batches it served per supplier.
+
+fixture_config() rewrites the shipped scraper_config.yaml to point at the
+site. The supplier field chains are kept as shipped, so a benchmark runs the
+real extraction plans.
+"""
+from __future__ import annotations
+
+import json
+import sys
+import threading
+import time
+from dataclasses import dataclass, replace
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict
+from urllib.parse import parse_qs, urlparse
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from rate_limit import RateLimitConfig  # noqa: E402
+from scraper import CONFIG_PATH, ScraperConfig, load_config  # noqa: E402
+
+SLUGS = {"Castorama": "castorama", "Leroy Merlin": "leroymerlin", "ManoMano": "manomano"}
+PRODUCTS = ["Carrelage sol", "Peinture murale", "Perceuse visseuse", "Lame de terrasse", "Robinet mitigeur"]
+BRANDS = ["GoodHome", "Bosch", "Dexter", "Luxens", "Sensea"]
+
+
+@dataclass
+class SiteSpec:
+    cards: int = 24  # per listing page or scroll batch
+    pages: int = 5  # listing pages per paginated supplier, batches for ManoMano
+    latency_ms: int = 0  # added to every response
+
+
+def _product(supplier: str, page: int, i: int) -> Dict[str, str]:
+    n = page * 1000 + i
+    return {
+        "name": f"{PRODUCTS[n % len(PRODUCTS)]} {supplier} {page}-{i} 30x30cm",
+        "brand": BRANDS[n % len(BRANDS)],
+        "price": f"{10 + n % 90},90 €",
+        "href": f"/p/{SLUGS[supplier]}-{page}-{i}",
+        "image": f"https://media.castorama.fr/is/image/bench/{n}.jpg",
+    }
+
+
+def castorama_page(spec: SiteSpec, page: int) -> str:
+    tiles = "".join(
+        f"""<div data-test-id="product-tile"><a href="{p['href']}" title="{p['name']}">
+<img src="{p['image']}" alt=""></a><h3 data-test-id="product-title">{p['name']}</h3>
+<span data-test-id="brand">{p['brand']}</span><div data-test-id="price">{p['price']}</div>
+<span class="unit">m²</span></div>"""
+        for p in (_product("Castorama", page, i) for i in range(spec.cards))
+    )
+    nav = f'<a rel="next" href="?page={page + 1}">Suivant</a>' if page < spec.pages else ""
+    return f"<!DOCTYPE html><html><head><title>Castorama</title></head><body>{tiles}{nav}</body></html>"
+
+
+CONSENT_JS = """<script>
+document.addEventListener('click', e => {
+  if (e.target.closest('.consent button')) document.querySelector('.consent').remove();
+});
+</script>"""
+
+
+def leroymerlin_page(spec: SiteSpec, page: int) -> str:
+    cards = "".join(
+        f"""<li class="product-thumbnail"><img class="a-illustration__img" src="{p['image']}" alt="">
+<a class="a-designation" href="{p['href']}" title="{p['name']}"><span class="a-designation__label">{p['name']}</span></a>
+<span class="a-vendor__name">{p['brand']}</span>
+<div class="m-price -main"><span class="m-price__line">{p['price']}</span></div>
+<div class="m-price -secondary"><span class="m-price__unit">{p['price']} / U</span></div></li>"""
+        for p in (_product("Leroy Merlin", page, i) for i in range(spec.cards))
+    )
+    nav = f'<a class="a-pagination__link" rel="next" href="?page={page + 1}">Suivant</a>' if page < spec.pages else ""
+    banner = '<div class="consent"><button id="didomi-notice-agree-button">Accepter</button></div>'
+    return (
+        "<!DOCTYPE html><html><head><title>Leroy Merlin</title></head>"
+        f"<body>{banner}<ul>{cards}</ul>{nav}{CONSENT_JS}</body></html>"
+    )
+
+
+def manomano_batch(spec: SiteSpec, n: int) -> list:
+    if n >= spec.pages:
+        return []
+    return [_product("ManoMano", n, i) for i in range(spec.cards)]
+
+
+MANOMANO_SHELL = """<!DOCTYPE html><html><head><title>ManoMano</title></head><body>
+<div class="consent"><button data-testid="cookie-banner-accept-button">Accepter</button></div>
+<div id="listing"></div><div style="height:2000px"></div>
+<script>
+let next = 0, loading = false;
+async function more() {
+  if (loading) return;
+  loading = true;
+  const rows = await (await fetch('batch?n=' + next)).json();
+  next += 1;
+  const html = rows.map(p => `<a data-testid="productCardListing" href="${p.href}" title="${p.name}">
+    <img data-testid="image" src="${p.image}" srcset="${p.image} 1x, ${p.image} 2x" alt="">
+    <p data-testid="product-card-listings-title">${p.name}</p>
+    <img data-testid="brand-image" alt="${p.brand}">
+    <span data-testid="price-main">${p.price}</span></a>`).join('');
+  document.getElementById('listing').insertAdjacentHTML('beforeend', html);
+  loading = false;
+}
+window.addEventListener('scroll', () => {
+  if (window.innerHeight + window.scrollY >= document.body.scrollHeight - 50) more();
+});
+more();
+</script>""" + CONSENT_JS + "</body></html>"
+
+
+class FixtureSite:
+    """Threaded HTTP server for the synthetic listings; use as a context manager."""
+
+    def __init__(self, spec: SiteSpec, host: str = "127.0.0.1", port: int = 0):
+        self.spec = spec
+        self._lock = threading.Lock()
+        self.pages: Dict[str, int] = {}
+        self.requests = 0
+        site = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                site._serve(self)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        self.server.daemon_threads = True
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def __enter__(self) -> "FixtureSite":
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def _count(self, slug: str):
+        with self._lock:
+            self.pages[slug] = self.pages.get(slug, 0) + 1
+
+    def _serve(self, handler: BaseHTTPRequestHandler):
+        with self._lock:
+            self.requests += 1
+        if self.spec.latency_ms:
+            time.sleep(self.spec.latency_ms / 1000)
+        parsed = urlparse(handler.path)
+        query = parse_qs(parsed.query)
+        page = int(query.get("page", ["1"])[0])
+        path = parsed.path
+        body, ctype = None, "text/html; charset=utf-8"
+        if path == "/castorama/" and page <= self.spec.pages:
+            body = castorama_page(self.spec, page)
+            self._count("castorama")
+        elif path == "/leroymerlin/" and page <= self.spec.pages:
+            body = leroymerlin_page(self.spec, page)
+            self._count("leroymerlin")
+        elif path == "/manomano/":
+            body = MANOMANO_SHELL
+        elif path == "/manomano/batch":
+            rows = manomano_batch(self.spec, int(query.get("n", ["0"])[0]))
+            if rows:
+                self._count("manomano")
+            body, ctype = json.dumps(rows), "application/json"
+        if body is None:
+            handler.send_error(404)
+            return
+        data = body.encode("utf-8")
+        handler.send_response(200)
+        handler.send_header("Content-Type", ctype)
+        handler.send_header("Content-Length", str(len(data)))
+        handler.end_headers()
+        handler.wfile.write(data)
+
+
+def fixture_config(site: FixtureSite, keep_rate_limits: bool = False) -> ScraperConfig:
+    """The shipped config, pointed at `site` with one category per supplier."""
+    cfg = load_config(CONFIG_PATH)
+    suppliers = []
+    for s in cfg.suppliers:
+        base = f"{site.url}/{SLUGS[s.supplier]}"
+        cat = replace(s.categories[0], url=base + "/", max_pages=site.spec.pages, scroll_steps=site.spec.pages)
+        suppliers.append(replace(
+            s,
+            base_url=base,
+            categories=[cat],
+            rate_limit=s.rate_limit if keep_rate_limits else RateLimitConfig(),
+        ))
+    return replace(cfg, suppliers=suppliers, browser_state=False)
+
+
+def expected_items(spec: SiteSpec) -> int:
+    return len(SLUGS) * spec.cards * spec.pages
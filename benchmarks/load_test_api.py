@@ -0,0 +1,161 @@
+"""Load-test the query API against a local uvicorn instance.
+
+Writes a synthetic materials.json, starts `uvicorn api:app` on a free port
+pointed at it, then fires a mix of filtered /items queries from several
+client threads and reports throughput and latency percentiles:
+
+    python benchmarks/load_test_api.py --items 50000 --requests 2000 --clients 8
+
+A share of requests repeat an earlier query with If-None-Match to exercise
+the 304 path.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+import httpx
+
+ROOT = Path(__file__).resolve().parent.parent
+SUPPLIERS = ["Castorama", "Leroy Merlin", "ManoMano"]
+CATEGORIES = ["Carrelage", "Peinture", "Outillage", "Plomberie", "Isolation"]
+BRANDS = ["GoodHome", "Bosch", "Dexter", "Makita", "Luxens", "Artens"]
+
+
+def synthetic_items(n: int, seed: int = 7):
+    rng = random.Random(seed)
+    return [
+        {
+            "supplier": rng.choice(SUPPLIERS),
+            "category": rng.choice(CATEGORIES),
+            "name": f"Product {i}",
+            "price": round(rng.uniform(1, 500), 2) if rng.random() > 0.05 else None,
+            "currency": "€",
+            "url": f"https://example.com/p/{i}",
+            "brand": rng.choice(BRANDS),
+            "unit": None,
+            "image_url": None,
+            "timestamp": 0,
+            "source": "dom",
+        }
+        for i in range(n)
+    ]
+
+
+def random_query(rng: random.Random):
+    params = {}
+    if rng.random() < 0.7:
+        params["supplier"] = rng.choice(SUPPLIERS)
+    if rng.random() < 0.6:
+        params["category"] = rng.choice(CATEGORIES)
+    if rng.random() < 0.3:
+        params["brand"] = rng.choice(BRANDS)
+    if rng.random() < 0.5:
+        low = rng.uniform(1, 300)
+        params["min_price"] = round(low, 2)
+        params["max_price"] = round(low + rng.uniform(5, 100), 2)
+    if rng.random() < 0.5:
+        params["sort"] = rng.choice(["price", "-price", "name"])
+    params["limit"] = 50
+    return params
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def wait_ready(base: str, timeout_s: float = 30.0):
+    deadline = time.monotonic() + timeout_s
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(f"{base}/health", timeout=1).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError("uvicorn did not start")
+
+
+def percentile(values, q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))] if ordered else 0.0
+
+
+def run(n_items: int, n_requests: int, n_clients: int, revalidate: float):
+    with tempfile.TemporaryDirectory() as tmp:
+        source = Path(tmp) / "materials.json"
+        source.write_text(json.dumps({"scraped_at": 0, "count": n_items, "items": synthetic_items(n_items)}))
+        port = free_port()
+        env = dict(os.environ, MATERIALS_SOURCE=str(source))
+        server = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "api:app", "--port", str(port), "--log-level", "warning"],
+            cwd=str(ROOT), env=env,
+        )
+        base = f"http://127.0.0.1:{port}"
+        try:
+            wait_ready(base)
+            latencies, statuses = [], {}
+            lock = threading.Lock()
+
+            def client(worker: int, count: int):
+                rng = random.Random(worker)
+                seen = []
+                with httpx.Client(base_url=base, timeout=10) as http:
+                    for _ in range(count):
+                        headers = {}
+                        if seen and rng.random() < revalidate:
+                            params, etag = rng.choice(seen)
+                            headers["If-None-Match"] = etag
+                        else:
+                            params = random_query(rng)
+                        started = time.perf_counter()
+                        response = http.get("/items", params=params, headers=headers)
+                        elapsed = time.perf_counter() - started
+                        if response.status_code == 200:
+                            seen.append((params, response.headers["etag"]))
+                        with lock:
+                            latencies.append(elapsed)
+                            statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+            per_client = max(1, n_requests // n_clients)
+            threads = [threading.Thread(target=client, args=(i, per_client)) for i in range(n_clients)]
+            started = time.perf_counter()
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+            elapsed = time.perf_counter() - started
+        finally:
+            server.terminate()
+            server.wait()
+
+    print(f"{len(latencies)} requests over {n_items} items with {n_clients} clients in {elapsed:.2f}s "
+          f"-> {len(latencies) / elapsed:.0f} req/s")
+    print(f"latency p50 {percentile(latencies, 0.5) * 1000:.1f} ms, p95 {percentile(latencies, 0.95) * 1000:.1f} ms, "
+          f"p99 {percentile(latencies, 0.99) * 1000:.1f} ms")
+    print("status codes: " + ", ".join(f"{code}={n}" for code, n in sorted(statuses.items())))
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Query API load test")
+    ap.add_argument("--items", type=int, default=50000, help="Items in the synthetic snapshot")
+    ap.add_argument("--requests", type=int, default=2000, help="Total requests across all clients")
+    ap.add_argument("--clients", type=int, default=8, help="Concurrent client threads")
+    ap.add_argument("--revalidate", type=float, default=0.2, help="Share of requests sent with If-None-Match")
+    args = ap.parse_args()
+    run(args.items, args.requests, args.clients, args.revalidate)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+"""Saved browser storage state, so cookie banners are accepted once.
+
+After a supplier's consent banner has been clicked, the context's cookies and
+localStorage for that supplier's site are written to
+data/browser_state/<supplier>.json together with how long the banner took.
+New contexts start from the merged saved state of every supplier, so the
+banner normally never shows again. Suppliers with a saved (or, within a run,
+already accepted) consent only get a short probe for the banner instead of
+the full consent_timeout_ms wait; when the banner does appear anyway (the
+cookie expired, the site reset consent) it is clicked and the state saved
+again.
+
+ConsentState also keeps the per-run counts behind the "Consent:" line of the
+run summary. It estimates the time spared by state loaded from disk (a click
+at the first check) apart from the time spared by short probes after
+consent was known (full waits at later checks), so a run without saved
+state is not credited to it.
+"""
+from __future__ import annotations
+
+import json
+import logging
+import os
+import re
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+from urllib.parse import urlparse
+
+log = logging.getLogger(__name__)
+
+
+def site_domain(base_url: str) -> str:
+    """"https://www.leroymerlin.fr" -> "leroymerlin.fr"."""
+    host = urlparse(base_url).hostname or ""
+    return host[4:] if host.startswith("www.") else host
+
+
+def filter_state(state: Dict[str, Any], domain: str, now: Optional[float] = None) -> Dict[str, Any]:
+    """Only the unexpired cookies and the localStorage origins of `domain`."""
+    now = time.time() if now is None else now
+
+    def ours(host: str) -> bool:
+        host = host.lstrip(".")
+        return host == domain or host.endswith("." + domain)
+
+    cookies = [
+        c for c in state.get("cookies", [])
+        if ours(c.get("domain", "")) and not (0 < c.get("expires", -1) < now)
+    ]
+    origins = [o for o in state.get("origins", []) if ours(urlparse(o.get("origin", "")).hostname or "")]
+    return {"cookies": cookies, "origins": origins}
+
+
+class ConsentState:
+    """Which suppliers' consent is already given, their saved state, and what it saved."""
+
+    def __init__(self, root: Optional[Path] = None):
+        self.root = Path(root) if root else None
+        self._lock = threading.Lock()
+        self._saved: Dict[str, Dict[str, Any]] = {}  # supplier -> {"consent_s", "saved_at", "storage_state"}
+        self._loaded: set = set()  # suppliers whose state came from an earlier run
+        self._accepted: set = set()  # suppliers whose banner was clicked in this run
+        self._checked: set = set()  # suppliers probed at least once in this run
+        self.rows: Dict[str, Dict[str, float]] = {}
+        if self.root is not None and self.root.is_dir():
+            for path in self.root.glob("*.json"):
+                try:
+                    entry = json.loads(path.read_text(encoding="utf-8"))
+                    self._saved[entry["supplier"]] = entry
+                    self._loaded.add(entry["supplier"])
+                except (ValueError, KeyError) as e:
+                    log.warning("Ignoring unreadable browser state %s: %s", path, e)
+
+    def _path(self, supplier: str) -> Path:
+        return self.root / (re.sub(r"[^a-z0-9]+", "_", supplier.lower()).strip("_") + ".json")
+
+    def storage_state(self, suppliers: Iterable[str]) -> Optional[Dict[str, Any]]:
+        """Saved cookies and localStorage of `suppliers`, merged for browser.new_context."""
+        with self._lock:
+            entries = [self._saved[s] for s in suppliers if s in self._saved]
+        if not entries:
+            return None
+        now = time.time()
+        cookies: List[Dict[str, Any]] = []
+        origins: List[Dict[str, Any]] = []
+        for entry in entries:
+            state = filter_state(entry["storage_state"], entry["domain"], now)
+            cookies.extend(state["cookies"])
+            origins.extend(state["origins"])
+        return {"cookies": cookies, "origins": origins}
+
+    def known(self, supplier: str) -> bool:
+        """True when the banner is not expected: accepted this run or saved state loaded."""
+        with self._lock:
+            if supplier in self._accepted:
+                return True
+            entry = self._saved.get(supplier)
+        if entry is None:
+            return False
+        state = filter_state(entry["storage_state"], entry["domain"])
+        return bool(state["cookies"] or state["origins"])
+
+    def _row(self, supplier: str) -> Dict[str, float]:
+        return self.rows.setdefault(
+            supplier,
+            {"clicked": 0, "skipped": 0, "absent": 0, "spent_s": 0.0, "saved_s": 0.0, "probe_saved_s": 0.0},
+        )
+
+    def record_clicked(self, supplier: str, base_url: str, seconds: float, state: Optional[Dict[str, Any]]):
+        """The banner showed and was clicked after `seconds`; save `state` for later runs."""
+        domain = site_domain(base_url)
+        with self._lock:
+            self._accepted.add(supplier)
+            self._checked.add(supplier)
+            row = self._row(supplier)
+            row["clicked"] += 1
+            row["spent_s"] += seconds
+            if state is None:
+                return
+            entry = {
+                "supplier": supplier,
+                "domain": domain,
+                "consent_s": round(seconds, 3),
+                "saved_at": int(time.time()),
+                "storage_state": filter_state(state, domain),
+            }
+            self._saved[supplier] = entry
+        if self.root is not None:
+            self.root.mkdir(parents=True, exist_ok=True)
+            path = self._path(supplier)
+            tmp = path.with_name(path.name + ".tmp")
+            tmp.write_text(json.dumps(entry, ensure_ascii=False), encoding="utf-8")
+            os.replace(tmp, path)
+
+    def record_absent(self, supplier: str, seconds: float, known: bool, timeout_s: float):
+        """No banner within the probe/wait. With `known` consent, count what was spared.
+
+        At the first check of a run, state loaded from an earlier run spared
+        waiting for the banner and clicking it (its recorded cost); that is
+        `saved_s`. Any other check with known consent was only probed instead
+        of waiting the full consent timeout; that is `probe_saved_s`.
+        """
+        with self._lock:
+            row = self._row(supplier)
+            row["spent_s"] += seconds
+            if not known:
+                row["absent"] += 1
+            else:
+                row["skipped"] += 1
+                if supplier not in self._checked and supplier in self._loaded:
+                    row["saved_s"] += max(0.0, self._saved[supplier]["consent_s"] - seconds)
+                else:
+                    row["probe_saved_s"] += max(0.0, timeout_s - seconds)
+            self._checked.add(supplier)
+
+    def report(self) -> str:
+        with self._lock:
+            rows = {s: dict(r) for s, r in self.rows.items()}
+        if not rows:
+            return "Consent: none"
+        parts = []
+        for supplier, r in rows.items():
+            part = f"{supplier} clicked {int(r['clicked'])}, skipped {int(r['skipped'])}"
+            if r["absent"]:
+                part += f", no banner {int(r['absent'])}"
+            parts.append(
+                part + f" ({r['spent_s']:.1f}s spent, ~{r['saved_s']:.1f}s + ~{r['probe_saved_s']:.1f}s saved)"
+            )
+        state = sum(r["saved_s"] for r in rows.values())
+        probes = sum(r["probe_saved_s"] for r in rows.values())
+        return (
+            f"Consent: {'; '.join(parts)}; ~{state:.1f}s of banner waits saved by browser state, "
+            f"~{probes:.1f}s by short probes"
+        )
@@ -0,0 +1,153 @@
+"""Crawl checkpoints, so an interrupted run can pick up where it stopped.
+
+Progress is journaled to a JSON-lines file as each page (or scroll step) of a
+category completes. A record carries the items accepted since the previous
+record and their dedupe keys, the number of pages done, and the URL to
+continue from when the listing has one:
+
+    {"supplier": "Castorama", "category": "Carrelage", "page": 3,
+     "next_url": "https://...?page=4", "done": false, "count": 24,
+     "keys": [[...]], "items": [{...}]}
+
+Item bodies are only journaled when no sink holds them (`items=False`
+otherwise); the keys alone are enough to dedupe against what the sink
+already has, so a streaming run keeps nothing but positions and dedupe keys
+in memory. Without a sink the returned rows hold every item anyway, and the
+store keeps references to them so a re-queued category still returns the
+pages it collected before failing.
+
+The first line holds the run's start time, `{"started_at": 1767225600}`,
+and survives a resume, so everything the resumed run wrote can be told
+apart by timestamp from what earlier runs left in the same output.
+
+Replaying the journal gives, per supplier/category, what was emitted so far
+and the position to restart at. Appending one line per page keeps the cost
+proportional to new data rather than to the whole run, and a torn last line
+from a crash is simply ignored.
+"""
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from storage import iter_jsonl
+
+
+@dataclass
+class CategoryProgress:
+    page: int = 0  # pages or scroll steps fully collected
+    next_url: str = ""  # where to continue, when the listing is URL-addressable
+    done: bool = False
+    keys: set = field(default_factory=set)
+    items: List[Dict[str, Any]] = field(default_factory=list)  # only when the journal carries them
+    count: int = 0  # items accepted, journaled or not
+
+
+class CheckpointStore:
+    """Append-only progress journal shared by every category (and thread) of a run.
+
+    Without `resume` the journal is truncated and the run starts from scratch.
+    With `items=False` (a sink already stores every item) only positions and
+    dedupe keys are journaled.
+    """
+
+    def __init__(
+        self, path: Path, resume: bool = False, items: bool = True, started_at: Optional[int] = None
+    ):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.items = items
+        self._lock = threading.Lock()
+        self._progress: Dict[Tuple[str, str], CategoryProgress] = {}
+        restored_start = None
+        if resume and self.path.exists():
+            for record in iter_jsonl(self.path):
+                if "started_at" in record:
+                    restored_start = int(record["started_at"])
+                    continue
+                p = self._apply(record)
+                p.items.extend(record.get("items", []))
+        self.restored = {k: (p.done, p.count) for k, p in self._progress.items()}
+        # When the interrupted run started; a resumed run keeps that time
+        self.started_at = restored_start if restored_start is not None else started_at or int(time.time())
+        self._fh = self.path.open("a" if resume else "w", encoding="utf-8")
+        if restored_start is None:
+            self._fh.write(json.dumps({"started_at": self.started_at}) + "\n")
+            self._fh.flush()
+
+    def _apply(self, record: Dict[str, Any]) -> CategoryProgress:
+        key = (record["supplier"], record["category"])
+        p = self._progress.setdefault(key, CategoryProgress())
+        p.page = max(p.page, int(record.get("page", 0)))
+        p.next_url = record.get("next_url") or ""
+        p.done = p.done or bool(record.get("done"))
+        p.keys.update(tuple(k) for k in record.get("keys", []))
+        p.count += int(record.get("count", len(record.get("items", []))))
+        return p
+
+    def progress(self, supplier: str, category: str) -> CategoryProgress:
+        """Saved progress for a category; an empty one when nothing was recorded.
+
+        The keys and restored items are shared with the store, not copied;
+        callers copy what they extend.
+        """
+        with self._lock:
+            p = self._progress.get((supplier, category))
+            if p is None:
+                return CategoryProgress()
+            return CategoryProgress(p.page, p.next_url, p.done, p.keys, p.items, p.count)
+
+    def record(
+        self,
+        supplier: str,
+        category: str,
+        page: int,
+        items: List[Dict[str, Any]],
+        keys: List[Tuple[str, ...]],
+        next_url: str = "",
+        done: bool = False,
+    ):
+        """Journal one completed page: the items it added and where to go next.
+
+        Item bodies are kept (by reference) only with `items=True`.
+        """
+        record = {
+            "supplier": supplier,
+            "category": category,
+            "page": page,
+            "next_url": next_url,
+            "done": done,
+            "count": len(items),
+            "keys": [list(k) for k in keys],
+        }
+        if self.items:
+            record["items"] = items
+        line = json.dumps(record, ensure_ascii=False)
+        with self._lock:
+            p = self._apply(record)
+            if self.items:
+                p.items.extend(items)
+            self._fh.write(line + "\n")
+            self._fh.flush()
+            os.fsync(self._fh.fileno())
+
+    def close(self, finished: bool = False):
+        """Close the journal; a finished run removes it so the next starts clean."""
+        with self._lock:
+            if not self._fh.closed:
+                self._fh.close()
+            if finished and self.path.exists():
+                self.path.unlink()
+
+    def report(self) -> str:
+        if not self.restored:
+            return "Checkpoint: fresh run"
+        done = sum(1 for finished, _ in self.restored.values() if finished)
+        items = sum(n for _, n in self.restored.values())
+        partial = len(self.restored) - done
+        return f"Checkpoint: resumed {items} items ({done} categories skipped, {partial} restarted mid-way)"
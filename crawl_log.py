@@ -0,0 +1,178 @@
+"""Structured, leveled logging for crawls.
+
+    listener = setup_logging(cfg.logging)
+    with log_context(supplier="Castorama", category="Carrelage"):
+        log.info("Page %d: collected %d items", 3, 24, extra={"page": 3})
+    stop_logging(listener)
+
+Records are written as JSON lines (or plain text with `format: text`) with
+the supplier and category of the surrounding log_context() and any `extra`
+fields. Context lives in a ContextVar, so it follows each worker thread and
+each asyncio task separately.
+
+Loggers only put records on a queue (QueueHandler). A QueueListener thread
+formats them and writes them out, so a slow terminal or disk never stalls
+extraction. The default INFO level carries per-page and per-category
+summaries. Per-card events are DEBUG, and only `card_sample_rate` of them
+are logged. The card loops check `Sampler` before building a record, so
+dropped events cost a counter increment.
+"""
+from __future__ import annotations
+
+import copy
+import itertools
+import json
+import logging
+import queue
+import sys
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Dict, Iterator, Optional
+
+FORMATS = ("json", "text")
+# Third-party loggers that log every request at INFO
+QUIET = ("httpx", "httpcore", "asyncio")
+
+_context: ContextVar[Dict[str, Any]] = ContextVar("crawl_log_context", default={})
+# Attributes every LogRecord has; anything else came in through `extra`
+_STANDARD = frozenset(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime", "context"}
+
+
+@dataclass
+class LoggingConfig:
+    level: str = "INFO"
+    format: str = "json"  # "json" lines or plain "text"
+    file: str = ""  # append to this file instead of stderr
+    card_sample_rate: float = 0.01  # share of per-card DEBUG events that are logged
+
+
+def parse_logging_config(raw: Optional[Dict[str, Any]]) -> LoggingConfig:
+    raw = raw or {}
+    defaults = LoggingConfig()
+    cfg = LoggingConfig(
+        level=str(raw.get("level", defaults.level)).upper(),
+        format=str(raw.get("format", defaults.format)),
+        file=str(raw.get("file") or ""),
+        card_sample_rate=float(raw.get("card_sample_rate", defaults.card_sample_rate)),
+    )
+    if cfg.format not in FORMATS:
+        raise ValueError(f"logging.format must be one of {', '.join(FORMATS)}, got {cfg.format!r}")
+    return cfg
+
+
+@contextmanager
+def log_context(**fields: Any) -> Iterator[None]:
+    """Add `fields` to every record logged inside the block (this thread or task only)."""
+    token = _context.set({**_context.get(), **fields})
+    try:
+        yield
+    finally:
+        _context.reset(token)
+
+
+class Sampler:
+    """Lets one call in every 1/rate through; rate 0 lets none through."""
+
+    def __init__(self, rate: float):
+        self.every = round(1 / rate) if rate > 0 else 0
+        self._count = itertools.count()
+
+    def __call__(self) -> bool:
+        # next() on itertools.count is atomic under the GIL
+        return bool(self.every) and next(self._count) % self.every == 0
+
+
+class ContextFilter(logging.Filter):
+    """Stamps the caller's log_context() onto the record before it is queued."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.context = _context.get()
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry: Dict[str, Any] = {
+            "ts": round(record.created, 3),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        entry.update(getattr(record, "context", {}))
+        for key, value in vars(record).items():
+            if key not in _STANDARD:
+                entry[key] = value
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exc"] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class TextFormatter(logging.Formatter):
+    def __init__(self):
+        super().__init__("%(asctime)s %(levelname)-7s %(where)s%(message)s")
+
+    def format(self, record: logging.LogRecord) -> str:
+        ctx = getattr(record, "context", {})
+        where = "/".join(str(ctx[k]) for k in ("supplier", "category") if ctx.get(k))
+        record.where = f"[{where}] " if where else ""
+        return super().format(record)
+
+
+class _QueueHandler(QueueHandler):
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Keep the record structured: merge args into the message and turn
+        # the traceback into text here, since exc_info cannot cross threads
+        # safely, but leave formatting to the listener
+        record = copy.copy(record)
+        record.msg, record.args = record.getMessage(), None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+def setup_logging(cfg: Optional[LoggingConfig] = None, stream=None) -> QueueListener:
+    """Route the root logger through a queue to one JSON (or text) handler.
+
+    Returns the started listener; pass it to stop_logging() to flush.
+    """
+    cfg = cfg or LoggingConfig()
+    if cfg.file:
+        handler: logging.Handler = logging.FileHandler(cfg.file, encoding="utf-8")
+    else:
+        handler = logging.StreamHandler(stream or sys.stderr)
+    handler.setFormatter(JsonFormatter() if cfg.format == "json" else TextFormatter())
+
+    records: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+    queued = _QueueHandler(records)
+    queued.addFilter(ContextFilter())
+    root = logging.getLogger()
+    for old in list(root.handlers):
+        root.removeHandler(old)
+    root.addHandler(queued)
+    root.setLevel(cfg.level)
+    for name in QUIET:
+        logging.getLogger(name).setLevel(max(logging.WARNING, root.level))
+
+    listener = QueueListener(records, handler)
+    listener.start()
+    return listener
+
+
+def stop_logging(listener: QueueListener):
+    """Flush and stop `listener`, then log straight to its handlers.
+
+    Records logged after this (end-of-run reports, materializing output)
+    are written synchronously instead of queued for a stopped thread.
+    """
+    listener.stop()
+    root = logging.getLogger()
+    for queued in [h for h in root.handlers if isinstance(h, _QueueHandler)]:
+        root.removeHandler(queued)
+    for handler in listener.handlers:
+        handler.addFilter(ContextFilter())
+        root.addHandler(handler)
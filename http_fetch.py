@@ -0,0 +1,151 @@
+"""HTTP-first fetch tier: plain requests plus a fast HTML parser.
+
+Many listing pages are server-rendered, so their cards are already in the
+HTML a plain GET returns. This tier fetches that HTML over a pooled
+keep-alive client and runs the same compiled extraction plan as
+BULK_EXTRACT_JS against it with lxml. The scraper escalates to Chromium
+when the static page yields too few cards.
+"""
+from __future__ import annotations
+
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+from lxml import html as lxml_html
+
+from selector_stats import HITS_KEY
+
+
+class HttpFetcher:
+    """Pooled HTTP client shared by every category (and thread) of a run."""
+
+    def __init__(self, user_agent: Optional[str] = None, timeout_s: float = 15.0, max_connections: int = 20):
+        headers = {"Accept-Language": "fr-FR,fr;q=0.9,en;q=0.8"}
+        if user_agent:
+            headers["User-Agent"] = user_agent
+        self.client = httpx.Client(
+            headers=headers,
+            timeout=timeout_s,
+            follow_redirects=True,
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+        )
+        self._lock = threading.Lock()
+        self.responses = 0
+        self.bytes_received = 0
+
+    def fetch(self, url: str) -> Tuple[int, str]:
+        response = self.client.get(url)
+        with self._lock:
+            self.responses += 1
+            self.bytes_received += len(response.content)
+        return response.status_code, response.text
+
+    def close(self):
+        self.client.close()
+
+
+def parse_html(text: str):
+    return lxml_html.fromstring(text)
+
+
+def _query(root, sel: Dict[str, str]) -> List[Any]:
+    if not sel["css"]:
+        return [root]
+    try:
+        found = root.cssselect(sel["css"])
+    except Exception:
+        return []
+    if sel.get("has_text"):
+        needle = sel["has_text"].lower()
+        found = [el for el in found if needle in el.text_content().lower()]
+    return found
+
+
+def _read(el, attrs: List[str]) -> List[str]:
+    if not attrs:
+        return [el.text_content() or ""]
+    return [el.get(a) or "" for a in attrs]
+
+
+def _pick(card, field: Dict[str, Any], hits: Dict[str, int]):
+    if field["all"]:
+        values = []
+        for sel in field["selectors"]:
+            for el in _query(card, sel):
+                values.extend(v.strip() for v in _read(el, field["attrs"]) if v.strip())
+        return values
+    for i, sel in enumerate(field["selectors"]):
+        found = _query(card, sel)
+        if not found:
+            continue
+        for v in _read(found[0], field["attrs"]):
+            if v.strip():
+                hits[field["key"]] = i
+                return v.strip()
+    return ""
+
+
+def _extract_card(card, plan: List[Dict[str, Any]]) -> Dict[str, Any]:
+    hits: Dict[str, int] = {}
+    raw: Dict[str, Any] = {field["key"]: _pick(card, field, hits) for field in plan}
+    raw[HITS_KEY] = hits
+    return raw
+
+
+def extract_static(root, card_selector: str, plan: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """lxml twin of BULK_EXTRACT_JS: one raw field dict per card.
+
+    Like the JS, each raw carries the index of the winning selector per
+    field under HITS_KEY.
+    """
+    try:
+        cards = root.cssselect(card_selector)
+    except Exception:
+        return []
+    return [_extract_card(card, plan) for card in cards]
+
+
+def next_link(root, selector: Optional[str]) -> str:
+    """href of the pagination link matched by `selector`, if it is a plain link."""
+    if not selector:
+        return ""
+    try:
+        found = root.cssselect(selector)
+    except Exception:
+        return ""
+    return (found[0].get("href") or "") if found else ""
+
+
+class TierStats:
+    """Which fetch tier produced each category, and what each attempt cost."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.rows: List[Dict[str, Any]] = []
+
+    def record(self, supplier: str, category: str, tier: str, seconds: float, ok: bool, reason: str = ""):
+        with self._lock:
+            self.rows.append({
+                "supplier": supplier,
+                "category": category,
+                "tier": tier,
+                "seconds": round(seconds, 3),
+                "ok": ok,
+                "reason": reason,
+            })
+
+    def report(self) -> str:
+        with self._lock:
+            rows = list(self.rows)
+        if not rows:
+            return "Fetch tiers: none"
+        lines = ["Fetch tiers:"]
+        for r in rows:
+            if r["ok"]:
+                status = "ok"
+            else:
+                status = ("escalated" if r["tier"] == "http" else "failed") + f" ({r['reason']})"
+            lines.append(f"  {r['supplier']}/{r['category']}: {r['tier']} {r['seconds']:.2f}s {status}")
+        return "\n".join(lines)
+
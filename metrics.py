@@ -0,0 +1,233 @@
+"""Live crawl metrics in the Prometheus text format.
+
+    python scraper.py --metrics-port 9464
+    curl localhost:9464/metrics
+
+MetricsServer serves /metrics from a daemon thread for as long as the crawl
+runs. Nothing is pushed and nothing new is recorded per card: every scrape
+renders the run's existing counters (CrawlSession.counters, sources, waits,
+rate limits, failures, blocked requests) and the Profiler's span histograms
+at that moment. The crawl loops only flush their page totals into
+CrawlCounters, once per page or scroll step.
+
+Exported families (all labelled per supplier unless noted):
+
+- scraper_pages_total, scraper_cards_total
+- scraper_items_accepted_total, scraper_items_duplicated_total,
+  scraper_items_errored_total, scraper_items_by_source_total
+- scraper_phase_duration_seconds (histogram; phase="extract" is the
+  extraction latency per page)
+- scraper_wait_seconds_total, scraper_waits_total, scraper_wait_timeouts_total
+  (per wait kind)
+- scraper_rate_limit_requests_total, scraper_rate_limit_wait_seconds_total
+  (per host)
+- scraper_failures_total (per kind), scraper_retries_total,
+  scraper_requeues_total, scraper_browser_restarts_total,
+  scraper_circuit_trips_total
+- scraper_responses_total, scraper_received_bytes_total (per tier),
+  scraper_blocked_requests_total (per resource type)
+- scraper_run_start_time_seconds
+"""
+from __future__ import annotations
+
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Tuple
+
+from profiling import BUCKETS_MS
+from resilience import BLOCKED, CIRCUIT, NAVIGATION, SELECTOR, TIMEOUT
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+COUNTS = ("pages", "cards", "accepted", "duplicates", "errors")
+
+
+class CrawlCounters:
+    """Pages, cards and item outcomes per supplier; flushed once per page."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.rows: Dict[str, Dict[str, int]] = {}
+
+    def record(self, supplier: str, **counts: int):
+        with self._lock:
+            row = self.rows.setdefault(supplier, dict.fromkeys(COUNTS, 0))
+            for what, n in counts.items():
+                row[what] += n
+
+    def summary(self) -> Dict[str, Dict[str, int]]:
+        with self._lock:
+            return {supplier: dict(row) for supplier, row in self.rows.items()}
+
+    def report(self) -> str:
+        parts = [
+            f"{supplier} {r['pages']} pages, {r['cards']} cards ({r['accepted']} accepted, "
+            f"{r['duplicates']} duplicates, {r['errors']} errors)"
+            for supplier, r in self.summary().items()
+        ]
+        return "Pages: " + ("; ".join(parts) if parts else "none")
+
+
+def _escape(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Exposition:
+    def __init__(self):
+        self.lines: List[str] = []
+
+    def family(self, name: str, kind: str, help_text: str):
+        self.lines.append(f"# HELP {name} {help_text}")
+        self.lines.append(f"# TYPE {name} {kind}")
+
+    def sample(self, name: str, value: float, **labels: Any):
+        if labels:
+            inner = ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items())
+            name = f"{name}{{{inner}}}"
+        self.lines.append(f"{name} {_number(value)}")
+
+    def text(self) -> str:
+        return "\n".join(self.lines) + "\n"
+
+
+def _per_supplier(out: _Exposition, name: str, help_text: str, rows: Dict[str, Dict[str, Any]], key: str):
+    out.family(name, "counter", help_text)
+    for supplier in sorted(rows):
+        out.sample(name, rows[supplier].get(key, 0), supplier=supplier)
+
+
+def render(session) -> str:
+    """The current state of a CrawlSession in the Prometheus text format."""
+    out = _Exposition()
+
+    counters = session.counters.summary()
+    _per_supplier(out, "scraper_pages_total", "Listing pages and scroll steps extracted.", counters, "pages")
+    _per_supplier(out, "scraper_cards_total", "Product cards read.", counters, "cards")
+    _per_supplier(out, "scraper_items_accepted_total", "New items accepted.", counters, "accepted")
+    _per_supplier(
+        out, "scraper_items_duplicated_total", "Cards dropped as already collected.", counters, "duplicates"
+    )
+    _per_supplier(out, "scraper_items_errored_total", "Cards whose extraction raised.", counters, "errors")
+
+    sources = session.sources.summary()
+    out.family("scraper_items_by_source_total", "counter", "Accepted items per extraction path.")
+    for supplier in sorted(sources):
+        for source, n in sorted(sources[supplier].items()):
+            out.sample("scraper_items_by_source_total", n, supplier=supplier, source=source)
+
+    name = "scraper_phase_duration_seconds"
+    out.family(name, "histogram", "Time spent per crawl phase (profiling spans).")
+    for (supplier, phase), hist in sorted(session.profile.snapshot().items()):
+        cumulative = 0
+        for bound, count in zip(BUCKETS_MS, hist.counts):
+            cumulative += count
+            le = "+Inf" if bound == float("inf") else f"{bound / 1000:g}"
+            out.sample(name + "_bucket", cumulative, phase=phase, supplier=supplier, le=le)
+        out.sample(name + "_sum", hist.total_ms / 1000, phase=phase, supplier=supplier)
+        out.sample(name + "_count", hist.n, phase=phase, supplier=supplier)
+
+    waits = session.waits.summary()
+    for name, key, help_text in (
+        ("scraper_wait_seconds_total", "seconds", "Time spent waiting on page conditions."),
+        ("scraper_waits_total", "count", "Page-condition waits."),
+        ("scraper_wait_timeouts_total", "timeouts", "Page-condition waits that hit their ceiling."),
+    ):
+        out.family(name, "counter", help_text)
+        for kind in sorted(waits):
+            value = waits[kind][key]
+            out.sample(name, value if key == "seconds" else int(value), kind=kind)
+
+    hosts = session.limiter.summary()
+    out.family("scraper_rate_limit_requests_total", "counter", "Requests that took a rate-limit token.")
+    for host in sorted(hosts):
+        out.sample("scraper_rate_limit_requests_total", int(hosts[host]["requests"]), host=host)
+    out.family("scraper_rate_limit_wait_seconds_total", "counter", "Time spent waiting for rate-limit tokens.")
+    for host in sorted(hosts):
+        out.sample("scraper_rate_limit_wait_seconds_total", float(hosts[host]["waited_s"]), host=host)
+
+    failures = session.resilience.summary()
+    trips = dict(session.resilience.breaker.trips)
+    out.family("scraper_failures_total", "counter", "Failed requests per kind, retries included.")
+    for key in sorted(failures):
+        for kind in (TIMEOUT, NAVIGATION, BLOCKED, SELECTOR, CIRCUIT):
+            if failures[key].get(kind):
+                out.sample("scraper_failures_total", failures[key][kind], supplier=key, kind=kind)
+    _per_supplier(out, "scraper_retries_total", "Requests retried after a failure.", failures, "retries")
+    _per_supplier(out, "scraper_requeues_total", "Categories put back in the queue.", failures, "requeued")
+    _per_supplier(
+        out, "scraper_browser_restarts_total", "Browser contexts replaced after failures.", failures, "recycled"
+    )
+    out.family("scraper_circuit_trips_total", "counter", "Times a supplier's circuit breaker opened.")
+    for key in sorted(trips):
+        out.sample("scraper_circuit_trips_total", trips[key], supplier=key)
+
+    blocking = session.blocking.summary()
+    tiers: List[Tuple[str, int, int]] = [("browser", blocking["responses"], blocking["bytes_received"])]
+    if session.http is not None:
+        tiers.append(("http", session.http.responses, session.http.bytes_received))
+    out.family("scraper_responses_total", "counter", "Responses received per fetch tier.")
+    for tier, responses, _ in tiers:
+        out.sample("scraper_responses_total", responses, tier=tier)
+    out.family(
+        "scraper_received_bytes_total", "counter",
+        "Response bytes received per fetch tier (browser: declared Content-Length).",
+    )
+    for tier, _, received in tiers:
+        out.sample("scraper_received_bytes_total", received, tier=tier)
+    out.family("scraper_blocked_requests_total", "counter", "Browser requests aborted by the blocking rules.")
+    for resource_type, n in sorted(blocking["blocked_by_type"].items()):
+        out.sample("scraper_blocked_requests_total", n, type=resource_type)
+
+    out.family("scraper_run_start_time_seconds", "gauge", "Unix time the run started.")
+    out.sample("scraper_run_start_time_seconds", float(int(session.profile.started)))
+    return out.text()
+
+
+class MetricsServer:
+    """Serves render(session) at /metrics from a daemon thread; use as a context manager."""
+
+    def __init__(self, session, port: int, host: str = "127.0.0.1"):
+        self.session = session
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = render(session).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", CONTENT_TYPE)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        self.server.daemon_threads = True
+        self.thread = threading.Thread(target=self.server.serve_forever, name="metrics", daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}/metrics"
+
+    def start(self) -> "MetricsServer":
+        self.thread.start()
+        return self
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self) -> "MetricsServer":
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,187 @@
+"""Where a crawl spends its time, phase by phase.
+
+    with session.profile.span("goto", supplier, category, page=1):
+        page.goto(url)
+
+Spans are aggregated as they close into a latency histogram per phase and
+per supplier and phase, and the slowest spans are kept with their labels.
+Phases recorded by the scrapers:
+
+- category: a whole category, any tier
+- goto: opening the listing, retries included
+- consent: looking for and clicking the cookie banner
+- ready: waiting for the first cards to settle
+- extract: reading one page's (or scroll step's) cards
+- paginate: next click, scroll step or url_template page load
+- http_fetch / parse: the static tier's request and lxml extraction
+
+A disabled Profiler hands out one shared no-op context manager, so spans
+cost a method call and nothing is recorded.
+"""
+from __future__ import annotations
+
+import heapq
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import nullcontext
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+# Upper bounds of the histogram buckets, in milliseconds; the last is open
+BUCKETS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000, float("inf"))
+SLOWEST = 10
+
+_NULL = nullcontext()
+
+
+class Histogram:
+    def __init__(self):
+        self.counts = [0] * len(BUCKETS_MS)
+        self.n = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def add(self, ms: float):
+        self.counts[bisect_left(BUCKETS_MS, ms)] += 1
+        self.n += 1
+        self.total_ms += ms
+        if ms > self.max_ms:
+            self.max_ms = ms
+
+    def quantile(self, q: float) -> float:
+        """Upper bound of the bucket holding the q-quantile (max for the open bucket)."""
+        if not self.n:
+            return 0.0
+        rank = q * self.n
+        seen = 0
+        for bound, count in zip(BUCKETS_MS, self.counts):
+            seen += count
+            if seen >= rank:
+                return min(bound, self.max_ms)
+        return self.max_ms
+
+    def copy(self) -> "Histogram":
+        other = Histogram()
+        other.counts = list(self.counts)
+        other.n, other.total_ms, other.max_ms = self.n, self.total_ms, self.max_ms
+        return other
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "count": self.n,
+            "total_ms": round(self.total_ms, 1),
+            "mean_ms": round(self.total_ms / self.n, 1) if self.n else 0.0,
+            "p50_ms": self.quantile(0.5),
+            "p95_ms": self.quantile(0.95),
+            "max_ms": round(self.max_ms, 1),
+            "buckets": {("inf" if b == float("inf") else str(b)): c for b, c in zip(BUCKETS_MS, self.counts) if c},
+        }
+
+
+class _Span:
+    __slots__ = ("profiler", "labels", "started")
+
+    def __init__(self, profiler: "Profiler", labels: Tuple[str, str, str, Optional[int]]):
+        self.profiler = profiler
+        self.labels = labels
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.profiler.record(self.labels, (time.perf_counter() - self.started) * 1000)
+        return False
+
+
+class Profiler:
+    """Span histograms for one run; thread-safe."""
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self.phases: Dict[str, Histogram] = {}
+        self.by_supplier: Dict[Tuple[str, str], Histogram] = {}
+        self._slowest: List[Tuple[float, int, Tuple[str, str, str, Optional[int]]]] = []
+        self._seq = 0
+        self.started = time.time()
+
+    def span(self, phase: str, supplier: str = "", category: str = "", page: Optional[int] = None):
+        if not self.enabled:
+            return _NULL
+        return _Span(self, (phase, supplier, category, page))
+
+    def record(self, labels: Tuple[str, str, str, Optional[int]], ms: float):
+        phase, supplier = labels[0], labels[1]
+        with self._lock:
+            hist = self.phases.get(phase)
+            if hist is None:
+                hist = self.phases[phase] = Histogram()
+            hist.add(ms)
+            key = (supplier, phase)
+            hist = self.by_supplier.get(key)
+            if hist is None:
+                hist = self.by_supplier[key] = Histogram()
+            hist.add(ms)
+            self._seq += 1
+            entry = (ms, self._seq, labels)
+            if len(self._slowest) < SLOWEST:
+                heapq.heappush(self._slowest, entry)
+            elif ms > self._slowest[0][0]:
+                heapq.heapreplace(self._slowest, entry)
+
+    def snapshot(self) -> Dict[Tuple[str, str], Histogram]:
+        """Copies of the (supplier, phase) histograms, safe to read while spans close."""
+        with self._lock:
+            return {key: h.copy() for key, h in self.by_supplier.items()}
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            slowest = sorted(self._slowest, reverse=True)
+            return {
+                "started_at": int(self.started),
+                "wall_s": round(time.time() - self.started, 3),
+                "bucket_bounds_ms": [("inf" if b == float("inf") else b) for b in BUCKETS_MS],
+                "phases": {phase: h.to_dict() for phase, h in self.phases.items()},
+                "suppliers": {
+                    supplier: {phase: h.to_dict() for (s, phase), h in self.by_supplier.items() if s == supplier}
+                    for supplier in sorted({s for s, _ in self.by_supplier})
+                },
+                "slowest": [
+                    {"phase": p, "supplier": s, "category": c, "page": n, "ms": round(ms, 1)}
+                    for ms, _, (p, s, c, n) in slowest
+                ],
+            }
+
+    def save(self, path: Path):
+        payload = json.dumps(self.to_dict(), indent=1, ensure_ascii=False)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(path.name + ".tmp")
+        tmp.write_text(payload, encoding="utf-8")
+        os.replace(tmp, path)
+
+    def report(self) -> str:
+        """Summary table: one row per phase, then the slowest spans."""
+        data = self.to_dict()
+        if not data["phases"]:
+            return "Run profile: no spans recorded"
+        lines = [
+            "Run profile:",
+            f"  {'phase':<12}{'count':>7}{'total s':>10}{'mean ms':>10}{'p50 ms':>9}{'p95 ms':>9}{'max ms':>10}",
+        ]
+        rows = sorted(data["phases"].items(), key=lambda kv: -kv[1]["total_ms"])
+        for phase, h in rows:
+            lines.append(
+                f"  {phase:<12}{h['count']:>7}{h['total_ms'] / 1000:>10.2f}{h['mean_ms']:>10.1f}"
+                f"{h['p50_ms']:>9g}{h['p95_ms']:>9g}{h['max_ms']:>10.1f}"
+            )
+        if data["slowest"]:
+            lines.append("  slowest:")
+            for s in data["slowest"][:5]:
+                where = "/".join(x for x in (s["supplier"], s["category"]) if x)
+                page = f" page {s['page']}" if s["page"] is not None else ""
+                lines.append(f"    {s['ms']:>9.1f} ms  {s['phase']} {where}{page}")
+        return "\n".join(lines)
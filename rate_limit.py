@@ -0,0 +1,150 @@
+"""Per-host request pacing shared by every page, tab and worker of a run.
+
+Each supplier's `rate_limit` section in scraper_config.yaml configures a
+token bucket for its host:
+
+    rate_limit:
+      requests_per_s: 2    # sustained rate; 0 disables pacing
+      burst: 4             # requests allowed back to back after a quiet spell
+      max_pages: 4         # pages open against the host at once
+
+Navigations, pagination clicks, scroll steps and static HTTP fetches each
+take a token before they hit the host. Waiting callers reserve their slot
+up front, so concurrent workers queue in order instead of polling. Time
+spent waiting is counted per host for the run summary.
+
+`max_pages` bounds browser contexts per supplier (together with
+max_concurrency) and how many url_template tabs a category may open.
+"""
+from __future__ import annotations
+
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional
+from urllib.parse import urlparse
+
+
+@dataclass
+class RateLimitConfig:
+    requests_per_s: float = 0.0  # 0 = unlimited
+    burst: int = 1
+    max_pages: int = 0  # 0 = unlimited
+
+    @property
+    def enabled(self) -> bool:
+        return self.requests_per_s > 0
+
+
+def parse_rate_limit_config(raw: Optional[Dict[str, Any]]) -> RateLimitConfig:
+    raw = raw or {}
+    return RateLimitConfig(
+        requests_per_s=max(0.0, float(raw.get("requests_per_s", 0.0))),
+        burst=max(1, int(raw.get("burst", 1))),
+        max_pages=max(0, int(raw.get("max_pages", 0))),
+    )
+
+
+def host_of(url: str) -> str:
+    return (urlparse(url).hostname or "").lower()
+
+
+class TokenBucket:
+    """Classic token bucket; reserve() hands out the time each caller may go."""
+
+    def __init__(self, rate: float, burst: int, clock: Callable[[], float] = time.monotonic):
+        self.rate = rate
+        self.burst = burst
+        self.clock = clock
+        self.tokens = float(burst)
+        self.updated = clock()
+
+    def reserve(self) -> float:
+        """Take a token, going into debt if needed; seconds until the caller may proceed."""
+        now = self.clock()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        self.tokens -= 1
+        return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+    def ready_in(self) -> float:
+        """Seconds until a token would be free, without taking one."""
+        tokens = min(self.burst, self.tokens + (self.clock() - self.updated) * self.rate)
+        return 0.0 if tokens >= 1 else (1 - tokens) / self.rate
+
+
+class RateLimiter:
+    """Token buckets and open-page counts per host."""
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic):
+        self.clock = clock
+        self._lock = threading.Lock()
+        self.configs: Dict[str, RateLimitConfig] = {}
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._open_pages: Dict[str, int] = {}
+        self.stats: Dict[str, Dict[str, float]] = {}
+
+    def configure(self, base_url: str, cfg: RateLimitConfig):
+        host = host_of(base_url)
+        with self._lock:
+            self.configs[host] = cfg
+            if cfg.enabled:
+                self._buckets[host] = TokenBucket(cfg.requests_per_s, cfg.burst, self.clock)
+            else:
+                self._buckets.pop(host, None)
+
+    def reserve(self, base_url: str) -> float:
+        """Take a token for the host; returns how long to wait before the request."""
+        host = host_of(base_url)
+        with self._lock:
+            bucket = self._buckets.get(host)
+            delay = bucket.reserve() if bucket is not None else 0.0
+            row = self.stats.setdefault(host, {"requests": 0, "waited_s": 0.0})
+            row["requests"] += 1
+            row["waited_s"] += delay
+        return delay
+
+    def wait(self, base_url: str, sleep: Callable[[float], None] = time.sleep) -> float:
+        delay = self.reserve(base_url)
+        if delay > 0:
+            sleep(delay)
+        return delay
+
+    def ready_in(self, base_url: str) -> float:
+        with self._lock:
+            bucket = self._buckets.get(host_of(base_url))
+            return bucket.ready_in() if bucket is not None else 0.0
+
+    def claim_pages(self, base_url: str, wanted: int, required: int = 0) -> int:
+        """Open up to `wanted` pages on the host, at least `required` regardless of the cap.
+
+        Returns how many were granted; hand them back with release_pages.
+        """
+        host = host_of(base_url)
+        with self._lock:
+            cap = self.configs.get(host, RateLimitConfig()).max_pages
+            current = self._open_pages.get(host, 0)
+            granted = wanted if not cap else max(required, min(wanted, cap - current))
+            self._open_pages[host] = current + granted
+            return granted
+
+    def release_pages(self, base_url: str, n: int):
+        host = host_of(base_url)
+        with self._lock:
+            self._open_pages[host] = max(0, self._open_pages.get(host, 0) - n)
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """Requests and seconds waited per host."""
+        with self._lock:
+            return {h: dict(r) for h, r in self.stats.items()}
+
+    def report(self) -> str:
+        with self._lock:
+            rows = {h: dict(r) for h, r in self.stats.items()}
+            configs = dict(self.configs)
+        parts = []
+        for host, r in rows.items():
+            cfg = configs.get(host, RateLimitConfig())
+            limit = f"{cfg.requests_per_s:g}/s burst {cfg.burst}" if cfg.enabled else "unlimited"
+            parts.append(f"{host} {int(r['requests'])} requests, waited {r['waited_s']:.1f}s ({limit})")
+        return "Rate limits: " + ("; ".join(parts) if parts else "none")
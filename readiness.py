@@ -0,0 +1,200 @@
+"""Condition-based readiness waits.
+
+Instead of sleeping a fixed amount after every navigation, click and scroll,
+the scraper waits for something concrete to happen on the page (cards present
+and settled, more cards after a scroll, the listing replaced after a
+pagination click), bounded by a configurable ceiling. Every wait records the
+wall time it consumed in WaitStats so slow pages show up in the run summary.
+
+A fixed delay still exists, but only as an explicit politeness setting.
+"""
+from __future__ import annotations
+
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+# Polling interval for page.wait_for_function, in ms.
+POLL_MS = 100
+
+# True once at least `min` cards exist and the count has not changed for
+# `stable` ms. State lives on window keyed by `token` so each wait starts fresh.
+_CARDS_SETTLED_JS = """
+({selector, min, stable, token}) => {
+  const n = document.querySelectorAll(selector).length;
+  const now = performance.now();
+  const s = window.__scraperReady;
+  if (!s || s.token !== token || s.n !== n) {
+    window.__scraperReady = {token, n, since: now};
+    return false;
+  }
+  return n >= min && now - s.since >= stable;
+}
+"""
+
+# True once the URL changed or the first card's text differs from before the
+# click (listings that paginate in place without touching the URL).
+_LISTING_CHANGED_JS = """
+({selector, url, first}) => {
+  if (location.href !== url) return true;
+  const card = document.querySelector(selector);
+  return !!card && (card.innerText || "") !== first;
+}
+"""
+
+_FIRST_CARD_TEXT_JS = """
+(selector) => {
+  const card = document.querySelector(selector);
+  return card ? (card.innerText || "") : "";
+}
+"""
+
+
+@dataclass
+class ReadinessConfig:
+    ready_timeout_ms: int = 10000  # ceiling for cards to appear and settle
+    stable_ms: int = 300  # card count unchanged this long counts as settled
+    navigation_timeout_ms: int = 10000  # ceiling for the listing to change after a next click
+    consent_timeout_ms: int = 3000  # ceiling for a cookie banner to show up
+    consent_probe_ms: int = 500  # same, when saved browser state should have dismissed it
+    politeness_delay_ms: int = 0  # optional fixed pause before navigations and clicks
+
+
+def parse_readiness_config(raw: Optional[Dict[str, Any]]) -> ReadinessConfig:
+    raw = raw or {}
+    defaults = ReadinessConfig()
+    return ReadinessConfig(**{
+        name: int(raw.get(name, getattr(defaults, name)))
+        for name in ReadinessConfig.__dataclass_fields__
+    })
+
+
+class WaitStats:
+    """Wall time spent per kind of wait, shared by every page of a run."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.waits: Dict[str, Dict[str, float]] = {}
+
+    def record(self, kind: str, seconds: float, met: bool):
+        with self._lock:
+            w = self.waits.setdefault(kind, {"count": 0, "seconds": 0.0, "timeouts": 0})
+            w["count"] += 1
+            w["seconds"] += seconds
+            if not met:
+                w["timeouts"] += 1
+
+    @contextmanager
+    def timed(self, kind: str):
+        """Time a block; the block sets outcome["met"] = False on a timeout."""
+        outcome = {"met": True}
+        started = time.perf_counter()
+        try:
+            yield outcome
+        finally:
+            self.record(kind, time.perf_counter() - started, outcome["met"])
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        with self._lock:
+            return {k: dict(v) for k, v in self.waits.items()}
+
+    def report(self) -> str:
+        parts = [
+            f"{kind} {w['seconds']:.1f}s/{int(w['count'])} ({int(w['timeouts'])} timed out)"
+            for kind, w in sorted(self.summary().items())
+        ]
+        return "Waits: " + (", ".join(parts) if parts else "none")
+
+
+def consent_locator(page, selectors: List[str]):
+    """One locator matching any of the consent button selectors."""
+    loc = page.locator(selectors[0])
+    for css in selectors[1:]:
+        loc = loc.or_(page.locator(css))
+    return loc.first
+
+
+# --- sync API --------------------------------------------------------------
+
+def _wait_js(page, stats: WaitStats, kind: str, js: str, arg: Dict[str, Any], timeout_ms: int) -> bool:
+    with stats.timed(kind) as outcome:
+        try:
+            page.wait_for_function(js, arg=arg, polling=POLL_MS, timeout=timeout_ms)
+        except Exception:
+            outcome["met"] = False
+    return outcome["met"]
+
+
+def wait_for_cards(page, selector: str, cfg: ReadinessConfig, stats: WaitStats, min_count: int = 1,
+                   timeout_ms: Optional[int] = None, kind: str = "cards_ready") -> bool:
+    """Wait until at least `min_count` cards exist and their count has settled."""
+    arg = {"selector": selector, "min": min_count, "stable": cfg.stable_ms, "token": time.perf_counter()}
+    return _wait_js(page, stats, kind, _CARDS_SETTLED_JS, arg, timeout_ms or cfg.ready_timeout_ms)
+
+
+def first_card_text(page, selector: str) -> str:
+    return page.evaluate(_FIRST_CARD_TEXT_JS, selector)
+
+
+def wait_for_listing_change(page, selector: str, old_url: str, old_first: str,
+                            cfg: ReadinessConfig, stats: WaitStats) -> bool:
+    arg = {"selector": selector, "url": old_url, "first": old_first}
+    return _wait_js(page, stats, "pagination", _LISTING_CHANGED_JS, arg, cfg.navigation_timeout_ms)
+
+
+def wait_for_visible(locator, timeout_ms: int, stats: WaitStats, kind: str, state: str = "visible") -> bool:
+    with stats.timed(kind) as outcome:
+        try:
+            locator.wait_for(state=state, timeout=timeout_ms)
+        except Exception:
+            outcome["met"] = False
+    return outcome["met"]
+
+
+def politeness_delay(page, cfg: ReadinessConfig):
+    if cfg.politeness_delay_ms > 0:
+        page.wait_for_timeout(cfg.politeness_delay_ms)
+
+
+# --- async API -------------------------------------------------------------
+
+async def _wait_js_async(page, stats: WaitStats, kind: str, js: str, arg: Dict[str, Any], timeout_ms: int) -> bool:
+    with stats.timed(kind) as outcome:
+        try:
+            await page.wait_for_function(js, arg=arg, polling=POLL_MS, timeout=timeout_ms)
+        except Exception:
+            outcome["met"] = False
+    return outcome["met"]
+
+
+async def wait_for_cards_async(page, selector: str, cfg: ReadinessConfig, stats: WaitStats, min_count: int = 1,
+                               timeout_ms: Optional[int] = None, kind: str = "cards_ready") -> bool:
+    arg = {"selector": selector, "min": min_count, "stable": cfg.stable_ms, "token": time.perf_counter()}
+    return await _wait_js_async(page, stats, kind, _CARDS_SETTLED_JS, arg, timeout_ms or cfg.ready_timeout_ms)
+
+
+async def first_card_text_async(page, selector: str) -> str:
+    return await page.evaluate(_FIRST_CARD_TEXT_JS, selector)
+
+
+async def wait_for_listing_change_async(page, selector: str, old_url: str, old_first: str,
+                                        cfg: ReadinessConfig, stats: WaitStats) -> bool:
+    arg = {"selector": selector, "url": old_url, "first": old_first}
+    return await _wait_js_async(page, stats, "pagination", _LISTING_CHANGED_JS, arg, cfg.navigation_timeout_ms)
+
+
+async def wait_for_visible_async(locator, timeout_ms: int, stats: WaitStats, kind: str,
+                                 state: str = "visible") -> bool:
+    with stats.timed(kind) as outcome:
+        try:
+            await locator.wait_for(state=state, timeout=timeout_ms)
+        except Exception:
+            outcome["met"] = False
+    return outcome["met"]
+
+
+async def politeness_delay_async(page, cfg: ReadinessConfig):
+    if cfg.politeness_delay_ms > 0:
+        await page.wait_for_timeout(cfg.politeness_delay_ms)
@@ -0,0 +1,170 @@
+"""Record listing pages during a crawl and replay extraction against them offline.
+
+A recording lives in data/recordings/<id>/:
+
+    manifest.json      every snapshot in crawl order: supplier, category,
+                       page number, URL and file
+    pages/<n>.html     the rendered DOM of a listing page (or scroll step),
+                       taken just before its cards were extracted
+    items.json         the items the crawl accepted from those pages
+    traffic-<n>.har    network traffic per browser context (--record-har)
+
+Replay opens each snapshot in Chromium through ReplayRoutes, a route handler
+that answers the main-frame navigation with the saved HTML (scripts
+removed, so nothing re-renders) and aborts every other request, or serves it
+from the recorded HARs. No request reaches the network. The current
+selectors and extraction plans then run over the snapshots, and the result
+is compared field by field with items.json via diff_items().
+"""
+from __future__ import annotations
+
+import json
+import os
+import re
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from snapshots import VOLATILE_FIELDS, index_rows
+
+_SCRIPT = re.compile(r"<script\b[^>]*>.*?</script\s*>", re.IGNORECASE | re.DOTALL)
+
+Key = Tuple[str, ...]
+
+
+def _write_json(path: Path, payload: Any):
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(json.dumps(payload, ensure_ascii=False, indent=1), encoding="utf-8")
+    os.replace(tmp, path)
+
+
+class Recorder:
+    """Writes page snapshots (and HAR paths) for one crawl; thread-safe."""
+
+    def __init__(self, root: Path, har: bool = False):
+        self.root = root
+        self.har = har
+        (root / "pages").mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self.pages: List[Dict[str, Any]] = []
+        self.items: List[Dict[str, Any]] = []
+        self.hars: List[str] = []
+        self.created_at = int(time.time())
+
+    def har_path(self) -> Optional[str]:
+        """A fresh HAR file for a new browser context, or None without --record-har."""
+        if not self.har:
+            return None
+        with self._lock:
+            name = f"traffic-{len(self.hars) + 1}.har"
+            self.hars.append(name)
+        return str(self.root / name)
+
+    def save_page(self, supplier: str, category: str, page_no: Optional[int], url: str, html: str):
+        with self._lock:
+            name = f"pages/{len(self.pages) + 1:05d}.html"
+            self.pages.append({"supplier": supplier, "category": category, "page": page_no, "url": url, "file": name})
+        (self.root / name).write_text(html, encoding="utf-8")
+
+    def add_items(self, items: List[Dict[str, Any]]):
+        with self._lock:
+            self.items.extend(items)
+
+    def close(self):
+        with self._lock:
+            manifest = {"created_at": self.created_at, "pages": list(self.pages), "hars": list(self.hars)}
+            items = list(self.items)
+        _write_json(self.root / "manifest.json", manifest)
+        _write_json(self.root / "items.json", items)
+
+
+class Recording:
+    """A recording directory, read back for replay."""
+
+    def __init__(self, root: Path):
+        self.root = root
+        manifest = json.loads((root / "manifest.json").read_text(encoding="utf-8"))
+        self.pages: List[Dict[str, Any]] = manifest["pages"]
+        self.hars: List[Path] = [root / name for name in manifest.get("hars", []) if (root / name).exists()]
+
+    @classmethod
+    def latest(cls, parent: Path) -> "Recording":
+        runs = sorted(p for p in parent.iterdir() if (p / "manifest.json").exists()) if parent.exists() else []
+        if not runs:
+            raise FileNotFoundError(f"No recordings under {parent}")
+        return cls(runs[-1])
+
+    def html(self, entry: Dict[str, Any]) -> str:
+        return _SCRIPT.sub("", (self.root / entry["file"]).read_text(encoding="utf-8"))
+
+    def items(self) -> List[Dict[str, Any]]:
+        path = self.root / "items.json"
+        return json.loads(path.read_text(encoding="utf-8")) if path.exists() else []
+
+
+class ReplayRoutes:
+    """Route handler serving `current` snapshot for main-frame navigations.
+
+    Install with install(context) before opening pages. Everything else is
+    answered from the recording's HARs when there are any, else aborted.
+    """
+
+    def __init__(self, recording: Recording):
+        self.recording = recording
+        self.current: Optional[Dict[str, Any]] = None
+
+    def install(self, context):
+        # Handlers run last-registered first: snapshots, then HARs, then abort
+        context.route("**/*", lambda route: route.abort())
+        for har in self.recording.hars:
+            context.route_from_har(str(har), not_found="fallback")
+        context.route("**/*", self.handle)
+
+    def handle(self, route):
+        request = route.request
+        if (
+            self.current is not None
+            and request.is_navigation_request()
+            and request.frame.parent_frame is None
+        ):
+            route.fulfill(status=200, content_type="text/html; charset=utf-8", body=self.recording.html(self.current))
+        else:
+            route.fallback()
+
+
+def diff_items(
+    old_rows: List[Dict[str, Any]], new_rows: List[Dict[str, Any]], key: Callable[[Dict[str, Any]], Key]
+) -> Dict[str, Any]:
+    """Items only in one side, and per-field changes for items in both."""
+    old = index_rows(old_rows, key)
+    new = index_rows(new_rows, key)
+    changed = []
+    field_counts: Dict[str, int] = {}
+    for k, item in new.items():
+        before = old.get(k)
+        if before is None:
+            continue
+        fields = {
+            f: [before.get(f), item.get(f)]
+            for f in sorted(set(before) | set(item))
+            if f not in VOLATILE_FIELDS and before.get(f) != item.get(f)
+        }
+        if fields:
+            changed.append({"key": list(k), "fields": fields})
+            for f in fields:
+                field_counts[f] = field_counts.get(f, 0) + 1
+    return {
+        "added": [item for k, item in new.items() if k not in old],
+        "removed": [item for k, item in old.items() if k not in new],
+        "changed": changed,
+        "changed_fields": field_counts,
+    }
+
+
+def summarize_diff(diff: Dict[str, Any]) -> str:
+    fields = ", ".join(f"{f} {n}" for f, n in sorted(diff["changed_fields"].items(), key=lambda kv: -kv[1]))
+    return (
+        f"vs recording: {len(diff['added'])} added, {len(diff['removed'])} removed, "
+        f"{len(diff['changed'])} changed" + (f" ({fields})" if fields else "")
+    )
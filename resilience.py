@@ -0,0 +1,258 @@
+"""Retries, backoff and a per-supplier circuit breaker for crawl requests.
+
+Failures are sorted into a few kinds:
+
+- timeout: the page, a click or the HTTP request did not finish in time
+- navigation: the request itself failed (DNS, connection reset, net::ERR_*)
+- blocked: the site answered with an anti-bot or captcha page (403/429/503,
+  or a challenge page title)
+- selector: the page loaded but the card selector matched nothing
+
+Timeouts, navigation failures and blocked pages are retried up to `attempts`
+times with jittered exponential backoff. Selector misses are only counted,
+since loading the same page again does not fix a selector.
+
+Each supplier has a circuit breaker. After `breaker_failures` consecutive
+failed requests (retries exhausted), requests to it raise CircuitOpen for
+`breaker_cooldown_s`. After that, requests go through again: one success
+closes the breaker, and one more failure opens it again. The crawl loops
+re-queue a failed category up to `requeue` times. They also replace the
+browser context after `recycle_after` failed categories in a row.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import random
+import re
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+log = logging.getLogger(__name__)
+
+TIMEOUT = "timeout"
+NAVIGATION = "navigation"
+BLOCKED = "blocked"
+SELECTOR = "selector"
+CIRCUIT = "circuit"
+
+RETRYABLE = frozenset({TIMEOUT, NAVIGATION, BLOCKED})
+
+BLOCK_STATUSES = frozenset({403, 429, 503})
+# Titles of the challenge pages served by the usual bot-protection vendors
+BLOCK_TITLE = re.compile(
+    r"captcha|datadome|access denied|attention required|just a moment|are you a robot|pardon our interruption",
+    re.IGNORECASE,
+)
+_TITLE = re.compile(r"<title[^>]*>(.*?)</title>", re.IGNORECASE | re.DOTALL)
+
+
+class CrawlError(Exception):
+    """A failure the scraper recognised itself, with its kind."""
+
+    def __init__(self, kind: str, message: str):
+        super().__init__(message)
+        self.kind = kind
+
+
+class CircuitOpen(CrawlError):
+    def __init__(self, key: str):
+        super().__init__(CIRCUIT, f"circuit open for {key}")
+
+
+def classify(exc: BaseException) -> str:
+    if isinstance(exc, CrawlError):
+        return exc.kind
+    # Playwright's TimeoutError, httpx.ReadTimeout, asyncio.TimeoutError, ...
+    if isinstance(exc, TimeoutError) or "Timeout" in type(exc).__name__:
+        return TIMEOUT
+    return NAVIGATION
+
+
+def html_title(text: str) -> str:
+    match = _TITLE.search(text[:20000])
+    return match.group(1).strip() if match else ""
+
+
+def check_blocked(status: Optional[int], title: str = ""):
+    """Raise a `blocked` CrawlError for an anti-bot response."""
+    if status in BLOCK_STATUSES:
+        raise CrawlError(BLOCKED, f"HTTP {status}")
+    if title and BLOCK_TITLE.search(title):
+        raise CrawlError(BLOCKED, f"challenge page {title[:60]!r}")
+
+
+@dataclass
+class RetryConfig:
+    attempts: int = 3  # tries per request, the first included
+    backoff_ms: int = 500  # delay before the first retry; doubles per retry
+    max_backoff_ms: int = 8000
+    jitter: float = 0.5  # fraction of each delay that is randomised
+    recycle_after: int = 2  # failed categories in a row before a fresh browser context
+    requeue: int = 1  # times a failed category is put back in the queue
+    breaker_failures: int = 5  # consecutive failed requests that open a supplier's circuit
+    breaker_cooldown_s: float = 120.0
+
+
+def parse_retry_config(raw: Optional[Dict[str, Any]]) -> RetryConfig:
+    raw = raw or {}
+    defaults = RetryConfig()
+    return RetryConfig(**{
+        name: type(getattr(defaults, name))(raw.get(name, getattr(defaults, name)))
+        for name in RetryConfig.__dataclass_fields__
+    })
+
+
+def backoff_s(cfg: RetryConfig, retry: int, rng: random.Random) -> float:
+    """Delay before retry number `retry` (1-based): exponential, capped, jittered down."""
+    base = min(cfg.max_backoff_ms, cfg.backoff_ms * 2 ** (retry - 1)) / 1000
+    return base * (1 - cfg.jitter * rng.random())
+
+
+class CircuitBreaker:
+    def __init__(self, failures: int, cooldown_s: float, clock: Callable[[], float] = time.monotonic):
+        self.failures = failures
+        self.cooldown_s = cooldown_s
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._consecutive: Dict[str, int] = {}
+        self._opened_at: Dict[str, float] = {}
+        self.trips: Dict[str, int] = {}
+
+    def allow(self, key: str) -> bool:
+        with self._lock:
+            opened = self._opened_at.get(key)
+            return opened is None or self.clock() - opened >= self.cooldown_s
+
+    def record_success(self, key: str):
+        with self._lock:
+            self._consecutive[key] = 0
+            self._opened_at.pop(key, None)
+
+    def record_failure(self, key: str):
+        with self._lock:
+            n = self._consecutive[key] = self._consecutive.get(key, 0) + 1
+            if self.failures and n >= self.failures:
+                if key not in self._opened_at or self.clock() - self._opened_at[key] >= self.cooldown_s:
+                    self.trips[key] = self.trips.get(key, 0) + 1
+                self._opened_at[key] = self.clock()
+
+
+class Resilience:
+    """Retry policy, circuit breakers and failure counts shared by a run."""
+
+    def __init__(
+        self,
+        cfg: Optional[RetryConfig] = None,
+        clock: Callable[[], float] = time.monotonic,
+        rng: Optional[random.Random] = None,
+    ):
+        self.cfg = cfg or RetryConfig()
+        self.breaker = CircuitBreaker(self.cfg.breaker_failures, self.cfg.breaker_cooldown_s, clock)
+        self.rng = rng or random.Random()
+        self._lock = threading.Lock()
+        self._requeues: Dict[Tuple[str, str], int] = {}
+        self.rows: Dict[str, Dict[str, int]] = {}
+
+    def count(self, key: str, what: str, n: int = 1):
+        with self._lock:
+            row = self.rows.setdefault(key, {})
+            row[what] = row.get(what, 0) + n
+
+    def _failed(self, key: str, exc: BaseException, attempt: int, what: str) -> Optional[float]:
+        """Record a failed attempt; the backoff before the next one, or None to give up."""
+        kind = classify(exc)
+        self.count(key, kind)
+        if kind not in RETRYABLE or attempt >= self.cfg.attempts:
+            self.breaker.record_failure(key)
+            self.count(key, "gave_up")
+            return None
+        delay = backoff_s(self.cfg, attempt, self.rng)
+        log.warning("%s for %s failed (%s: %s); retrying in %.1fs", what or "Request", key, kind, exc, delay)
+        self.count(key, "retries")
+        return delay
+
+    def _succeeded(self, key: str, attempt: int):
+        self.breaker.record_success(key)
+        if attempt > 1:
+            self.count(key, "recovered")
+
+    def call(self, key: str, fn: Callable[[], Any], sleep: Callable[[float], Any] = time.sleep, what: str = "") -> Any:
+        """Run `fn` with retries; raises its last error, or CircuitOpen."""
+        if not self.breaker.allow(key):
+            self.count(key, CIRCUIT)
+            raise CircuitOpen(key)
+        attempt = 1
+        while True:
+            try:
+                result = fn()
+            except Exception as e:
+                delay = self._failed(key, e, attempt, what)
+                if delay is None:
+                    raise
+                sleep(delay)
+                attempt += 1
+            else:
+                self._succeeded(key, attempt)
+                return result
+
+    async def call_async(
+        self,
+        key: str,
+        fn: Callable[[], Awaitable[Any]],
+        sleep: Callable[[float], Awaitable[Any]] = asyncio.sleep,
+        what: str = "",
+    ) -> Any:
+        if not self.breaker.allow(key):
+            self.count(key, CIRCUIT)
+            raise CircuitOpen(key)
+        attempt = 1
+        while True:
+            try:
+                result = await fn()
+            except Exception as e:
+                delay = self._failed(key, e, attempt, what)
+                if delay is None:
+                    raise
+                await sleep(delay)
+                attempt += 1
+            else:
+                self._succeeded(key, attempt)
+                return result
+
+    def claim_requeue(self, supplier: str, category: str) -> bool:
+        """True (and counted) while the category may go back in the queue."""
+        with self._lock:
+            n = self._requeues.get((supplier, category), 0)
+            if n >= self.cfg.requeue:
+                return False
+            self._requeues[(supplier, category)] = n + 1
+        self.count(supplier, "requeued")
+        return True
+
+    def summary(self) -> Dict[str, Dict[str, int]]:
+        """Counts per supplier (or supplier tier): failure kinds, retries, requeues, recycles."""
+        with self._lock:
+            return {k: dict(r) for k, r in self.rows.items()}
+
+    def report(self) -> str:
+        rows = self.summary()
+        trips = dict(self.breaker.trips)
+        parts = []
+        for key in sorted(set(rows) | set(trips)):
+            r = rows.get(key, {})
+            kinds = ", ".join(f"{k} {r[k]}" for k in (TIMEOUT, NAVIGATION, BLOCKED, SELECTOR) if r.get(k))
+            part = f"{key} {kinds or 'no errors'}"
+            extras = [
+                f"{what.replace('_', ' ')} {r[what]}"
+                for what in ("retries", "recovered", "gave_up", "requeued", "recycled")
+                if r.get(what)
+            ]
+            if trips.get(key):
+                extras.append(f"circuit opened {trips[key]}x, {r.get(CIRCUIT, 0)} requests refused")
+            if extras:
+                part += " (" + ", ".join(extras) + ")"
+            parts.append(part)
+        return "Failures: " + ("; ".join(parts) if parts else "none")
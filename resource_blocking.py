@@ -0,0 +1,165 @@
+"""Request interception that drops resources the scraper never reads.
+
+Listing pages are only read for text and `src`/`srcset` attribute strings, so
+images, fonts, media and third-party trackers can be aborted before they are
+downloaded. Rules come from each supplier's `blocking` section in
+scraper_config.yaml:
+
+    blocking:
+      resource_types: [image, font, media]
+      deny_domains: [google-analytics.com, doubleclick.net]
+      allow_domains: [cdn.example.com]
+
+`deny_domains` are always aborted. When `allow_domains` is set, any host
+outside it (and outside the supplier's own domain) is aborted as third-party.
+"""
+from __future__ import annotations
+
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+from urllib.parse import urlparse
+
+# Rough median transfer sizes, only used to estimate what blocking saved.
+# Blocked requests are never downloaded, so their real size is unknown.
+TYPICAL_BYTES = {
+    "image": 45_000,
+    "media": 400_000,
+    "font": 35_000,
+    "stylesheet": 25_000,
+    "script": 30_000,
+    "xhr": 5_000,
+    "fetch": 5_000,
+}
+DEFAULT_TYPICAL_BYTES = 10_000
+
+
+@dataclass
+class BlockingConfig:
+    resource_types: List[str] = field(default_factory=list)
+    deny_domains: List[str] = field(default_factory=list)
+    allow_domains: List[str] = field(default_factory=list)
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.resource_types or self.deny_domains or self.allow_domains)
+
+
+def parse_blocking_config(raw: Optional[Dict[str, Any]]) -> BlockingConfig:
+    raw = raw or {}
+    return BlockingConfig(
+        resource_types=[str(t).lower() for t in raw.get("resource_types", [])],
+        deny_domains=[str(d).lower() for d in raw.get("deny_domains", [])],
+        allow_domains=[str(d).lower() for d in raw.get("allow_domains", [])],
+    )
+
+
+def host_matches(host: str, domains: List[str]) -> bool:
+    """True when `host` is one of `domains` or a subdomain of one."""
+    return any(host == d or host.endswith("." + d) for d in domains)
+
+
+def registrable_domain(url: str) -> str:
+    """Naive eTLD+1: "www.castorama.fr" -> "castorama.fr"."""
+    host = (urlparse(url).hostname or "").lower()
+    parts = host.split(".")
+    return ".".join(parts[-2:]) if len(parts) > 2 else host
+
+
+def should_block(cfg: BlockingConfig, url: str, resource_type: str, first_party: str) -> Optional[str]:
+    """Return the reason a request should be aborted, or None to let it through."""
+    if url.startswith("data:"):
+        return None
+    host = (urlparse(url).hostname or "").lower()
+    if cfg.deny_domains and host_matches(host, cfg.deny_domains):
+        return "deny_domain"
+    if resource_type in cfg.resource_types:
+        return "resource_type"
+    if cfg.allow_domains and not host_matches(host, cfg.allow_domains + [first_party]):
+        return "third_party"
+    return None
+
+
+class BlockingStats:
+    """Run-wide counters, shared by every context (and thread) of a crawl."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.blocked: Dict[str, int] = {}
+        self.blocked_reasons: Dict[str, int] = {}
+        self.bytes_saved_est = 0
+        self.responses = 0
+        self.bytes_received = 0
+
+    def record_blocked(self, resource_type: str, reason: str):
+        with self._lock:
+            self.blocked[resource_type] = self.blocked.get(resource_type, 0) + 1
+            self.blocked_reasons[reason] = self.blocked_reasons.get(reason, 0) + 1
+            self.bytes_saved_est += TYPICAL_BYTES.get(resource_type, DEFAULT_TYPICAL_BYTES)
+
+    def record_response(self, content_length: Optional[str]):
+        with self._lock:
+            self.responses += 1
+            if content_length and content_length.isdigit():
+                self.bytes_received += int(content_length)
+
+    def summary(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "blocked_requests": sum(self.blocked.values()),
+                "blocked_by_type": dict(self.blocked),
+                "blocked_by_reason": dict(self.blocked_reasons),
+                "bytes_saved_est": self.bytes_saved_est,
+                "responses": self.responses,
+                "bytes_received": self.bytes_received,
+            }
+
+    def report(self) -> str:
+        s = self.summary()
+        by_type = ", ".join(f"{k}={v}" for k, v in sorted(s["blocked_by_type"].items())) or "none"
+        return (
+            f"Blocked {s['blocked_requests']} requests ({by_type}), "
+            f"~{s['bytes_saved_est'] / 1e6:.1f} MB saved (estimated); "
+            f"received {s['bytes_received'] / 1e6:.1f} MB over {s['responses']} responses"
+        )
+
+
+def make_route_handler(cfg: BlockingConfig, stats: BlockingStats, base_url: str):
+    """Route handler for the sync API (context.route("**/*", handler))."""
+    first_party = registrable_domain(base_url)
+
+    def handler(route):
+        request = route.request
+        reason = should_block(cfg, request.url, request.resource_type, first_party)
+        if reason:
+            stats.record_blocked(request.resource_type, reason)
+            route.abort()
+        else:
+            route.continue_()
+
+    return handler
+
+
+def make_async_route_handler(cfg: BlockingConfig, stats: BlockingStats, base_url: str):
+    """Route handler for the async API."""
+    first_party = registrable_domain(base_url)
+
+    async def handler(route):
+        request = route.request
+        reason = should_block(cfg, request.url, request.resource_type, first_party)
+        if reason:
+            stats.record_blocked(request.resource_type, reason)
+            await route.abort()
+        else:
+            await route.continue_()
+
+    return handler
+
+
+def make_response_listener(stats: BlockingStats):
+    """context.on("response", ...) listener counting bytes actually received."""
+
+    def listener(response):
+        stats.record_response(response.headers.get("content-length"))
+
+    return listener
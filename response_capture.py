@@ -0,0 +1,143 @@
+"""Capture listing data straight from the JSON responses a page loads.
+
+Infinite scroll and client-rendered listings fetch their products as JSON
+before drawing any card. A supplier can declare those endpoints and a field
+mapping in scraper_config.yaml:
+
+    capture:
+      url_patterns: ["*/api/*/search*"]
+      items_path: "data.products"
+      fields:
+        name: "title"
+        url: "url"
+        price: "price.amount"
+        currency: "price.currency"
+        brand: "brand.name"
+        unit: "unit"
+        image_url: "images.0.url"
+
+Matching responses are parsed while the page loads and turned into the same
+item dicts as card extraction; pages where nothing matched fall back to the
+DOM.
+"""
+from __future__ import annotations
+
+import fnmatch
+import logging
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+log = logging.getLogger(__name__)
+
+ITEM_FIELDS = ("name", "url", "price", "currency", "brand", "unit", "image_url")
+
+
+@dataclass
+class CaptureConfig:
+    url_patterns: List[str]
+    items_path: str = ""
+    fields: Dict[str, str] = field(default_factory=dict)
+
+    def matches(self, url: str) -> bool:
+        return any(fnmatch.fnmatchcase(url, pattern) for pattern in self.url_patterns)
+
+
+def parse_capture_config(raw: Optional[Dict[str, Any]]) -> Optional[CaptureConfig]:
+    if not raw or not raw.get("url_patterns"):
+        return None
+    fields = {k: str(v) for k, v in (raw.get("fields") or {}).items() if k in ITEM_FIELDS}
+    return CaptureConfig(
+        url_patterns=[str(p) for p in raw["url_patterns"]],
+        items_path=str(raw.get("items_path", "")),
+        fields=fields,
+    )
+
+
+def dig(obj: Any, path: str) -> Any:
+    """Follow a dotted path ("images.0.url") through dicts and lists."""
+    if not path:
+        return obj
+    for part in path.split("."):
+        if isinstance(obj, dict):
+            obj = obj.get(part)
+        elif isinstance(obj, list) and part.isdigit() and int(part) < len(obj):
+            obj = obj[int(part)]
+        else:
+            return None
+    return obj
+
+
+def rows_from_payload(payload: Any, cfg: CaptureConfig) -> List[Dict[str, Any]]:
+    """Map every product in a JSON payload to {item field: raw value}."""
+    products = dig(payload, cfg.items_path)
+    if not isinstance(products, list):
+        return []
+    return [
+        {name: dig(product, path) for name, path in cfg.fields.items()}
+        for product in products
+        if isinstance(product, dict)
+    ]
+
+
+class ResponseCollector:
+    """Buffers rows from matching responses until the scraper drains them."""
+
+    def __init__(self, cfg: CaptureConfig):
+        self.cfg = cfg
+        self._lock = threading.Lock()
+        self._rows: List[Dict[str, Any]] = []
+        self.responses = 0
+
+    def add_payload(self, payload: Any):
+        rows = rows_from_payload(payload, self.cfg)
+        with self._lock:
+            self.responses += 1
+            self._rows.extend(rows)
+
+    def drain(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            rows, self._rows = self._rows, []
+        return rows
+
+    def listener(self, response):
+        """Sync API: page.on("response", collector.listener), one collector per tab."""
+        if not self.cfg.matches(response.url):
+            return
+        try:
+            self.add_payload(response.json())
+        except Exception as e:
+            log.warning("Could not parse captured response %s: %s", response.url, e)
+
+    async def listener_async(self, response):
+        if not self.cfg.matches(response.url):
+            return
+        try:
+            self.add_payload(await response.json())
+        except Exception as e:
+            log.warning("Could not parse captured response %s: %s", response.url, e)
+
+
+class SourceStats:
+    """Counts accepted items per supplier and extraction path ("network" / "dom")."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counts: Dict[str, Dict[str, int]] = {}
+
+    def record(self, supplier: str, source: str, n: int = 1):
+        with self._lock:
+            per = self.counts.setdefault(supplier, {})
+            per[source] = per.get(source, 0) + n
+
+    def summary(self) -> Dict[str, Dict[str, int]]:
+        with self._lock:
+            return {supplier: dict(per) for supplier, per in self.counts.items()}
+
+    def report(self) -> str:
+        with self._lock:
+            parts = [
+                f"{supplier} " + "/".join(f"{src}={n}" for src, n in sorted(per.items()))
+                for supplier, per in self.counts.items()
+            ]
+        return "Item sources: " + (", ".join(parts) if parts else "none")
@@ -2,21 +2,80 @@ from __future__ import annotations
 
 import argparse
 import json
+import logging
 import os
 import re
+import threading
 import time
-from dataclasses import dataclass
+from dataclasses import dataclass, field, replace
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+from urllib.parse import urljoin
 
 import yaml
 from playwright.sync_api import sync_playwright, Page
 
+from http_fetch import HttpFetcher, TierStats, extract_static, next_link, parse_html
+from readiness import (
+    ReadinessConfig,
+    WaitStats,
+    consent_locator,
+    first_card_text,
+    parse_readiness_config,
+    politeness_delay,
+    wait_for_cards,
+    wait_for_listing_change,
+    wait_for_visible,
+)
+from browser_state import ConsentState
+from checkpoint import CategoryProgress, CheckpointStore
+from crawl_log import LoggingConfig, Sampler, log_context, parse_logging_config, setup_logging, stop_logging
+from recording import Recorder, Recording, ReplayRoutes, diff_items, summarize_diff
+from rate_limit import RateLimiter, RateLimitConfig, parse_rate_limit_config
+from resilience import SELECTOR, Resilience, RetryConfig, check_blocked, html_title, parse_retry_config
+from metrics import CrawlCounters, MetricsServer
+from profiling import Profiler
+from selector_stats import SelectorStats
+from snapshots import SnapshotStore, summarize
+from storage import (
+    ItemSink,
+    JsonlSink,
+    SqliteSink,
+    dedupe_key,
+    iter_jsonl,
+    iter_sqlite_items,
+    materialize_json,
+)
+from response_capture import (
+    CaptureConfig,
+    ResponseCollector,
+    SourceStats,
+    parse_capture_config,
+)
+from resource_blocking import (
+    BlockingConfig,
+    BlockingStats,
+    make_response_listener,
+    make_route_handler,
+    parse_blocking_config,
+)
+
+# Named explicitly: run as a script this module is __main__
+log = logging.getLogger("scraper")
+
 ROOT = Path(__file__).parent.resolve()
 CONFIG_PATH = ROOT / "config" / "scraper_config.yaml"
 DATA_DIR = ROOT / "data"
 DATA_DIR.mkdir(parents=True, exist_ok=True)
 OUTPUT_JSON = DATA_DIR / "materials.json"
+OUTPUT_JSONL = DATA_DIR / "materials.jsonl"
+CHECKPOINT_PATH = DATA_DIR / "checkpoint.jsonl"
+VERSIONS_DIR = DATA_DIR / "versions"
+OUTPUT_DB = DATA_DIR / "materials.db"
+SELECTOR_STATS_PATH = DATA_DIR / "selector_stats.json"
+BROWSER_STATE_DIR = DATA_DIR / "browser_state"
+RUN_PROFILE_PATH = DATA_DIR / "run_profile.json"
+RECORDINGS_DIR = DATA_DIR / "recordings"
 
 
 def now_ts() -> int:
@@ -79,7 +138,12 @@ class CategoryConfig:
     max_pages: int = 12
     load_more_button: Optional[str] = None
     scroll_steps: int = 25
-    scroll_wait_ms: int = 400
+    scroll_wait_ms: int = 400  # ceiling for new cards to appear after a scroll
+    page_template: Optional[str] = None  # url_template mode, e.g. "?page={n}"
+    first_page: int = 1  # page number of `url` itself
+    parallel_pages: int = 4  # url_template pages fetched at once
+    render: str = "auto"  # "optional" tries the HTTP tier first even with fetch: browser; "required" never does
+    static_min_cards: int = 1  # fewer cards in the static HTML -> use the browser
 
 
 @dataclass
@@ -87,6 +151,19 @@ class SupplierConfig:
     supplier: str
     base_url: str
     categories: List[CategoryConfig]
+    max_concurrency: int = 1  # browser contexts open at once against this supplier
+    blocking: BlockingConfig = field(default_factory=BlockingConfig)
+    capture: Optional[CaptureConfig] = None  # JSON listing endpoints to read items from
+    plan: "ExtractionPlan" = field(default_factory=lambda: GENERIC_PLAN)  # how card fields are read
+    rate_limit: RateLimitConfig = field(default_factory=RateLimitConfig)  # pacing of requests to base_url's host
+    consent: List[str] = field(default_factory=list)  # cookie-banner accept buttons, tried in order
+
+    @property
+    def context_cap(self) -> int:
+        """Browser contexts allowed at once: max_concurrency, bounded by rate_limit.max_pages."""
+        if self.rate_limit.max_pages:
+            return max(1, min(self.max_concurrency, self.rate_limit.max_pages))
+        return self.max_concurrency
 
 
 @dataclass
@@ -94,10 +171,23 @@ class ScraperConfig:
     headless: bool
     user_agent: Optional[str]
     suppliers: List[SupplierConfig]
+    extraction: str = "bulk"
+    concurrency: int = 1  # browser contexts crawling at once
+    per_category: bool = False  # schedule categories, not whole suppliers
+    block_resources: bool = True  # honour each supplier's `blocking` rules
+    readiness: ReadinessConfig = field(default_factory=ReadinessConfig)
+    fetch: str = "browser"  # "hybrid" tries plain HTTP before Chromium
+    browser_state: bool = True  # reuse cookies saved after accepting consent banners
+    retry: RetryConfig = field(default_factory=RetryConfig)  # retries, re-queueing and circuit breakers
+    profile: bool = True  # time each crawl phase into data/run_profile.json
+    metrics_port: int = 0  # serve Prometheus metrics on localhost while crawling; 0 = off
+    logging: LoggingConfig = field(default_factory=LoggingConfig)  # level, JSON/text, card sampling
 
 
 def load_config(path: Path) -> ScraperConfig:
     raw = yaml.safe_load(path.read_text(encoding="utf-8"))
+    # Field chains are compiled here, once, and reused for every card
+    default_plan = parse_extraction_config(raw.get("default_fields"))
     sups: List[SupplierConfig] = []
     for s in raw["suppliers"]:
         cats: List[CategoryConfig] = []
@@ -114,6 +204,11 @@ def load_config(path: Path) -> ScraperConfig:
                     load_more_button=paging.get("load_more_button"),
                     scroll_steps=int(paging.get("scroll_steps", 25)),
                     scroll_wait_ms=int(paging.get("scroll_wait_ms", 400)),
+                    page_template=paging.get("template"),
+                    first_page=int(paging.get("first_page", 1)),
+                    parallel_pages=max(1, int(paging.get("parallel_pages", 4))),
+                    render=c.get("render", "auto"),
+                    static_min_cards=int(c.get("static_min_cards", 1)),
                 )
             )
         sups.append(
@@ -121,15 +216,151 @@ def load_config(path: Path) -> ScraperConfig:
                 supplier=s["supplier"],
                 base_url=s["base_url"],
                 categories=cats,
+                max_concurrency=max(1, int(s.get("max_concurrency", 1))),
+                blocking=parse_blocking_config(s.get("blocking")),
+                capture=parse_capture_config(s.get("capture")),
+                plan=parse_extraction_config(s.get("fields"), default_plan),
+                rate_limit=parse_rate_limit_config(s.get("rate_limit")),
+                consent=parse_consent_config(s.get("consent")),
             )
         )
     return ScraperConfig(
         headless=bool(raw.get("headless", True)),
         user_agent=raw.get("user_agent"),
         suppliers=sups,
+        extraction=raw.get("extraction", "bulk"),
+        concurrency=max(1, int(raw.get("concurrency", 1))),
+        per_category=bool(raw.get("per_category", False)),
+        readiness=parse_readiness_config(raw.get("readiness")),
+        fetch=raw.get("fetch", "browser"),
+        browser_state=bool(raw.get("browser_state", True)),
+        retry=parse_retry_config(raw.get("retry")),
+        profile=bool(raw.get("profile", True)),
+        metrics_port=int(raw.get("metrics_port", 0)),
+        logging=parse_logging_config(raw.get("logging")),
     )
 
 
+@dataclass
+class CrawlSession:
+    """Run-wide settings and counters shared by every page of a crawl."""
+    readiness: ReadinessConfig = field(default_factory=ReadinessConfig)
+    blocking: BlockingStats = field(default_factory=BlockingStats)
+    waits: WaitStats = field(default_factory=WaitStats)
+    sources: SourceStats = field(default_factory=SourceStats)
+    tiers: TierStats = field(default_factory=TierStats)
+    http: Optional[HttpFetcher] = None  # set in hybrid fetch mode or when a category has render: optional
+    hybrid: bool = False  # every category without render: required tries the HTTP tier first
+    sink: Optional[ItemSink] = None  # accepted items are streamed here as well
+    checkpoint: Optional[CheckpointStore] = None  # per-page progress journal
+    selectors: SelectorStats = field(default_factory=SelectorStats)  # which fallback selectors win
+    consent: ConsentState = field(default_factory=ConsentState)  # accepted banners and saved cookies
+    limiter: RateLimiter = field(default_factory=RateLimiter)  # per-host token buckets
+    resilience: Resilience = field(default_factory=Resilience)  # retries and per-supplier circuit breakers
+    profile: Profiler = field(default_factory=lambda: Profiler(enabled=False))  # per-phase timing spans
+    counters: CrawlCounters = field(default_factory=CrawlCounters)  # pages, cards and item outcomes
+    card_sample: Sampler = field(default_factory=lambda: Sampler(LoggingConfig().card_sample_rate))  # DEBUG cards
+    recorder: Optional[Recorder] = None  # page snapshots for offline replay (--record)
+
+    @classmethod
+    def for_config(cls, cfg: ScraperConfig) -> "CrawlSession":
+        hybrid = cfg.fetch == "hybrid"
+        opted_in = any(c.render == "optional" for s in cfg.suppliers for c in s.categories)
+        http = HttpFetcher(cfg.user_agent) if hybrid or opted_in else None
+        consent = ConsentState(BROWSER_STATE_DIR if cfg.browser_state else None)
+        limiter = RateLimiter()
+        for s in cfg.suppliers:
+            limiter.configure(s.base_url, s.rate_limit)
+        return cls(
+            readiness=cfg.readiness,
+            http=http,
+            hybrid=hybrid,
+            consent=consent,
+            limiter=limiter,
+            resilience=Resilience(cfg.retry),
+            profile=Profiler(enabled=cfg.profile),
+            card_sample=Sampler(cfg.logging.card_sample_rate),
+        )
+
+    def report(self) -> str:
+        lines = [
+            self.counters.report(),
+            self.blocking.report(),
+            self.waits.report(),
+            self.sources.report(),
+            self.tiers.report(),
+            self.selectors.report(),
+            self.consent.report(),
+            self.limiter.report(),
+            self.resilience.report(),
+        ]
+        if self.checkpoint is not None:
+            lines.append(self.checkpoint.report())
+        return "\n".join(lines)
+
+    def tries_http(self, cat: CategoryConfig) -> bool:
+        """Whether `cat` is fetched over plain HTTP before Chromium renders it."""
+        if self.http is None or cat.render == "required":
+            return False
+        return self.hybrid or cat.render == "optional"
+
+    def saved_progress(self, supplier: str, category: str) -> CategoryProgress:
+        if self.checkpoint is None:
+            return CategoryProgress()
+        return self.checkpoint.progress(supplier, category)
+
+    def close(self):
+        if self.http is not None:
+            self.http.close()
+
+
+def save_progress(
+    session: CrawlSession,
+    supplier: SupplierConfig,
+    cat: CategoryConfig,
+    page_no: int,
+    pending: List[Dict[str, Any]],
+    next_url: str = "",
+    done: bool = False,
+):
+    """Checkpoint the items accepted since the last call, then clear `pending`.
+
+    The sink is flushed first so a resumed run never restores an item the
+    JSONL file lost.
+    """
+    if session.sink is not None:
+        session.sink.flush()
+    if session.checkpoint is not None:
+        session.checkpoint.record(
+            supplier.supplier, cat.name, page_no, list(pending), [dedupe_key(i) for i in pending], next_url, done
+        )
+    pending.clear()
+
+
+def page_sleep(page: Page):
+    """A sleep(seconds) for retry backoff that keeps Playwright's event loop running."""
+    return lambda seconds: page.wait_for_timeout(seconds * 1000)
+
+
+def pace(page: Page, session: CrawlSession, supplier: SupplierConfig):
+    """Politeness delay, then wait for a token from the supplier host's rate limit."""
+    politeness_delay(page, session.readiness)
+    delay = session.limiter.reserve(supplier.base_url)
+    if delay > 0:
+        page.wait_for_timeout(delay * 1000)
+
+
+def resume_url(cat: CategoryConfig, saved: CategoryProgress) -> str:
+    """Where a partially finished category restarts."""
+    if not saved.page:
+        return cat.url
+    if cat.paging_mode == "url_template" and cat.page_template:
+        return page_url(cat, cat.first_page + saved.page)
+    if cat.paging_mode != "infinite_scroll" and saved.next_url:
+        return saved.next_url
+    return cat.url
+
+
 NAME_HINTS = [
     ".a-designation__label",
     "[data-test-id='product-tile-title']",
@@ -196,29 +427,75 @@ LINK_HINTS = [
 ]
 
 
-def first_text(page_or_card, selectors: List[str]) -> str:
+def first_text(
+    page_or_card,
+    selectors: List[str],
+    stats: Optional[SelectorStats] = None,
+    supplier: str = "",
+    key: str = "",
+) -> str:
+    """Text of the first selector that matches something non-empty.
+
+    With `stats`, the winner (or a miss) is recorded for this supplier and
+    field. Selectors are tried in the given order; ExtractionPlan.for_supplier
+    registers them and ranks adaptive fields once per page.
+    """
     for css in selectors:
         try:
             loc = page_or_card.locator(css)
             if loc.count() > 0:
                 txt = loc.first.inner_text().strip()
                 if txt:
+                    if stats is not None:
+                        stats.record(supplier, key, css)
                     return clean_text(txt)
         except Exception:
             continue
+    if stats is not None:
+        stats.record(supplier, key, None)
     return ""
 
 
-def first_attr(page_or_card, selectors: List[str], attr: str) -> str:
+def first_attr(
+    page_or_card,
+    selectors: List[str],
+    attr: str,
+    stats: Optional[SelectorStats] = None,
+    supplier: str = "",
+    key: str = "",
+) -> str:
+    """`attr` of the first selector that has it set; `stats` as in first_text."""
+    return first_attrs(page_or_card, selectors, (attr,), stats, supplier, key)
+
+
+def first_attrs(
+    page_or_card,
+    selectors: List[str],
+    attrs: Sequence[str],
+    stats: Optional[SelectorStats] = None,
+    supplier: str = "",
+    key: str = "",
+) -> str:
+    """First non-empty attribute among `attrs` of each selector's first match.
+
+    Selector by selector, then attribute by attribute, as BULK_EXTRACT_JS
+    and the static tier read them; `stats` as in first_text.
+    """
     for css in selectors:
         try:
             loc = page_or_card.locator(css)
             if loc.count() > 0:
-                val = loc.first.get_attribute(attr)
-                if val:
-                    return val.strip()
+                el = loc.first
+                for attr in attrs:
+                    val = (el.get_attribute(attr) or "").strip()
+                    if val:
+                        if stats is not None:
+                            stats.record(supplier, key, css)
+                        return val
         except Exception:
             continue
+    if stats is not None:
+        stats.record(supplier, key, None)
     return ""
 
 
@@ -232,242 +509,410 @@ def resolve_url(href: str, base_url: str) -> str:
     return base_url.rstrip("/") + "/" + href
 
 
-def extract_from_card(card, category_name: str, supplier: str, base_url: str) -> Dict[str, Any]:
-    if supplier == "ManoMano":
-        try:
-            name = card.get_attribute("title") or first_text(card, ["[data-testid='product-card-listings-title']", "p"])
-            
-            href = card.get_attribute("href")
-            product_url = resolve_url(href, base_url)
-            
-            price_elem = card.locator("[data-testid='price-main']").first
-            price_text = ""
-            if price_elem:
-                price_text = price_elem.inner_text()
-            
-            if not price_text:
-                price_text = first_text(card, [".nkATTd", "span:has-text('€')"])
-            
-            currency, price = parse_price_with_currency(price_text)
-            
-            brand = ""
-            try:
-                brand_img = card.locator("[data-testid='brand-image']").first
-                if brand_img.is_visible(timeout=2000):  # Use a short timeout
-                    brand = brand_img.get_attribute("alt", timeout=2000) or ""
-            except Exception:
-                pass
-            
-            unit = ""
-            
-            image_url = ""
-            try:
-                img = card.locator("[data-testid='image']").first
-                if img and img.is_visible(timeout=2000):
-                    srcset = img.get_attribute("srcset", timeout=2000)
-                    if srcset:
-                        urls = srcset.split(",")
-                        for url_part in urls:
-                            parts = url_part.strip().split(" ")
-                            if len(parts) >= 1:
-                                if "2x" in url_part:  
-                                    image_url = parts[0]
-                                    break
-                                elif not image_url: 
-                                    image_url = parts[0]
-                    
-                    # Fallback to src
-                    if not image_url:
-                        image_url = img.get_attribute("src", timeout=2000) or ""
-            except Exception as e:
-                print(f"Error getting image: {e}")
-            
-            print(f"ManoMano extraction: name={name}, price={price}, image_url={image_url}")
-            
-            return {
-                "supplier": supplier,
-                "category": category_name,
-                "name": name,
-                "price": price,
-                "currency": currency,
-                "url": product_url,
-                "brand": brand,
-                "unit": unit,
-                "image_url": image_url,
-                "timestamp": now_ts(),
-            }
-        
-        except Exception as e:
-            import traceback
-            print(f"Error extracting ManoMano card: {e}")
-            traceback.print_exc()
-            
-            # Return a minimal valid item instead of None
-            return {
-                "supplier": supplier,
-                "category": category_name,
-                "name": "Error extracting product",
-                "price": 0,
-                "currency": "€",
-                "url": base_url,  
-                "brand": "",
-                "unit": "",
-                "image_url": "",
-                "timestamp": now_ts(),
-                "error": str(e)
-            }
-    elif supplier == "Leroy Merlin":
-        try:
-            name = first_text(card, [".a-designation__label", ".a-designation"])
-            if not name:
-                name_link = card.locator(".a-designation[title]").first
-                if name_link:
-                    name = name_link.get_attribute("title") or ""
-            href = first_attr(card, [".a-designation"], "href")
-            product_url = resolve_url(href, base_url)
-            
-            price_text = first_text(card, [".m-price.-main .m-price__line", ".m-price:not(.-crossed) .m-price__line"])
-            if not price_text:
-                price_text = first_text(card, [".o-thumbnailPrice .m-price.-main"])
-            currency, price = parse_price_with_currency(price_text)
-
-            brand = first_text(card, [".a-vendor__name"])
-
-            unit = ""
-            unit_text = first_text(card, [".m-price.-secondary .m-price__unit", ".m-price__unit"])
-            if unit_text:
-                unit_match = re.search(r'/\s+(\w+)', unit_text)
-                if unit_match:
-                   unit = unit_match.group(1)
-            
-            image_url = ""
-            img = card.locator(".a-illustration__img").first
-            if img:
-                image_url = img.get_attribute("src") or ""
-            
-            if not image_url:
-                # Look for the highest resolution image in picture sources
-                sources = card.locator("picture source")
-                highest_width = 0
-                for i in range(sources.count()):
-                    source = sources.nth(i)
-                    srcset = source.get_attribute("srcset") or ""
-                    media = source.get_attribute("media") or ""
-                    
-                    # Try to extract width from media query
-                    width_match = re.search(r'width=(\d+)', srcset)
-                    if width_match:
-                        width = int(width_match.group(1))
-                        if width > highest_width:
-                            highest_width = width
-                            image_url = re.sub(r'\?.*$', '', srcset) 
-            if not image_url:
-                image_url = first_attr(card, ["img[src]"], "src")
-            
-            print(f"Leroy Merlin extraction: name={name}, price={price}, image_url={image_url}")
-
-            return {
-                "supplier": supplier,
-                "category": category_name,
-                "name": name,
-                "price": price,
-                "currency": currency,
-                "url": product_url,
-                "brand": brand,
-                "unit": unit,
-                "image_url": image_url,
-                "timestamp": now_ts(),
-            }
-        except Exception as e:
-            import traceback
-            print(f"Error extracting Leroy Merlin card: {e}")
-            traceback.print_exc()
-            return {
-                "supplier": supplier,
-                "category": category_name,
-                "name": "Error extracting product",
-                "price": 0,
-                "currency": "€",
-                "url": base_url,  
-                "brand": "",
-                "unit": "",
-                "image_url": "",
-                "timestamp": now_ts(),
-                "error": str(e)
-            }
-
-    name = first_text(card, NAME_HINTS)
-    price_text = first_text(card, PRICE_HINTS)
-    currency, price = parse_price_with_currency(price_text)
-    brand = first_text(card, BRAND_HINTS)
-    unit = first_text(card, UNIT_HINTS)
+def page_url(cat: CategoryConfig, n: int) -> str:
+    """URL of listing page `n` from cat.page_template.
+
+    Templates starting with "?" or "&" are appended to the category URL as
+    query parameters; anything else is resolved like a product link.
+    """
+    tpl = (cat.page_template or "").format(n=n)
+    if tpl[:1] in ("?", "&"):
+        sep = "&" if "?" in cat.url else "?"
+        return cat.url + sep + tpl[1:]
+    return resolve_url(tpl, cat.url)
+
+
+def _read_field(card, spec: FieldSpec, stats: Optional[SelectorStats] = None, supplier: str = ""):
+    """Resolve one FieldSpec with per-card locators, mirroring BULK_EXTRACT_JS."""
+    if spec.all:
+        values: List[str] = []
+        for css in spec.selectors:
+            if css == SELF:
+                elements = [card]
+            else:
+                loc = card.locator(css)
+                elements = [loc.nth(i) for i in range(loc.count())]
+            for el in elements:
+                for attr in spec.attrs:
+                    val = (el.get_attribute(attr) or "").strip()
+                    if val:
+                        values.append(val)
+        return values
+
+    if spec.selectors == [SELF]:
+        if not spec.attrs:
+            return (card.inner_text() or "").strip()
+        for attr in spec.attrs:
+            val = (card.get_attribute(attr) or "").strip()
+            if val:
+                return val
+        return ""
+    if not spec.attrs:
+        return first_text(card, spec.selectors, stats, supplier, spec.key)
+    return first_attrs(card, spec.selectors, spec.attrs, stats, supplier, spec.key)
+
+
+def extract_from_card(
+    card,
+    category_name: str,
+    supplier: str,
+    base_url: str,
+    stats: Optional[SelectorStats] = None,
+    plan: Optional[ExtractionPlan] = None,
+) -> Dict[str, Any]:
+    """Per-card locator walk over the supplier's extraction plan (the slow path).
+
+    With `stats`, pass the plan from ExtractionPlan.for_supplier, built once
+    per page, so the selectors are registered and adaptive fields ranked.
+    """
+    plan = plan or GENERIC_PLAN
+    raw = {spec.key: _read_field(card, spec, stats, supplier) for spec in plan.specs}
+    return plan.item(raw, category_name, supplier, base_url)
+
+
+# --- Extraction plans --------------------------------------------------------
+#
+# Each item field is read through a chain of FieldSpecs: a selector list, the
+# attribute to read (or the text), and post-processing such as a regex or a
+# srcset candidate pick. The first spec that yields a value wins. Chains come
+# from the suppliers' `fields` sections of the config and are compiled once
+# per supplier into an ExtractionPlan by load_config.
+#
+# The bulk path ships the compiled plan to the page and resolves every spec
+# of every card in a single evaluate_all call; the static tier runs the same
+# plan with lxml. Python only post-processes the raw strings that come back.
+
+ITEM_FIELDS = ("name", "price", "url", "brand", "unit", "image_url")
+PICKS = ("first", "srcset", "widest")
+
+SELF = ""  # selector meaning "the card element itself"
+
+
+@dataclass
+class FieldSpec:
+    selectors: List[str]
+    attrs: Tuple[str, ...] = ()  # empty -> innerText
+    all: bool = False  # collect values from every match instead of the first hit
+    match: Optional[re.Pattern] = None  # keep group 1 (or the whole match) of matching values
+    exclude: Optional[re.Pattern] = None  # drop values this matches
+    pick: str = "first"  # "srcset": best srcset candidate; "widest": largest width=N
+    strip_query: bool = False
+    adaptive: bool = False  # selectors are interchangeable, so try the most frequent winners first
+    key: str = ""  # raw key; assigned by ExtractionPlan
+
+    def value(self, raw: Dict[str, Any]) -> str:
+        found = raw.get(self.key)
+        values = [v for v in (found if isinstance(found, list) else [found]) if v]
+        if not self.attrs:
+            values = [clean_text(v) for v in values]
+        if self.exclude is not None:
+            values = [v for v in values if not self.exclude.search(v)]
+        if self.match is not None:
+            values = [m.group(m.lastindex or 0) for m in map(self.match.search, values) if m]
+        if not values:
+            return ""
+        if self.pick == "srcset":
+            value = pick_srcset_candidate(values[0])
+        elif self.pick == "widest":
+            widths = [(int(m.group(1)), v) for v in values for m in [re.search(r"width=(\d+)", v)] if m]
+            value = max(widths, key=lambda wv: wv[0])[1] if widths else ""
+        else:
+            value = values[0]
+        if self.strip_query:
+            value = re.sub(r"\?.*$", "", value)
+        return value
+
+
+_HAS_TEXT = re.compile(r"^(.*):has-text\((['\"])(.*)\2\)$")
+
+BULK_EXTRACT_JS = """
+(cards, {plan, mark}) => {
+  const query = (root, sel) => {
+    if (!sel.css) return [root];
+    let found;
+    try {
+      found = Array.from(root.querySelectorAll(sel.css));
+    } catch (e) {
+      return [];
+    }
+    if (sel.has_text) {
+      const needle = sel.has_text.toLowerCase();
+      found = found.filter(el => (el.textContent || "").toLowerCase().includes(needle));
+    }
+    return found;
+  };
+  const read = (el, attrs) => {
+    if (!attrs.length) return [el.innerText || ""];
+    return attrs.map(a => el.getAttribute(a) || "");
+  };
+  const pick = (card, field, hits) => {
+    if (field.all) {
+      const values = [];
+      for (const sel of field.selectors)
+        for (const el of query(card, sel))
+          for (const v of read(el, field.attrs)) if (v.trim()) values.push(v.trim());
+      return values;
+    }
+    for (let i = 0; i < field.selectors.length; i++) {
+      const found = query(card, field.selectors[i]);
+      if (!found.length) continue;
+      for (const v of read(found[0], field.attrs)) {
+        if (v.trim()) {
+          hits[field.key] = i;
+          return v.trim();
+        }
+      }
+    }
+    return "";
+  };
+  const names = plan.filter(f => f.key === "name" || f.key.startsWith("name."));
+  const fresh = mark ? cards.filter(card => !card.hasAttribute(mark)) : cards;
+  return fresh.map(card => {
+    const raw = {}, hits = {};
+    for (const field of plan) raw[field.key] = pick(card, field, hits);
+    raw.__hits = hits;
+    // A card still hydrating has no name yet: leave it for the next call
+    if (mark && names.some(f => raw[f.key].length)) card.setAttribute(mark, "1");
+    return raw;
+  });
+}
+"""
+
+
+def compile_selector(css: str) -> Dict[str, str]:
+    """Translate a Playwright selector into something querySelectorAll accepts."""
+    m = _HAS_TEXT.match(css)
+    if m:
+        return {"css": m.group(1) or "*", "has_text": m.group(3)}
+    return {"css": css, "has_text": ""}
+
 
+def compile_plan(fields: List[FieldSpec]) -> List[Dict[str, Any]]:
+    return [
+        {
+            "key": f.key,
+            # "source" keeps the selector as configured, for hit statistics
+            "selectors": [dict(compile_selector(css), source=css) for css in f.selectors],
+            "attrs": list(f.attrs),
+            "all": f.all,
+        }
+        for f in fields
+    ]
+
+
+def pick_srcset_candidate(srcset: str) -> str:
+    """Prefer the 2x candidate of a srcset, otherwise the first one."""
     image_url = ""
-    
-    direct_img = (
-        first_attr(card, IMAGE_HINTS, "src")
-        or first_attr(card, IMAGE_HINTS, "data-src")
-        or first_attr(card, IMAGE_HINTS, "data-original")
+    for url_part in srcset.split(","):
+        parts = url_part.strip().split(" ")
+        if "2x" in url_part:
+            return parts[0]
+        if not image_url:
+            image_url = parts[0]
+    return image_url
+
+
+@dataclass
+class ExtractionPlan:
+    """Field chains for one supplier, compiled once and reused for every card."""
+    fields: Dict[str, List[FieldSpec]]
+    specs: List[FieldSpec] = field(init=False)
+    _compiled: List[Dict[str, Any]] = field(init=False, repr=False)
+
+    def __post_init__(self):
+        # Raw keys: "name" for a field's first spec, then "name.1", "name.2"...
+        self.fields = {
+            name: [replace(spec, key=name if i == 0 else f"{name}.{i}") for i, spec in enumerate(chain)]
+            for name, chain in self.fields.items()
+        }
+        self.specs = [spec for chain in self.fields.values() for spec in chain]
+        self._compiled = compile_plan(self.specs)
+
+    def for_supplier(self, stats: Optional[SelectorStats], supplier: str) -> ExtractionPlan:
+        """The plan to run for one page of `supplier`, with `stats` learning its selectors.
+
+        `adaptive` fields get their selectors ranked by recorded hits, every
+        selector still tried in turn; all other fields keep the configured
+        (priority) order. Without adaptive fields this is the plan itself.
+        """
+        if stats is None:
+            return self
+        for spec in self.specs:
+            if not spec.all:
+                stats.register(supplier, spec.key, spec.selectors)
+        if not any(spec.adaptive and not spec.all for spec in self.specs):
+            return self
+        return ExtractionPlan({
+            name: [
+                replace(spec, selectors=stats.ranked(supplier, spec.key, spec.selectors))
+                if spec.adaptive and not spec.all else spec
+                for spec in chain
+            ]
+            for name, chain in self.fields.items()
+        })
+
+    def compiled(self, stats: Optional[SelectorStats] = None, supplier: str = "") -> List[Dict[str, Any]]:
+        """The plan for BULK_EXTRACT_JS / extract_static, as for_supplier() runs it."""
+        return self.for_supplier(stats, supplier)._compiled
+
+    def item(self, raw: Dict[str, Any], category_name: str, supplier: str, base_url: str) -> Dict[str, Any]:
+        """Turn one card's raw strings into an item dict."""
+        values = {
+            name: next((v for v in (spec.value(raw) for spec in chain) if v), "")
+            for name, chain in self.fields.items()
+        }
+        currency, price = parse_price_with_currency(values.get("price", ""))
+        return {
+            "supplier": supplier,
+            "category": category_name,
+            "name": clean_text(values.get("name")),
+            "price": price,
+            "currency": currency,
+            "url": resolve_url(values.get("url", ""), base_url),
+            "brand": clean_text(values.get("brand")),
+            "unit": clean_text(values.get("unit")),
+            "image_url": values.get("image_url", ""),
+            "timestamp": now_ts(),
+        }
+
+
+_DATA_URI = re.compile(r"^data:image")
+_HTTPS_URL = re.compile(r"(https://[^,\s]+)")
+
+# Used for suppliers without a `fields` section and as the "default" chain
+# those sections can extend
+GENERIC_PLAN = ExtractionPlan({
+    "name": [FieldSpec(NAME_HINTS)],
+    "price": [FieldSpec(PRICE_HINTS)],
+    "brand": [FieldSpec(BRAND_HINTS)],
+    "unit": [FieldSpec(UNIT_HINTS)],
+    "image_url": [
+        FieldSpec(IMAGE_HINTS, ("src",), exclude=_DATA_URI),
+        FieldSpec(IMAGE_HINTS, ("data-src",), exclude=_DATA_URI),
+        FieldSpec(IMAGE_HINTS, ("data-original",), exclude=_DATA_URI),
+        FieldSpec(IMAGE_HINTS, ("srcset",), all=True, match=_HTTPS_URL),
+        FieldSpec(IMAGE_HINTS, ("data-srcset",), all=True, match=_HTTPS_URL),
+    ],
+    "url": [FieldSpec(LINK_HINTS, ("href",))],
+})
+
+
+def parse_field_spec(name: str, raw: Dict[str, Any]) -> FieldSpec:
+    unknown = set(raw) - {"selectors", "attr", "attrs", "all", "match", "exclude", "pick", "strip_query", "adaptive"}
+    if unknown:
+        raise ValueError(f"Unknown keys in extraction spec for {name!r}: {', '.join(sorted(unknown))}")
+    selectors = raw.get("selectors") or [SELF]
+    if isinstance(selectors, str):
+        selectors = [selectors]
+    attrs = raw.get("attrs") or ([raw["attr"]] if raw.get("attr") else [])
+    pick = raw.get("pick", "first")
+    if pick not in PICKS:
+        raise ValueError(f"pick for {name!r} must be one of {', '.join(PICKS)}, got {pick!r}")
+    return FieldSpec(
+        selectors=[str(css) for css in selectors],
+        attrs=tuple(attrs),
+        all=bool(raw.get("all", False)),
+        match=re.compile(raw["match"]) if raw.get("match") else None,
+        exclude=re.compile(raw["exclude"]) if raw.get("exclude") else None,
+        pick=pick,
+        strip_query=bool(raw.get("strip_query", False)),
+        adaptive=bool(raw.get("adaptive", False)),
     )
-    
-    if direct_img and not direct_img.startswith("data:image"):
-        image_url = direct_img
-    else:
-        for attr in ["srcset", "data-srcset"]:
-            for selector in IMAGE_HINTS:
-                try:
-                    img_elements = card.locator(selector)
-                    for i in range(img_elements.count()):
-                        srcset = img_elements.nth(i).get_attribute(attr)
-                        if srcset and "https://" in srcset:
-                            # Extract URL from srcset (which may contain multiple URLs)
-                            url_match = re.search(r'(https://[^,\s]+)', srcset)
-                            if url_match and not url_match.group(1).startswith("data:image"):
-                                image_url = url_match.group(1)
-                                break
-                    if image_url:
-                        break
-                except Exception:
-                    continue
-            if image_url:
-                break
-    
-    # For Castorama specifically
-    if not image_url and supplier == "Castorama":
-        try:
-            all_imgs = card.locator("img")
-            for i in range(all_imgs.count()):
-                img = all_imgs.nth(i)
-                for attr in ["srcset", "data-srcset", "src", "data-src"]:
-                    val = img.get_attribute(attr) or ""
-                    if "media.castorama.fr" in val:
-                        # Extract just the URL part
-                        url_part = re.search(r'(https://media\.castorama\.fr/[^,\s]+)', val)
-                        if url_part:
-                            image_url = url_part.group(1)
-                            break
-                if image_url:
-                    break
-        except Exception:
-            pass
 
-    href = first_attr(card, LINK_HINTS, "href")
-    product_url = resolve_url(href, base_url)
 
-    item = {
+def parse_extraction_config(raw: Optional[Dict[str, Any]], base: Optional[ExtractionPlan] = None) -> ExtractionPlan:
+    """Compile a `fields` config section on top of `base` (GENERIC_PLAN by default).
+
+    Each listed field replaces the base chain for that field; an entry
+    "default" splices the base chain in at that point. Fields not listed keep
+    the base chain, and an empty list disables a field.
+    """
+    base = base or GENERIC_PLAN
+    if not raw:
+        return base
+    fields = dict(base.fields)
+    for name, entries in raw.items():
+        if name not in ITEM_FIELDS:
+            raise ValueError(f"Unknown extraction field {name!r}, expected one of {', '.join(ITEM_FIELDS)}")
+        chain: List[FieldSpec] = []
+        for entry in entries or []:
+            if entry == "default":
+                chain.extend(base.fields.get(name, []))
+            else:
+                chain.append(parse_field_spec(name, entry))
+        fields[name] = chain
+    return ExtractionPlan(fields)
+
+
+def item_from_raw(
+    raw: Dict[str, Any],
+    category_name: str,
+    supplier: str,
+    base_url: str,
+    plan: Optional[ExtractionPlan] = None,
+) -> Dict[str, Any]:
+    """Turn the raw strings returned by BULK_EXTRACT_JS into an item dict."""
+    return (plan or GENERIC_PLAN).item(raw, category_name, supplier, base_url)
+
+
+# Stamped on cards that have already been extracted so that incremental
+# collection (infinite scroll) only pays for the newly appeared tail.
+SEEN_MARKER = "data-scraper-seen"
+_SEEN_ATTR = re.compile(rf'\s{SEEN_MARKER}="[^"]*"')
+
+
+def unmarked(html: str) -> str:
+    """`html` without the SEEN_MARKER stamps, as the site served it."""
+    return _SEEN_ATTR.sub("", html)
+
+
+def item_from_capture(row: Dict[str, Any], category_name: str, supplier: str, base_url: str) -> Dict[str, Any]:
+    """Turn a row mapped from a captured JSON response into an item dict."""
+    price = row.get("price")
+    currency = row.get("currency")
+    if isinstance(price, (int, float)) and not isinstance(price, bool):
+        price = float(price)
+    else:
+        parsed_currency, price = parse_price_with_currency(clean_text(str(price or "")))
+        currency = currency or parsed_currency
+    return {
         "supplier": supplier,
         "category": category_name,
-        "name": name,
+        "name": clean_text(str(row.get("name") or "")),
         "price": price,
-        "currency": currency,
-        "url": product_url,
-        "brand": brand,
-        "unit": unit,
-        "image_url": image_url,
+        "currency": currency or ("€" if price is not None else None),
+        "url": resolve_url(str(row.get("url") or ""), base_url),
+        "brand": clean_text(str(row.get("brand") or "")),
+        "unit": clean_text(str(row.get("unit") or "")),
+        "image_url": str(row.get("image_url") or ""),
         "timestamp": now_ts(),
     }
 
-    return item
+
+def extract_cards_bulk(
+    cards,
+    category_name: str,
+    supplier: str,
+    base_url: str,
+    mark: Optional[str] = None,
+    stats: Optional[SelectorStats] = None,
+    plan: Optional[ExtractionPlan] = None,
+) -> List[Dict[str, Any]]:
+    """Extract every card matched by the `cards` locator in one browser round trip.
+
+    With `mark`, cards already carrying that attribute are skipped and the
+    extracted ones are stamped, so repeated calls only return new cards.
+    Cards whose name did not resolve (skeletons still hydrating) are left
+    unstamped and read again by the next call.
+    With `stats`, this page's winning selectors are recorded. `plan`
+    defaults to GENERIC_PLAN.
+    """
+    plan = plan or GENERIC_PLAN
+    compiled = plan.compiled(stats, supplier)
+    raws = cards.evaluate_all(BULK_EXTRACT_JS, {"plan": compiled, "mark": mark})
+    if stats is not None:
+        stats.record_raws(supplier, compiled, raws)
+    return [plan.item(raw, category_name, supplier, base_url) for raw in raws]
 
 
 def do_pagination(page: Page, next_button_selector: Optional[str]) -> bool:
@@ -503,93 +948,384 @@ def do_infinite_scroll(page: Page, steps: int, wait_ms: int):
         page.mouse.wheel(0, 4000)
         page.wait_for_timeout(max(100, wait_ms))
 
-def scrape_category(page: Page, cat: CategoryConfig, supplier: SupplierConfig, target_min: int) -> List[Dict[str, Any]]:
-    """Scrape a single category page, handling pagination and collecting items."""
-    url = cat.url
-    print(f"Scraping {supplier.supplier}/{cat.name} from {url}")
-    
-    # Navigate to the category page
-    page.goto(url, wait_until="domcontentloaded")
-    page.wait_for_timeout(1000)  # give JS time to start
-    
-    # Handle site-specific cookie consents and initial setup
-    if supplier.supplier == "Leroy Merlin":
+# Cookie-banner accept buttons for suppliers without a `consent` list; a
+# list's "default" entry splices these in.
+DEFAULT_CONSENT_SELECTORS: List[str] = [
+    "#didomi-notice-agree-button",
+    "#onetrust-accept-btn-handler",
+    'button:has-text("Accepter")',
+    'button:has-text("Accept all")',
+    'button:has-text("J\'accepte")',
+]
+
+
+def parse_consent_config(raw: Optional[List[str]]) -> List[str]:
+    """A supplier's `consent` list; missing means the defaults, [] no banner handling."""
+    if raw is None:
+        return list(DEFAULT_CONSENT_SELECTORS)
+    selectors: List[str] = []
+    for entry in raw:
+        selectors.extend(DEFAULT_CONSENT_SELECTORS if entry == "default" else [str(entry)])
+    return selectors
+
+
+def handle_consent(page: Page, supplier_cfg: SupplierConfig, session: CrawlSession) -> bool:
+    """Click the supplier's cookie banner if one of its `consent` buttons shows up; True when clicked.
+
+    When consent was already given (saved browser state, or an earlier
+    category of this run) the banner is only probed for consent_probe_ms.
+    After a click the context's storage state is saved for later runs.
+    """
+    selectors = supplier_cfg.consent
+    if not selectors:
+        return False
+    supplier, base_url = supplier_cfg.supplier, supplier_cfg.base_url
+    ready = session.readiness
+    known = session.consent.known(supplier)
+    started = time.perf_counter()
+    try:
+        consent = consent_locator(page, selectors)
+        timeout_ms = ready.consent_probe_ms if known else ready.consent_timeout_ms
+        if not wait_for_visible(consent, timeout_ms, session.waits, "consent"):
+            session.consent.record_absent(
+                supplier, time.perf_counter() - started, known, ready.consent_timeout_ms / 1000
+            )
+            return False
+        consent.click()
+        log.debug("Clicked cookie consent button on %s", supplier)
+        wait_for_visible(consent, ready.consent_timeout_ms, session.waits, "consent_dismiss", "hidden")
+        session.consent.record_clicked(
+            supplier, base_url, time.perf_counter() - started, page.context.storage_state() if base_url else None
+        )
+        return True
+    except Exception as e:
+        log.warning("Cookie handling error for %s (non-critical): %s", supplier, e)
+    return False
+
+
+def scrape_category(
+    page: Page,
+    cat: CategoryConfig,
+    supplier: SupplierConfig,
+    target_min: int,
+    extraction: str = "bulk",
+    session: Optional[CrawlSession] = None,
+) -> List[Dict[str, Any]]:
+    """Scrape a single category page, handling pagination and collecting items.
+
+    `extraction` selects between one evaluate_all per page ("bulk") and the
+    per-card locator walk ("locator"). Bulk falls back to locators on error.
+    `session` carries readiness ceilings and run-wide counters.
+
+    When the supplier declares `capture` endpoints, products parsed from
+    matching JSON responses are used first and the DOM only when nothing was
+    captured for a page. Each item records its path in "source".
+
+    With a checkpoint store, categories finished by a previous run return
+    their saved items and partial ones restart at their saved page.
+    """
+    session = session or CrawlSession()
+    saved = session.saved_progress(supplier.supplier, cat.name)
+    if saved.done:
+        log.info(
+            "Skipping %s/%s: finished in a previous run (%d items)", supplier.supplier, cat.name, saved.count
+        )
+        return list(saved.items)
+    # Items a sink already holds from before the resume count toward the target
+    target_min -= saved.count - len(saved.items)
+    category_span = session.profile.span("category", supplier.supplier, cat.name)
+    with log_context(supplier=supplier.supplier, category=cat.name), category_span:
+        if session.tries_http(cat):
+            static_items = scrape_category_static(cat, supplier, target_min, session)
+            if static_items is not None:
+                return static_items
+
+        started = time.perf_counter()
+        collector = ResponseCollector(supplier.capture) if supplier.capture else None
+        listener = collector.listener if collector else None
+        if listener:
+            # On the page, not the context: parallel tabs capture for themselves
+            page.on("response", listener)
+        # The main page always counts against the host's max_pages
+        session.limiter.claim_pages(supplier.base_url, 1, required=1)
         try:
-            # Wait a bit longer for Leroy Merlin's page to fully load
-            page.wait_for_load_state("networkidle", timeout=10000)
-            
-            # Handle cookie consent dialog - with proper escaping
-            for selector in [
-                "#didomi-notice-agree-button",
-                'button:has-text("Accepter")',
-                'button:has-text("Accept all")',
-                'button:has-text("J\'accepte")'
-            ]:
-                try:
-                    consent = page.locator(selector).first
-                    if consent and consent.is_visible(timeout=3000):
-                        consent.click()
-                        print("Clicked cookie consent button on Leroy Merlin")
-                        page.wait_for_timeout(1000)
-                        break
-                except Exception as e:
-                    print(f"Failed with selector {selector}: {e}")
+            items = _scrape_category(page, cat, supplier, target_min, extraction, session, collector)
         except Exception as e:
-            print(f"Error handling Leroy Merlin cookie consent: {e}")
-    
-    elif supplier.supplier == "ManoMano":
+            session.tiers.record(supplier.supplier, cat.name, "browser", time.perf_counter() - started, False, str(e))
+            raise
+        finally:
+            session.limiter.release_pages(supplier.base_url, 1)
+            if listener:
+                page.remove_listener("response", listener)
+        session.tiers.record(supplier.supplier, cat.name, "browser", time.perf_counter() - started, True)
+        return items
+
+
+def scrape_category_static(
+    cat: CategoryConfig,
+    supplier: SupplierConfig,
+    target_min: int,
+    session: CrawlSession,
+) -> Optional[List[Dict[str, Any]]]:
+    """HTTP-first attempt at a category. Returns None to escalate to the browser.
+
+    Listing HTML is fetched with session.http and parsed with the supplier's
+    compiled extraction plan. Click pagination follows the next link's href
+    and url_template pages are fetched in turn. Infinite scroll only
+    escalates when the first page alone does not reach `target_min`.
+    """
+    started = time.perf_counter()
+    plan = supplier.plan.compiled(session.selectors, supplier.supplier)
+    saved = session.saved_progress(supplier.supplier, cat.name)
+    items: List[Dict[str, Any]] = list(saved.items)
+    restored = len(items)
+    seen_keys = set(saved.keys)
+    # Accepted but not yet written out. Items only reach the sink and the
+    # checkpoint once their page is final, so an escalation never leaves
+    # behind items the browser tier will collect again.
+    pending: List[Dict[str, Any]] = []
+
+    def escalate(reason: str) -> None:
+        log.info("HTTP tier insufficient for %s/%s: %s", supplier.supplier, cat.name, reason)
+        session.tiers.record(supplier.supplier, cat.name, "http", time.perf_counter() - started, False, reason)
+        return None
+
+    def emit(page_no: int, next_url: str = "", done: bool = False):
+        if session.sink is not None:
+            for item in pending:
+                session.sink.write(item)
+        save_progress(session, supplier, cat, page_no, pending, next_url, done)
+
+    def fetch(url: str) -> Tuple[int, str]:
+        session.limiter.wait(supplier.base_url)
+        status, text = session.http.fetch(url)
+        check_blocked(status, html_title(text))
+        return status, text
+
+    url = resume_url(cat, saved)
+    pages_seen = saved.page if url != cat.url else 0
+    fetched = 0
+    cut_short = False  # a later page failed; the last emit() already saved where to resume
+    while url and pages_seen < cat.max_pages and len(items) < target_min:
         try:
-            # Handle ManoMano's cookie consent
-            for selector in [
-                "button[data-testid='cookie-banner-accept-button']",
-                "#didomi-notice-agree-button",
-                'button:has-text("Accepter")',
-                'button:has-text("Accept all")'
-            ]:
-                try:
-                    consent = page.locator(selector).first
-                    if consent and consent.is_visible(timeout=3000):
-                        consent.click()
-                        print("Clicked cookie consent button on ManoMano")
-                        page.wait_for_timeout(1000)
-                        break
-                except:
-                    pass
+            # The HTTP tier has its own breaker: a site that only blocks
+            # plain clients must not open the circuit for the browser
+            with session.profile.span("http_fetch", supplier.supplier, cat.name, pages_seen + 1):
+                status, text = session.resilience.call(
+                    f"{supplier.supplier} (http)", lambda: fetch(url), what="HTTP fetch"
+                )
         except Exception as e:
-            print(f"Cookie handling error for ManoMano (non-critical): {e}")
+            if not fetched:
+                return escalate(f"request failed: {e}")
+            cut_short = True
+            break
+        if status != 200:
+            if not fetched:
+                return escalate(f"HTTP {status}")
+            cut_short = True
+            break
+
+        with session.profile.span("parse", supplier.supplier, cat.name, pages_seen + 1):
+            root = parse_html(text)
+            raws = extract_static(root, cat.card, plan)
+        session.selectors.record_raws(supplier.supplier, plan, raws)
+        pages_seen += 1
+        fetched += 1
+        if fetched == 1 and len(raws) < cat.static_min_cards:
+            return escalate(f"{len(raws)} cards in static HTML, expected {cat.static_min_cards}")
+        if not raws:
+            break
+        duplicates = 0
+        for raw in raws:
+            item = supplier.plan.item(raw, cat.name, supplier.supplier, supplier.base_url)
+            if item["name"] and item["url"] != supplier.base_url:
+                key = dedupe_key(item)
+                if key in seen_keys:
+                    duplicates += 1
+                    continue
+                item["source"] = "html"
+                items.append(item)
+                pending.append(item)
+                seen_keys.add(key)
+        # Accepted items are counted once the category is final, below
+        session.counters.record(supplier.supplier, pages=1, cards=len(raws), duplicates=duplicates)
+        log.info(
+            "HTTP page %d: %d cards, %d items so far", pages_seen, len(raws), len(items), extra={"page": pages_seen}
+        )
+
+        if cat.paging_mode == "url_template" and cat.page_template:
+            url = page_url(cat, cat.first_page + pages_seen)
+        elif cat.paging_mode == "pagination":
+            href = next_link(root, cat.next_button)
+            url = urljoin(url, href) if href else ""
+        else:
+            url = ""
+        if cat.paging_mode != "infinite_scroll":
+            emit(pages_seen, url)
+
+    if cat.paging_mode == "infinite_scroll" and len(items) < target_min:
+        return escalate("infinite scroll needs the browser")
+
+    session.sources.record(supplier.supplier, "html", len(items) - restored)
+    session.counters.record(supplier.supplier, accepted=len(items) - restored)
+    if not cut_short:
+        emit(pages_seen, done=True)
+    session.tiers.record(supplier.supplier, cat.name, "http", time.perf_counter() - started, True)
+    log.info("Finished scraping %s/%s over HTTP: collected %d items", supplier.supplier, cat.name, len(items))
+    return items
+
+
+def _scrape_category(
+    page: Page,
+    cat: CategoryConfig,
+    supplier: SupplierConfig,
+    target_min: int,
+    extraction: str,
+    session: CrawlSession,
+    collector: Optional[ResponseCollector],
+) -> List[Dict[str, Any]]:
+    ready = session.readiness
+    saved = session.saved_progress(supplier.supplier, cat.name)
+    url = resume_url(cat, saved)
+    log.info("Scraping %s/%s from %s", supplier.supplier, cat.name, url)
+    if saved.page:
+        log.info("Resuming after %d completed steps with %d saved items", saved.page, saved.count)
     
-    elif supplier.supplier == "Castorama":
-        try:
-            # Castorama cookie consent
-            for selector in [
-                "#onetrust-accept-btn-handler",
-                'button:has-text("Accepter")',
-                'button:has-text("Accept all")'
-            ]:
-                try:
-                    consent = page.locator(selector).first
-                    if consent and consent.is_visible(timeout=3000):
-                        consent.click()
-                        print("Clicked cookie consent button on Castorama")
-                        page.wait_for_timeout(1000)
-                        break
-                except:
-                    pass
-        except Exception as e:
-            print(f"Cookie handling error for Castorama (non-critical): {e}")
+    # Navigate to the category page, retrying timeouts, network errors and
+    # challenge pages with backoff
+    def open_listing():
+        pace(page, session, supplier)
+        response = page.goto(url, wait_until="domcontentloaded")
+        check_blocked(response.status if response else None, page.title())
+
+    span = session.profile.span
+    with span("goto", supplier.supplier, cat.name, saved.page + 1):
+        session.resilience.call(supplier.supplier, open_listing, page_sleep(page), f"Opening {cat.name}")
     
-    items: List[Dict[str, Any]] = []
-    seen_keys = set()  # To avoid duplicates
+    # Handle site-specific cookie consents and initial setup
+    with span("consent", supplier.supplier, cat.name):
+        handle_consent(page, supplier, session)
+    with span("ready", supplier.supplier, cat.name, saved.page + 1):
+        ready_ok = wait_for_cards(page, cat.card, ready, session.waits)
+    if not ready_ok:
+        log.warning("No settled cards for %s/%s after %d ms", supplier.supplier, cat.name, ready.ready_timeout_ms)
+        session.resilience.count(supplier.supplier, SELECTOR)
+    
+    items: List[Dict[str, Any]] = list(saved.items)
+    seen_keys = set(saved.keys)  # To avoid duplicates
     pages_seen = 0
+    pending: List[Dict[str, Any]] = []  # accepted since the last checkpoint
+    # Cards read, duplicates and errors on the current page; plain ints so
+    # the per-card path takes no lock, flushed to session.counters per page
+    tally = dict.fromkeys(("cards", "duplicates", "errors"), 0)
+    first_error = ""  # of the current page, for its summary line
+    # Per-card DEBUG events: checked once here, then sampled
+    trace_cards = log.isEnabledFor(logging.DEBUG)
     
-    # Helper function to extract products from current page
-    def collect_current_page() -> int:
-        cards = page.locator(cat.card)  # Use cat.card directly
+    def accept(item: Dict[str, Any], source: str = "dom") -> bool:
+        # Only add valid, non-duplicate items
+        tally["cards"] += 1
+        if trace_cards and session.card_sample():
+            log.debug("Card %s", item.get("name") if item else None, extra={"card": item, "source": source})
+        if item and item["name"] and item["url"] != supplier.base_url:
+            key = dedupe_key(item)
+            if key in seen_keys:
+                tally["duplicates"] += 1
+            else:
+                item["source"] = source
+                items.append(item)
+                seen_keys.add(key)
+                session.sources.record(supplier.supplier, source)
+                if session.sink is not None:
+                    session.sink.write(item)
+                if session.checkpoint is not None:
+                    pending.append(item)
+                return True
+        return False
+
+    def checkpoint(page_no: int, next_url: str = "", done: bool = False):
+        save_progress(session, supplier, cat, page_no, pending, next_url, done)
+
+    # Index of the first card not yet walked by the locator path. Only used
+    # for incremental collection; bulk mode stamps SEEN_MARKER instead.
+    cursor = 0
+    # Response collectors of the extra url_template tabs by id(); `collector` is page's
+    tab_collectors: Dict[int, ResponseCollector] = {}
+    # Cards seen (new or not) by the last collect_current_page call
+    cards_found = 0
+
+    # Helper function to extract products from current page. With
+    # `incremental`, cards handled by a previous call are skipped. `on`
+    # collects from another tab instead of `page`; `page_no` labels the span.
+    def save_snapshot(target: Page, page_no: Optional[int]):
+        if session.recorder is not None:
+            html = unmarked(target.content())
+            session.recorder.save_page(supplier.supplier, cat.name, page_no, target.url, html)
+
+    def collect_current_page(
+        incremental: bool = False, on: Optional[Page] = None, page_no: Optional[int] = None
+    ) -> int:
+        nonlocal first_error
+        tally.update(cards=0, duplicates=0, errors=0)
+        first_error = ""
+        recorder = session.recorder
+        # Infinite scroll grows one DOM; it is saved once, after the last step
+        if not incremental:
+            save_snapshot(on or page, page_no)
+        before = len(items)
+        with span("extract", supplier.supplier, cat.name, page_no):
+            new = _collect(incremental, on)
+        session.counters.record(supplier.supplier, pages=1, accepted=new, **tally)
+        if recorder is not None:
+            recorder.add_items(items[before:])
+        if tally["errors"]:
+            log.warning(
+                "%d cards failed to extract (first: %s)", tally["errors"], first_error, extra={"page": page_no}
+            )
+        return new
+
+    def _collect(incremental: bool, on: Optional[Page]) -> int:
+        nonlocal cursor, cards_found, first_error
+        capture = tab_collectors.get(id(on), collector) if on is not None else collector
+        if capture is not None:
+            rows = capture.drain()
+            if rows:
+                cards_found = len(rows)
+                log.debug("Captured %d products from JSON for %s/%s", len(rows), supplier.supplier, cat.name)
+                return sum(
+                    1 for row in rows
+                    if accept(item_from_capture(row, cat.name, supplier.supplier, supplier.base_url), "network")
+                )
+
+        cards = (on or page).locator(cat.card)  # Use cat.card directly
+
+        if extraction == "bulk":
+            try:
+                extracted = extract_cards_bulk(
+                    cards, cat.name, supplier.supplier, supplier.base_url,
+                    mark=SEEN_MARKER if incremental else None, stats=session.selectors, plan=supplier.plan,
+                )
+            except Exception as e:
+                log.warning(
+                    "Bulk extraction failed for %s/%s, using per-card locators: %s", supplier.supplier, cat.name, e
+                )
+            else:
+                cards_found = len(extracted)
+                log.debug("Found %d new cards for %s/%s", len(extracted), supplier.supplier, cat.name)
+                return sum(1 for item in extracted if accept(item))
+
         card_count = cards.count()
-        print(f"[DEBUG] Found {card_count} cards for {supplier.supplier}/{cat.name}")
+        cards_found = card_count
+        start = 0
+        if incremental:
+            # A shorter list means the DOM was replaced; start over.
+            start = cursor if cursor <= card_count else 0
+            cursor = card_count
+        log.debug("Found %d new cards for %s/%s", card_count - start, supplier.supplier, cat.name)
         
+        plan = supplier.plan.for_supplier(session.selectors, supplier.supplier)
         collected = 0
-        for i in range(card_count):
+        for i in range(start, card_count):
             try:
                 card = cards.nth(i)
                 
@@ -601,30 +1337,88 @@ def scrape_category(page: Page, cat: CategoryConfig, supplier: SupplierConfig, t
                     except Exception:
                         pass
                 
-                item = extract_from_card(card, cat.name, supplier.supplier, supplier.base_url)
-                
-                # Only add valid, non-duplicate items
-                if item and item["name"] and item["url"] != supplier.base_url:
-                    key = (item["supplier"], item["url"], item["name"], item.get("unit") or "")
-                    if key not in seen_keys:
-                        items.append(item)
-                        seen_keys.add(key)
-                        collected += 1
+                item = extract_from_card(
+                    card, cat.name, supplier.supplier, supplier.base_url, session.selectors, plan
+                )
+                if accept(item):
+                    collected += 1
             except Exception as e:
-                print(f"Error processing card {i}: {e}")
+                # One summary line per page; the traceback only at DEBUG, sampled
+                tally["errors"] += 1
+                first_error = first_error or f"card {i}: {e}"
+                if trace_cards and session.card_sample():
+                    log.debug("Error processing card %d", i, exc_info=True)
         
         return collected
+
+    # Set when pagination stops on an error rather than at the listing's end
+    cut_short = False
+
+    def click_next() -> bool:
+        """Click the next-page button and wait for the new listing."""
+        nonlocal cut_short
+        if not cat.next_button:  # Use cat.next_button directly
+            log.info("No next_button configured, ending pagination")
+            return False
+        next_button = page.locator(cat.next_button).first
+        if not (next_button and next_button.is_visible()):
+            log.info("No next page button found, ending pagination")
+            return False
+
+        def attempt() -> bool:
+            # Scroll the button into view
+            next_button.scroll_into_view_if_needed()
+            pace(page, session, supplier)
+
+            # Click, then wait for the listing to be replaced
+            old_url, old_first = page.url, first_card_text(page, cat.card)
+            next_button.click()
+            if not wait_for_listing_change(page, cat.card, old_url, old_first, ready, session.waits):
+                return False
+            wait_for_cards(page, cat.card, ready, session.waits)
+            return True
+
+        # A click that errors is retried with backoff; once retries run out
+        # pagination ends with the items collected so far
+        try:
+            with span("paginate", supplier.supplier, cat.name):
+                changed = session.resilience.call(supplier.supplier, attempt, page_sleep(page), "Next click")
+            if not changed:
+                log.info("Listing did not change after clicking next, ending pagination")
+                cut_short = True
+                return False
+        except Exception as e:
+            log.warning("Error navigating to next page: %s", e)
+            cut_short = True
+            return False
+        return True
     
     # Different handling based on pagination mode
     if cat.paging_mode == "infinite_scroll":  
-        for scroll_step in range(cat.scroll_steps): 
-            # Scroll to bottom to trigger lazy loading
+        # Scroll back down to where the previous run stopped; the cards on
+        # the way are collected by the first step below and deduped.
+        for _ in range(saved.page):
+            pace(page, session, supplier)
+            before = page.locator(cat.card).count()
             page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
-            page.wait_for_timeout(cat.scroll_wait_ms)  
+            wait_for_cards(page, cat.card, ready, session.waits, min_count=before + 1,
+                           timeout_ms=cat.scroll_wait_ms, kind="resume")
+
+        for scroll_step in range(saved.page, cat.scroll_steps): 
+            # Scroll to bottom to trigger lazy loading, then wait for the
+            # card count to grow (bounded by scroll_wait_ms)
+            with span("paginate", supplier.supplier, cat.name, scroll_step + 1):
+                pace(page, session, supplier)
+                before = page.locator(cat.card).count()
+                page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
+                wait_for_cards(page, cat.card, ready, session.waits, min_count=before + 1,
+                               timeout_ms=cat.scroll_wait_ms, kind="scroll")
             
-            # Collect items from current view
-            new_items = collect_current_page()
-            print(f"Scroll {scroll_step+1}: Collected {new_items} new items")
+            # Collect only the cards that appeared since the last scroll
+            new_items = collect_current_page(incremental=True, page_no=scroll_step + 1)
+            log.info("Scroll %d: Collected %d new items", scroll_step + 1, new_items, extra={"page": scroll_step + 1})
+            pages_seen = scroll_step + 1
+            checkpoint(pages_seen)
             
             # Stop if we have enough items or no new items were found
             if len(items) >= target_min:
@@ -632,55 +1426,181 @@ def scrape_category(page: Page, cat: CategoryConfig, supplier: SupplierConfig, t
                 
             # If no new items after several scrolls, stop
             if new_items == 0 and scroll_step >= 2:
-                print("No new items found after multiple scrolls, stopping")
+                log.info("No new items found after multiple scrolls, stopping")
                 break
+        save_snapshot(page, pages_seen)
     
+    elif cat.paging_mode == "url_template" and cat.page_template:
+        # Page URLs are known up front, so fetch them in batches of
+        # parallel_pages tabs. Navigations are all started before any is
+        # waited on, letting the browser load the batch concurrently.
+        pages_seen = saved.page + 1
+        new_items = collect_current_page(page_no=cat.first_page + saved.page)
+        log.info(
+            "Page %d: Collected %d items", cat.first_page + saved.page, new_items,
+            extra={"page": cat.first_page + saved.page},
+        )
+        checkpoint(pages_seen, page_url(cat, cat.first_page + pages_seen))
+        exhausted = cards_found == 0
+        next_n = cat.first_page + pages_seen
+        resume_at = ""
+        extra = 0
+        tabs = [page]
+        try:
+            # Extra tabs are only opened while the host has max_pages to
+            # spare; claimed inside the try so a failed new_page() still
+            # gives the claim back
+            extra = session.limiter.claim_pages(supplier.base_url, cat.parallel_pages - 1)
+            for _ in range(extra):
+                tabs.append(page.context.new_page())
+            if collector is not None:
+                # One collector per tab, so a tab only drains its own responses
+                for tab in tabs[1:]:
+                    tab_collector = ResponseCollector(supplier.capture)
+                    tab.on("response", tab_collector.listener)
+                    tab_collectors[id(tab)] = tab_collector
+            while not exhausted and not cut_short and len(items) < target_min and pages_seen < cat.max_pages:
+                batch = list(range(next_n, next_n + min(len(tabs), cat.max_pages - pages_seen)))
+                next_n += len(batch)
+                started = {}
+                for tab, n in zip(tabs, batch):
+                    def open_page(tab=tab, n=n):
+                        pace(tab, session, supplier)
+                        response = tab.goto(page_url(cat, n), wait_until="commit")
+                        check_blocked(response.status if response else None, tab.title())
+
+                    try:
+                        with span("goto", supplier.supplier, cat.name, n):
+                            session.resilience.call(supplier.supplier, open_page, page_sleep(tab), f"Opening page {n}")
+                        started[n] = True
+                    except Exception as e:
+                        log.warning("Error opening page %d: %s", n, e, extra={"page": n})
+
+                # Collect in page order so output does not depend on load order
+                for tab, n in zip(tabs, batch):
+                    pages_seen += 1
+                    if started.get(n):
+                        try:
+                            with span("paginate", supplier.supplier, cat.name, n):
+                                tab.wait_for_load_state("domcontentloaded", timeout=ready.navigation_timeout_ms)
+                                # The title is rarely there yet at commit
+                                check_blocked(None, tab.title())
+                                wait_for_cards(tab, cat.card, ready, session.waits)
+                        except Exception as e:
+                            log.warning("Error loading page %d: %s", n, e, extra={"page": n})
+                            started[n] = False
+                    if not started.get(n):
+                        # Stop at the first gap so the checkpoint stays on the
+                        # last page collected in a row; resuming reopens page n
+                        cut_short, resume_at = True, page_url(cat, n)
+                        break
+                    new_items = collect_current_page(on=tab, page_no=n)
+                    log.info("Page %d: Collected %d items", n, new_items, extra={"page": n})
+                    checkpoint(pages_seen, page_url(cat, n + 1))
+                    if cards_found == 0:
+                        log.info("Page %d has no cards, stopping pagination", n, extra={"page": n})
+                        exhausted = True
+                        break
+        finally:
+            try:
+                for tab in tabs[1:]:
+                    tab.close()
+            finally:
+                session.limiter.release_pages(supplier.base_url, extra)
+        if not cut_short and pages_seen >= cat.max_pages:
+            log.info("Reached max pages (%d), stopping pagination", cat.max_pages)
+
     else:  # Pagination mode
+        pages_seen = saved.page
+        # Where the page being collected can be reopened, if it has its own URL
+        resume_at = url if url != cat.url else ""
+        if pages_seen and url == cat.url:
+            # The listing pages in place, so click through to the saved page
+            for _ in range(pages_seen):
+                if not click_next():
+                    break
         while True:
             pages_seen += 1
-            print(f"Processing page {pages_seen} of {cat.max_pages}")  
+            log.debug("Processing page %d of %d", pages_seen, cat.max_pages)
             
             # Collect items from current page
-            new_items = collect_current_page()
-            print(f"Page {pages_seen}: Collected {new_items} items")
+            new_items = collect_current_page(page_no=pages_seen)
+            log.info("Page %d: Collected %d items", pages_seen, new_items, extra={"page": pages_seen})
             
             # Stop conditions
             if len(items) >= target_min:
-                print(f"Reached target of {target_min} items, stopping pagination")
+                log.info("Reached target of %d items, stopping pagination", target_min)
                 break
                 
             if pages_seen >= cat.max_pages:  
-                print(f"Reached max pages ({cat.max_pages}), stopping pagination")
+                log.info("Reached max pages (%d), stopping pagination", cat.max_pages)
                 break
             
             # Try to find and click the next page button
-            if cat.next_button:  # Use cat.next_button directly
-                next_button = page.locator(cat.next_button).first
-                if next_button and next_button.is_visible():
-                    try:
-                        # Scroll the button into view
-                        next_button.scroll_into_view_if_needed()
-                        page.wait_for_timeout(500)
-                        
-                        # Click and wait for navigation
-                        next_button.click()
-                        page.wait_for_load_state("networkidle", timeout=10000)
-                        page.wait_for_timeout(1000)  # Extra wait for JS
-                    except Exception as e:
-                        print(f"Error navigating to next page: {e}")
-                        break
-                else:
-                    print("No next page button found, ending pagination")
-                    break
-            else:
-                print("No next_button configured, ending pagination")
+            previous_url = page.url
+            if not click_next():
                 break
+            # Only a listing whose URL changed can be resumed by URL
+            resume_at = page.url if page.url != previous_url else ""
+            checkpoint(pages_seen, resume_at)
     
-    print(f"Finished scraping {supplier.supplier}/{cat.name}: collected {len(items)} items")
+    if cut_short:
+        # Leave the category resumable at the page just collected; its
+        # cards are journaled with it, so a resumed run dedupes them
+        log.info("Pagination of %s/%s ended on an error; it stays resumable", supplier.supplier, cat.name)
+        checkpoint(pages_seen - 1, resume_at)
+    else:
+        checkpoint(pages_seen, done=True)
+    log.info("Finished scraping %s/%s: collected %d items", supplier.supplier, cat.name, len(items))
     return items
 
-def scrape_all(cfg: ScraperConfig, min_items: int) -> List[Dict[str, Any]]:
+def new_context(browser, cfg: ScraperConfig, session: Optional[CrawlSession] = None):
+    """A browser context; with a session it starts from the suppliers' saved consent state."""
+    context = browser.new_context(
+        user_agent=cfg.user_agent,
+        viewport={"width": 1280, "height": 720},
+        storage_state=session.consent.storage_state(s.supplier for s in cfg.suppliers) if session else None,
+        record_har_path=session.recorder.har_path() if session and session.recorder else None,
+    )
+    if session is not None:
+        context.on("response", make_response_listener(session.blocking))
+    return context
+
+
+def install_blocking(context, cfg: ScraperConfig, supplier_cfg: SupplierConfig, session: CrawlSession):
+    """(Re)install the supplier's request-blocking rules on a context."""
+    context.unroute("**/*")
+    if cfg.block_resources and supplier_cfg.blocking.enabled:
+        context.route("**/*", make_route_handler(supplier_cfg.blocking, session.blocking, supplier_cfg.base_url))
+
+
+def scrape_all(
+    cfg: ScraperConfig,
+    min_items: int,
+    sink: Optional[ItemSink] = None,
+    checkpoint: Optional[CheckpointStore] = None,
+    selector_stats: Optional[SelectorStats] = None,
+    session: Optional[CrawlSession] = None,
+) -> List[Dict[str, Any]]:
+    """Crawl every configured supplier and return the items found.
+
+    With a `sink`, items are streamed to it as they are accepted and are not
+    kept for the whole run, so the returned list is empty. With a
+    `checkpoint` store, progress is journaled after every page and work a
+    resumed store already finished is skipped. `selector_stats` carries
+    selector hit counts from earlier runs; without it they start empty.
+    Pass a `session` to read its counters after the run (benchmarks do).
+    """
+    session = session or CrawlSession.for_config(cfg)
+    session.sink = sink
+    session.checkpoint = checkpoint
+    if selector_stats is not None:
+        session.selectors = selector_stats
+    if cfg.concurrency > 1:
+        return scrape_all_concurrent(cfg, min_items, session)
+
     all_items = []
+    total = 0
     
     with sync_playwright() as p:
         browser_type = p.chromium
@@ -688,33 +1608,263 @@ def scrape_all(cfg: ScraperConfig, min_items: int) -> List[Dict[str, Any]]:
             headless=cfg.headless,
         )
         
-        context = browser.new_context(
-            user_agent=cfg.user_agent,
-            viewport={"width": 1280, "height": 720},
-        )
+        context = new_context(browser, cfg, session)
         
         page = context.new_page()
+        failures = 0
+        # Failed categories get another go once every supplier had its turn
+        retry_later: List[Tuple[SupplierConfig, CategoryConfig]] = []
+
+        def run(supplier_cfg: SupplierConfig, cat: CategoryConfig) -> List[Dict[str, Any]]:
+            nonlocal context, page, failures
+            try:
+                items = scrape_category(page, cat, supplier_cfg, min_items - total, cfg.extraction, session)
+                log.info("Got %d items from %s/%s", len(items), supplier_cfg.supplier, cat.name)
+                failures = 0
+                return items
+            except Exception as e:
+                log.error("Error scraping %s/%s: %s", supplier_cfg.supplier, cat.name, e, exc_info=True)
+                failures += 1
+                if session.resilience.claim_requeue(supplier_cfg.supplier, cat.name):
+                    log.info("Re-queueing %s/%s", supplier_cfg.supplier, cat.name)
+                    retry_later.append((supplier_cfg, cat))
+                if failures >= session.resilience.cfg.recycle_after:
+                    context.close()
+                    context = new_context(browser, cfg, session)
+                    install_blocking(context, cfg, supplier_cfg, session)
+                    page = context.new_page()
+                    session.resilience.count(supplier_cfg.supplier, "recycled")
+                    failures = 0
+                return []
         
         for supplier_cfg in cfg.suppliers:
-            print(f"Processing supplier: {supplier_cfg.supplier}")
+            log.info("Processing supplier: %s", supplier_cfg.supplier)
+            install_blocking(context, cfg, supplier_cfg, session)
             supplier_items = []
+            supplier_count = 0
             
             for cat in supplier_cfg.categories:
-                try:
-                    items = scrape_category(page, cat, supplier_cfg, min_items - len(all_items))
+                items = run(supplier_cfg, cat)
+                supplier_count += len(items)
+                if sink is None:
                     supplier_items.extend(items)
-                    print(f"Got {len(items)} items from {supplier_cfg.supplier}/{cat.name}")
-                except Exception as e:
-                    print(f"Error scraping {supplier_cfg.supplier}/{cat.name}: {e}")
-                    import traceback
-                    traceback.print_exc()
             
             # Add debug info
-            print(f"Finished {supplier_cfg.supplier}: collected {len(supplier_items)} items")
+            log.info("Finished %s: collected %d items", supplier_cfg.supplier, supplier_count)
+            total += supplier_count
             all_items.extend(supplier_items)
+
+        while retry_later:
+            supplier_cfg, cat = retry_later.pop(0)
+            install_blocking(context, cfg, supplier_cfg, session)
+            items = run(supplier_cfg, cat)
+            total += len(items)
+            if sink is None:
+                all_items.extend(items)
                     
+        # Closing the context first writes its HAR when recording
+        context.close()
         browser.close()
     
+    session.close()
+    log.info("Run summary:\n%s", session.report())
+    return all_items
+
+
+# A unit of crawl work: a supplier index and the category indexes to walk, in
+# order, inside one browser context.
+WorkUnit = Tuple[int, List[int]]
+
+
+def plan_work_units(cfg: ScraperConfig) -> List[WorkUnit]:
+    """Work units, round-robin across suppliers so consecutive units hit different hosts."""
+    queues: List[List[WorkUnit]] = []
+    for si, supplier_cfg in enumerate(cfg.suppliers):
+        cat_indexes = list(range(len(supplier_cfg.categories)))
+        if cfg.per_category:
+            queues.append([(si, [ci]) for ci in cat_indexes])
+        elif cat_indexes:
+            queues.append([(si, cat_indexes)])
+    units: List[WorkUnit] = []
+    for rank in range(max((len(q) for q in queues), default=0)):
+        units.extend(q[rank] for q in queues if rank < len(q))
+    return units
+
+
+class SupplierScheduler:
+    """Hands out work units without exceeding any supplier's context cap.
+
+    With `ready_in` (supplier index -> seconds until its host's rate limit
+    frees a token), the runnable unit whose host is free soonest goes first,
+    so a worker does not start on a host it would only sit waiting for.
+    """
+
+    def __init__(
+        self,
+        units: List[WorkUnit],
+        caps: List[int],
+        ready_in: Optional[Callable[[int], float]] = None,
+    ):
+        self._pending = list(units)
+        self._caps = caps
+        self._active = [0] * len(caps)
+        self._ready_in = ready_in
+        self._cond = threading.Condition()
+
+    def acquire(self) -> Optional[WorkUnit]:
+        """Block until a unit is runnable; None once everything is handed out."""
+        with self._cond:
+            while self._pending:
+                runnable = [i for i, (si, _) in enumerate(self._pending) if self._active[si] < self._caps[si]]
+                if runnable:
+                    if self._ready_in is not None:
+                        waits = {si: self._ready_in(si) for si in {self._pending[i][0] for i in runnable}}
+                        # min() keeps the earliest unit among equally free hosts
+                        runnable = [min(runnable, key=lambda i: waits[self._pending[i][0]])]
+                    unit = self._pending.pop(runnable[0])
+                    self._active[unit[0]] += 1
+                    return unit
+                self._cond.wait()
+            return None
+
+    def release(self, unit: WorkUnit):
+        with self._cond:
+            self._active[unit[0]] -= 1
+            self._cond.notify_all()
+
+    def requeue(self, unit: WorkUnit):
+        """Put (what is left of) a failed unit back at the end of the queue."""
+        with self._cond:
+            self._pending.append(unit)
+            self._cond.notify_all()
+
+
+def retry_after_setup_failure(
+    session: CrawlSession, supplier: SupplierConfig, cat_indexes: List[int], error: Exception
+) -> bool:
+    """Log a browser context that could not be set up; True if its unit may be re-queued."""
+    log.error("Could not set up a browser context for %s: %s", supplier.supplier, error, exc_info=True)
+    if not cat_indexes:
+        return False
+    names = ", ".join(supplier.categories[ci].name for ci in cat_indexes)
+    if session.resilience.claim_requeue(supplier.supplier, supplier.categories[cat_indexes[0]].name):
+        log.info("Re-queueing %s/%s", supplier.supplier, names)
+        return True
+    log.error("Giving up on %s/%s", supplier.supplier, names)
+    return False
+
+
+def _crawl_worker(
+    cfg: ScraperConfig,
+    scheduler: SupplierScheduler,
+    results: Dict[Tuple[int, int], List[Dict[str, Any]]],
+    counts: Dict[Tuple[int, int], int],
+    min_items: int,
+    session: CrawlSession,
+):
+    # Playwright's sync API is bound to the thread that started it, so every
+    # worker drives its own browser and opens a fresh context per unit.
+    with sync_playwright() as p:
+        browser = p.chromium.launch(headless=cfg.headless)
+        try:
+            while True:
+                unit = scheduler.acquire()
+                if unit is None:
+                    break
+                si, cat_indexes = unit
+                supplier_cfg = cfg.suppliers[si]
+                # Release the unit whatever happens, or other workers would
+                # wait forever for this supplier's slot
+                context = None
+                remaining = list(cat_indexes)  # categories not yet attempted
+                try:
+                    context = new_context(browser, cfg, session)
+                    install_blocking(context, cfg, supplier_cfg, session)
+                    page = context.new_page()
+                    collected = 0
+                    failures = 0
+                    for pos, ci in enumerate(cat_indexes):
+                        cat = supplier_cfg.categories[ci]
+                        try:
+                            items = scrape_category(
+                                page, cat, supplier_cfg, min_items - collected, cfg.extraction, session
+                            )
+                            log.info("Got %d items from %s/%s", len(items), supplier_cfg.supplier, cat.name)
+                            failures = 0
+                        except Exception as e:
+                            log.error("Error scraping %s/%s: %s", supplier_cfg.supplier, cat.name, e, exc_info=True)
+                            items = []
+                            failures += 1
+                            if session.resilience.claim_requeue(supplier_cfg.supplier, cat.name):
+                                # Retried later in a fresh context, resuming from its checkpoint
+                                log.info("Re-queueing %s/%s", supplier_cfg.supplier, cat.name)
+                                remaining = []
+                                scheduler.requeue((si, cat_indexes[pos:]))
+                                break
+                            if failures >= session.resilience.cfg.recycle_after:
+                                # This category is given up on; only later ones move along
+                                remaining = cat_indexes[pos + 1:]
+                                context.close()
+                                context = None
+                                context = new_context(browser, cfg, session)
+                                install_blocking(context, cfg, supplier_cfg, session)
+                                page = context.new_page()
+                                session.resilience.count(supplier_cfg.supplier, "recycled")
+                                failures = 0
+                        results[(si, ci)] = items if session.sink is None else []
+                        counts[(si, ci)] = len(items)
+                        collected += len(items)
+                        remaining = cat_indexes[pos + 1:]
+                except Exception as e:
+                    # Opening (or replacing) the context failed
+                    if retry_after_setup_failure(session, supplier_cfg, remaining, e):
+                        scheduler.requeue((si, remaining))
+                finally:
+                    try:
+                        if context is not None:
+                            context.close()
+                    finally:
+                        scheduler.release(unit)
+        finally:
+            browser.close()
+
+
+def scrape_all_concurrent(cfg: ScraperConfig, min_items: int, session: CrawlSession) -> List[Dict[str, Any]]:
+    """Crawl suppliers (or categories) in parallel browser contexts.
+
+    Each unit aims for `min_items` on its own since units cannot see each
+    other's progress. Results are merged in config order, so the output does
+    not depend on which unit finished first.
+    """
+    units = plan_work_units(cfg)
+    scheduler = SupplierScheduler(
+        units,
+        [s.context_cap for s in cfg.suppliers],
+        ready_in=lambda si: session.limiter.ready_in(cfg.suppliers[si].base_url),
+    )
+    results: Dict[Tuple[int, int], List[Dict[str, Any]]] = {}
+    counts: Dict[Tuple[int, int], int] = {}
+
+    workers = [
+        threading.Thread(
+            target=_crawl_worker, args=(cfg, scheduler, results, counts, min_items, session), daemon=True
+        )
+        for _ in range(min(cfg.concurrency, len(units)))
+    ]
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+
+    all_items: List[Dict[str, Any]] = []
+    for si, supplier_cfg in enumerate(cfg.suppliers):
+        supplier_count = 0
+        for ci in range(len(supplier_cfg.categories)):
+            all_items.extend(results.get((si, ci), []))
+            supplier_count += counts.get((si, ci), 0)
+        log.info("Finished %s: collected %d items", supplier_cfg.supplier, supplier_count)
+    session.close()
+    log.info("Run summary:\n%s", session.report())
     return all_items
 
 
@@ -723,19 +1873,311 @@ def write_json(rows: List[Dict[str, Any]], out_path: Path):
     out_path.write_text(json.dumps(payload, indent=2, ensure_ascii=False), encoding="utf-8")
 
 
+def replay_recording(cfg: ScraperConfig, recording: Recording) -> List[Dict[str, Any]]:
+    """Run the configured extraction over a recording's snapshots, offline.
+
+    Each snapshot is served to Chromium by ReplayRoutes and its cards go
+    through the same extraction path and per-category dedupe as a crawl.
+    Categories no longer in the config are skipped.
+    """
+    suppliers = {s.supplier: s for s in cfg.suppliers}
+    items: List[Dict[str, Any]] = []
+    seen_keys: set = set()
+    current: Optional[Tuple[str, str]] = None
+    with sync_playwright() as p:
+        browser = p.chromium.launch(headless=True)
+        context = browser.new_context(user_agent=cfg.user_agent, viewport={"width": 1280, "height": 720})
+        routes = ReplayRoutes(recording)
+        routes.install(context)
+        page = context.new_page()
+        try:
+            for entry in recording.pages:
+                supplier = suppliers.get(entry["supplier"])
+                cat = find_category(supplier, entry["category"]) if supplier else None
+                if cat is None:
+                    log.warning(
+                        "Skipping snapshot %s: %s/%s is not configured",
+                        entry["file"], entry["supplier"], entry["category"],
+                    )
+                    continue
+                if current != (supplier.supplier, cat.name):
+                    current, seen_keys = (supplier.supplier, cat.name), set()
+                routes.current = entry
+                page.goto(entry["url"], wait_until="domcontentloaded")
+                extracted = extract_page(page, cat, supplier, cfg.extraction)
+                new = 0
+                for item in extracted:
+                    if item and item["name"] and item["url"] != supplier.base_url:
+                        key = dedupe_key(item)
+                        if key not in seen_keys:
+                            seen_keys.add(key)
+                            item["source"] = "dom"
+                            items.append(item)
+                            new += 1
+                with log_context(supplier=supplier.supplier, category=cat.name):
+                    log.info(
+                        "Replayed %s: %d cards, %d new items", entry["file"], len(extracted), new,
+                        extra={"page": entry["page"]},
+                    )
+        finally:
+            browser.close()
+    return items
+
+
+def find_category(supplier: SupplierConfig, name: str) -> Optional[CategoryConfig]:
+    return next((c for c in supplier.categories if c.name == name), None)
+
+
+def extract_page(page: Page, cat: CategoryConfig, supplier: SupplierConfig, extraction: str) -> List[Dict[str, Any]]:
+    """Every card on the page through the supplier's plan, without selector stats."""
+    cards = page.locator(cat.card)
+    if extraction == "bulk":
+        return extract_cards_bulk(cards, cat.name, supplier.supplier, supplier.base_url, plan=supplier.plan)
+    return [
+        extract_from_card(cards.nth(i), cat.name, supplier.supplier, supplier.base_url, plan=supplier.plan)
+        for i in range(cards.count())
+    ]
+
+
+def replay(cfg: ScraperConfig, which: str):
+    """--replay: extract from a recording and write replay.json and diff.json next to it."""
+    recording = Recording.latest(RECORDINGS_DIR) if which == "latest" else Recording(Path(which))
+    started = time.perf_counter()
+    rows = replay_recording(cfg, recording)
+    elapsed = time.perf_counter() - started
+    diff = diff_items(recording.items(), rows, dedupe_key)
+    write_json(rows, recording.root / "replay.json")
+    (recording.root / "diff.json").write_text(json.dumps(diff, indent=1, ensure_ascii=False), encoding="utf-8")
+    print(f"Replayed {len(recording.pages)} pages from {recording.root} in {elapsed:.1f}s: {len(rows)} items")
+    print(summarize_diff(diff) + f" → {recording.root / 'diff.json'}")
+
+
 def parse_args():
     ap = argparse.ArgumentParser(description="Material scraper")
     ap.add_argument("--config", type=str, default=str(CONFIG_PATH), help="Path to scraper_config.yaml")
     ap.add_argument("--min-items", type=int, default=100, help="Minimum total items to aim for")
+    ap.add_argument(
+        "--extraction",
+        choices=["bulk", "locator"],
+        default=None,
+        help="Card extraction mode (overrides the config file)",
+    )
+    ap.add_argument(
+        "--engine",
+        choices=["sync", "async"],
+        default="sync",
+        help="Playwright API to drive the browser with",
+    )
+    ap.add_argument(
+        "--concurrency",
+        type=int,
+        default=None,
+        help="Browser contexts crawling in parallel (overrides the config file)",
+    )
+    ap.add_argument(
+        "--per-category",
+        action="store_true",
+        help="With --concurrency, schedule each category separately instead of each supplier",
+    )
+    ap.add_argument(
+        "--fetch",
+        choices=["browser", "hybrid"],
+        default=None,
+        help="hybrid tries plain HTTP + HTML parsing before rendering with Chromium",
+    )
+    ap.add_argument(
+        "--output",
+        choices=["json", "jsonl", "sqlite"],
+        default="json",
+        help="json writes materials.json at the end; jsonl streams items to materials.jsonl and sqlite "
+             "upserts them into materials.db as they arrive",
+    )
+    ap.add_argument(
+        "--materialize",
+        action="store_true",
+        help="With --output jsonl, also rebuild materials.json from the JSONL file at the end",
+    )
+    ap.add_argument(
+        "--resume",
+        action="store_true",
+        help="Continue an interrupted run from data/checkpoint.jsonl instead of starting over",
+    )
+    ap.add_argument(
+        "--write-versioned",
+        action="store_true",
+        help="Also store the run as a compressed snapshot plus a delta against the previous one in data/versions/",
+    )
+    ap.add_argument(
+        "--selector-report",
+        action="store_true",
+        help="Print every selector's hit count from data/selector_stats.json and exit",
+    )
+    ap.add_argument(
+        "--no-browser-state",
+        action="store_true",
+        help="Start from a fresh browser profile instead of the cookies saved after accepting consent banners",
+    )
+    ap.add_argument(
+        "--no-profile",
+        action="store_true",
+        help="Skip per-phase timing (data/run_profile.json and the profile table)",
+    )
+    ap.add_argument(
+        "--metrics-port",
+        type=int,
+        default=None,
+        help="Serve Prometheus metrics at http://127.0.0.1:PORT/metrics while crawling (overrides the config file)",
+    )
+    ap.add_argument(
+        "--record",
+        action="store_true",
+        help="Save each listing page's rendered DOM to data/recordings/<time>/ for --replay (implies --fetch browser)",
+    )
+    ap.add_argument(
+        "--record-har",
+        action="store_true",
+        help="With --record, also save each browser context's network traffic as a HAR file",
+    )
+    ap.add_argument(
+        "--replay",
+        nargs="?",
+        const="latest",
+        default=None,
+        metavar="DIR",
+        help="Run extraction offline over a recording (default: the latest) and diff it against the recorded items",
+    )
+    ap.add_argument(
+        "--log-level",
+        choices=["DEBUG", "INFO", "WARNING", "ERROR"],
+        default=None,
+        help="INFO logs per-page and per-category summaries; DEBUG adds sampled per-card events",
+    )
+    ap.add_argument(
+        "--log-format",
+        choices=["json", "text"],
+        default=None,
+        help="Log JSON lines (default) or plain text to stderr",
+    )
+    ap.add_argument(
+        "--no-blocking",
+        action="store_true",
+        help="Download every resource, ignoring the suppliers' blocking rules",
+    )
     return ap.parse_args()
 
 
 def main():
     args = parse_args()
+    if args.selector_report:
+        print(SelectorStats(SELECTOR_STATS_PATH).report(full=True))
+        return
     cfg = load_config(Path(args.config))
-    rows = scrape_all(cfg, min_items=args.min_items)
-    write_json(rows, OUTPUT_JSON)
-    print(f"Added {len(rows)} items → {OUTPUT_JSON}")
+    if args.extraction:
+        cfg.extraction = args.extraction
+    if args.concurrency:
+        cfg.concurrency = max(1, args.concurrency)
+    if args.per_category:
+        cfg.per_category = True
+    if args.no_blocking:
+        cfg.block_resources = False
+    if args.fetch:
+        cfg.fetch = args.fetch
+    if args.no_browser_state:
+        cfg.browser_state = False
+    if args.no_profile:
+        cfg.profile = False
+    if args.metrics_port is not None:
+        cfg.metrics_port = args.metrics_port
+    if args.log_level:
+        cfg.logging.level = args.log_level
+    if args.log_format:
+        cfg.logging.format = args.log_format
+    if args.record or args.record_har:
+        # The HTTP tier has no rendered DOM to save
+        cfg.fetch = "browser"
+        for supplier_cfg in cfg.suppliers:
+            for cat in supplier_cfg.categories:
+                if cat.render == "optional":
+                    cat.render = "auto"
+    log_listener = setup_logging(cfg.logging)
+    if args.replay:
+        try:
+            replay(cfg, args.replay)
+        finally:
+            stop_logging(log_listener)
+        return
+
+    run_started = now_ts()
+    sink: Optional[ItemSink] = None
+    if args.output == "jsonl":
+        # Resuming appends to the JSONL file the interrupted run left behind
+        sink = JsonlSink(OUTPUT_JSONL, append=args.resume)
+    elif args.output == "sqlite":
+        sink = SqliteSink(OUTPUT_DB)
+    # With a sink the journal only needs positions and keys
+    checkpoint = CheckpointStore(CHECKPOINT_PATH, resume=args.resume, items=sink is None, started_at=run_started)
+    # A resumed run's snapshot covers what the interrupted run wrote as well
+    run_started = checkpoint.started_at
+    selector_stats = SelectorStats(SELECTOR_STATS_PATH)
+    session = CrawlSession.for_config(cfg)
+    if args.record or args.record_har:
+        session.recorder = Recorder(RECORDINGS_DIR / time.strftime("%Y%m%dT%H%M%S"), har=args.record_har)
+    metrics = MetricsServer(session, cfg.metrics_port).start() if cfg.metrics_port else None
+    if metrics is not None:
+        log.info("Serving metrics at %s", metrics.url)
+    try:
+        if args.engine == "async":
+            import asyncio
+            from scraper_async import scrape_all_async
+
+            rows = asyncio.run(scrape_all_async(
+                cfg, min_items=args.min_items, sink=sink, checkpoint=checkpoint, selector_stats=selector_stats,
+                session=session,
+            ))
+        else:
+            rows = scrape_all(
+                cfg, min_items=args.min_items, sink=sink, checkpoint=checkpoint, selector_stats=selector_stats,
+                session=session,
+            )
+    except BaseException:
+        checkpoint.close()
+        raise
+    finally:
+        # Whatever was accepted before a crash is already on disk
+        if sink is not None:
+            sink.close()
+        selector_stats.save()
+        if metrics is not None:
+            metrics.close()
+        if session.recorder is not None:
+            session.recorder.close()
+        # Flush queued log records before the end-of-run reports; later ones are written directly
+        stop_logging(log_listener)
+        if session.profile.enabled:
+            session.profile.save(RUN_PROFILE_PATH)
+            print(session.profile.report())
+        if session.recorder is not None:
+            print(f"Recorded {len(session.recorder.pages)} pages → {session.recorder.root}")
+    # The run completed; the next one starts from scratch
+    checkpoint.close(finished=True)
+
+    if sink is None:
+        write_json(rows, OUTPUT_JSON)
+        print(f"Added {len(rows)} items → {OUTPUT_JSON}")
+    else:
+        print(f"Streamed {sink.count} items → {sink.path}")
+        if args.materialize and args.output == "jsonl":
+            order = [(s.supplier, c.name) for s in cfg.suppliers for c in s.categories]
+            materialize_json(OUTPUT_JSONL, OUTPUT_JSON, order=order)
+            print(f"Materialized {sink.count} items → {OUTPUT_JSON}")
+
+    if args.write_versioned:
+        if args.output == "jsonl":
+            rows = list(iter_jsonl(OUTPUT_JSONL))
+        elif args.output == "sqlite":
+            rows = list(iter_sqlite_items(OUTPUT_DB, seen_since=run_started))
+        entry = SnapshotStore(VERSIONS_DIR, key=dedupe_key).write(rows)
+        print(summarize(entry))
 
 
 if __name__ == "__main__":
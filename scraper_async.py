@@ -0,0 +1,716 @@
+"""asyncio engine mirroring the sync pipeline in scraper.py.
+
+Every page waits on the network without blocking the others, so a single
+process and event loop can keep several suppliers in flight. Selection is
+via `python scraper.py --engine async`.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from playwright.async_api import async_playwright, Page
+
+from readiness import (
+    consent_locator,
+    first_card_text_async,
+    politeness_delay_async,
+    wait_for_cards_async,
+    wait_for_listing_change_async,
+    wait_for_visible_async,
+)
+from resource_blocking import make_async_route_handler, make_response_listener
+from response_capture import ResponseCollector
+from checkpoint import CheckpointStore
+from crawl_log import log_context
+from resilience import SELECTOR, check_blocked
+from selector_stats import SelectorStats
+from storage import ItemSink
+
+from scraper import (
+    BULK_EXTRACT_JS,
+    GENERIC_PLAN,
+    SEEN_MARKER,
+    SELF,
+    CategoryConfig,
+    CrawlSession,
+    ExtractionPlan,
+    FieldSpec,
+    ScraperConfig,
+    SupplierConfig,
+    clean_text,
+    dedupe_key,
+    item_from_capture,
+    page_url,
+    plan_work_units,
+    resume_url,
+    retry_after_setup_failure,
+    save_progress,
+    scrape_category_static,
+    unmarked,
+)
+
+log = logging.getLogger(__name__)
+
+
+async def first_text_async(
+    page_or_card,
+    selectors: List[str],
+    stats: Optional[SelectorStats] = None,
+    supplier: str = "",
+    key: str = "",
+) -> str:
+    for css in selectors:
+        try:
+            loc = page_or_card.locator(css)
+            if await loc.count() > 0:
+                txt = (await loc.first.inner_text()).strip()
+                if txt:
+                    if stats is not None:
+                        stats.record(supplier, key, css)
+                    return clean_text(txt)
+        except Exception:
+            continue
+    if stats is not None:
+        stats.record(supplier, key, None)
+    return ""
+
+
+async def first_attr_async(
+    page_or_card,
+    selectors: List[str],
+    attr: str,
+    stats: Optional[SelectorStats] = None,
+    supplier: str = "",
+    key: str = "",
+) -> str:
+    return await first_attrs_async(page_or_card, selectors, (attr,), stats, supplier, key)
+
+
+async def first_attrs_async(
+    page_or_card,
+    selectors: List[str],
+    attrs: Sequence[str],
+    stats: Optional[SelectorStats] = None,
+    supplier: str = "",
+    key: str = "",
+) -> str:
+    for css in selectors:
+        try:
+            loc = page_or_card.locator(css)
+            if await loc.count() > 0:
+                el = loc.first
+                for attr in attrs:
+                    val = (await el.get_attribute(attr) or "").strip()
+                    if val:
+                        if stats is not None:
+                            stats.record(supplier, key, css)
+                        return val
+        except Exception:
+            continue
+    if stats is not None:
+        stats.record(supplier, key, None)
+    return ""
+
+
+async def _read_field_async(card, field: FieldSpec, stats: Optional[SelectorStats] = None, supplier: str = ""):
+    """Resolve one FieldSpec with per-card locators, mirroring BULK_EXTRACT_JS.
+
+    `stats` records each field's winning selector (or a miss), as first_text
+    does.
+    """
+    if field.all:
+        values: List[str] = []
+        for css in field.selectors:
+            if css == SELF:
+                elements = [card]
+            else:
+                loc = card.locator(css)
+                elements = [loc.nth(i) for i in range(await loc.count())]
+            for el in elements:
+                for attr in field.attrs:
+                    val = (await el.get_attribute(attr) or "").strip()
+                    if val:
+                        values.append(val)
+        return values
+
+    if field.selectors == [SELF]:
+        if not field.attrs:
+            return (await card.inner_text() or "").strip()
+        for attr in field.attrs:
+            val = (await card.get_attribute(attr) or "").strip()
+            if val:
+                return val
+        return ""
+    if not field.attrs:
+        return await first_text_async(card, field.selectors, stats, supplier, field.key)
+    return await first_attrs_async(card, field.selectors, field.attrs, stats, supplier, field.key)
+
+
+async def extract_from_card_async(
+    card,
+    category_name: str,
+    supplier: str,
+    base_url: str,
+    stats: Optional[SelectorStats] = None,
+    plan: Optional[ExtractionPlan] = None,
+) -> Dict[str, Any]:
+    plan = plan or GENERIC_PLAN
+    raw = {}
+    for field in plan.specs:
+        raw[field.key] = await _read_field_async(card, field, stats, supplier)
+    return plan.item(raw, category_name, supplier, base_url)
+
+
+async def extract_cards_bulk_async(
+    cards,
+    category_name: str,
+    supplier: str,
+    base_url: str,
+    mark: Optional[str] = None,
+    stats: Optional[SelectorStats] = None,
+    plan: Optional[ExtractionPlan] = None,
+) -> List[Dict[str, Any]]:
+    plan = plan or GENERIC_PLAN
+    compiled = plan.compiled(stats, supplier)
+    raws = await cards.evaluate_all(BULK_EXTRACT_JS, {"plan": compiled, "mark": mark})
+    if stats is not None:
+        stats.record_raws(supplier, compiled, raws)
+    return [plan.item(raw, category_name, supplier, base_url) for raw in raws]
+
+
+async def handle_consent_async(page: Page, supplier_cfg: SupplierConfig, session: CrawlSession) -> bool:
+    selectors = supplier_cfg.consent
+    if not selectors:
+        return False
+    supplier, base_url = supplier_cfg.supplier, supplier_cfg.base_url
+    ready = session.readiness
+    known = session.consent.known(supplier)
+    started = time.perf_counter()
+    try:
+        consent = consent_locator(page, selectors)
+        timeout_ms = ready.consent_probe_ms if known else ready.consent_timeout_ms
+        if not await wait_for_visible_async(consent, timeout_ms, session.waits, "consent"):
+            session.consent.record_absent(
+                supplier, time.perf_counter() - started, known, ready.consent_timeout_ms / 1000
+            )
+            return False
+        await consent.click()
+        log.debug("Clicked cookie consent button on %s", supplier)
+        await wait_for_visible_async(consent, ready.consent_timeout_ms, session.waits, "consent_dismiss", "hidden")
+        state = await page.context.storage_state() if base_url else None
+        session.consent.record_clicked(supplier, base_url, time.perf_counter() - started, state)
+        return True
+    except Exception as e:
+        log.warning("Cookie handling error for %s (non-critical): %s", supplier, e)
+    return False
+
+
+def page_sleep_async(page: Page):
+    return lambda seconds: page.wait_for_timeout(seconds * 1000)
+
+
+async def pace_async(page: Page, session: CrawlSession, supplier: SupplierConfig):
+    await politeness_delay_async(page, session.readiness)
+    # Tokens are reserved up front, so tabs of one batch queue in turn
+    delay = session.limiter.reserve(supplier.base_url)
+    if delay > 0:
+        await page.wait_for_timeout(delay * 1000)
+
+
+async def scrape_category_async(
+    page: Page,
+    cat: CategoryConfig,
+    supplier: SupplierConfig,
+    target_min: int,
+    extraction: str = "bulk",
+    session: Optional[CrawlSession] = None,
+) -> List[Dict[str, Any]]:
+    """Async counterpart of scraper.scrape_category."""
+    session = session or CrawlSession()
+    saved = session.saved_progress(supplier.supplier, cat.name)
+    if saved.done:
+        log.info(
+            "Skipping %s/%s: finished in a previous run (%d items)", supplier.supplier, cat.name, saved.count
+        )
+        return list(saved.items)
+    # Items a sink already holds from before the resume count toward the target
+    target_min -= saved.count - len(saved.items)
+    category_span = session.profile.span("category", supplier.supplier, cat.name)
+    with log_context(supplier=supplier.supplier, category=cat.name), category_span:
+        if session.tries_http(cat):
+            # httpx.Client is thread-safe; keep the event loop free while it fetches
+            static_items = await asyncio.to_thread(scrape_category_static, cat, supplier, target_min, session)
+            if static_items is not None:
+                return static_items
+
+        started = time.perf_counter()
+        collector = ResponseCollector(supplier.capture) if supplier.capture else None
+        listener = collector.listener_async if collector else None
+        if listener:
+            # On the page, not the context: parallel tabs capture for themselves
+            page.on("response", listener)
+        session.limiter.claim_pages(supplier.base_url, 1, required=1)
+        try:
+            items = await _scrape_category_async(page, cat, supplier, target_min, extraction, session, collector)
+        except Exception as e:
+            session.tiers.record(supplier.supplier, cat.name, "browser", time.perf_counter() - started, False, str(e))
+            raise
+        finally:
+            session.limiter.release_pages(supplier.base_url, 1)
+            if listener:
+                page.remove_listener("response", listener)
+        session.tiers.record(supplier.supplier, cat.name, "browser", time.perf_counter() - started, True)
+        return items
+
+
+async def _scrape_category_async(
+    page: Page,
+    cat: CategoryConfig,
+    supplier: SupplierConfig,
+    target_min: int,
+    extraction: str,
+    session: CrawlSession,
+    collector: Optional[ResponseCollector],
+) -> List[Dict[str, Any]]:
+    ready = session.readiness
+    saved = session.saved_progress(supplier.supplier, cat.name)
+    url = resume_url(cat, saved)
+    log.info("Scraping %s/%s from %s", supplier.supplier, cat.name, url)
+    if saved.page:
+        log.info("Resuming after %d completed steps with %d saved items", saved.page, saved.count)
+
+    async def open_listing():
+        await pace_async(page, session, supplier)
+        response = await page.goto(url, wait_until="domcontentloaded")
+        check_blocked(response.status if response else None, await page.title())
+
+    span = session.profile.span
+    with span("goto", supplier.supplier, cat.name, saved.page + 1):
+        await session.resilience.call_async(
+            supplier.supplier, open_listing, page_sleep_async(page), f"Opening {cat.name}"
+        )
+    with span("consent", supplier.supplier, cat.name):
+        await handle_consent_async(page, supplier, session)
+    with span("ready", supplier.supplier, cat.name, saved.page + 1):
+        ready_ok = await wait_for_cards_async(page, cat.card, ready, session.waits)
+    if not ready_ok:
+        log.warning("No settled cards for %s/%s after %d ms", supplier.supplier, cat.name, ready.ready_timeout_ms)
+        session.resilience.count(supplier.supplier, SELECTOR)
+
+    items: List[Dict[str, Any]] = list(saved.items)
+    seen_keys = set(saved.keys)
+    pending: List[Dict[str, Any]] = []  # accepted since the last checkpoint
+    pages_seen = 0
+    cursor = 0
+    # Response collectors of the extra url_template tabs by id(); `collector` is page's
+    tab_collectors: Dict[int, ResponseCollector] = {}
+    cards_found = 0
+    tally = dict.fromkeys(("cards", "duplicates", "errors"), 0)  # current page, see scraper.py
+    first_error = ""
+    trace_cards = log.isEnabledFor(logging.DEBUG)
+
+    def accept(item: Dict[str, Any], source: str = "dom") -> bool:
+        tally["cards"] += 1
+        if trace_cards and session.card_sample():
+            log.debug("Card %s", item.get("name") if item else None, extra={"card": item, "source": source})
+        if item and item["name"] and item["url"] != supplier.base_url:
+            key = dedupe_key(item)
+            if key in seen_keys:
+                tally["duplicates"] += 1
+            else:
+                item["source"] = source
+                items.append(item)
+                seen_keys.add(key)
+                session.sources.record(supplier.supplier, source)
+                if session.sink is not None:
+                    session.sink.write(item)
+                if session.checkpoint is not None:
+                    pending.append(item)
+                return True
+        return False
+
+    def checkpoint(page_no: int, next_url: str = "", done: bool = False):
+        save_progress(session, supplier, cat, page_no, pending, next_url, done)
+
+    async def save_snapshot(target: Page, page_no: Optional[int]):
+        if session.recorder is not None:
+            html = unmarked(await target.content())
+            session.recorder.save_page(supplier.supplier, cat.name, page_no, target.url, html)
+
+    async def collect_current_page(
+        incremental: bool = False, on: Optional[Page] = None, page_no: Optional[int] = None
+    ) -> int:
+        nonlocal first_error
+        tally.update(cards=0, duplicates=0, errors=0)
+        first_error = ""
+        recorder = session.recorder
+        # Infinite scroll grows one DOM; it is saved once, after the last step
+        if not incremental:
+            await save_snapshot(on or page, page_no)
+        before = len(items)
+        with span("extract", supplier.supplier, cat.name, page_no):
+            new = await _collect(incremental, on)
+        session.counters.record(supplier.supplier, pages=1, accepted=new, **tally)
+        if recorder is not None:
+            recorder.add_items(items[before:])
+        if tally["errors"]:
+            log.warning(
+                "%d cards failed to extract (first: %s)", tally["errors"], first_error, extra={"page": page_no}
+            )
+        return new
+
+    async def _collect(incremental: bool, on: Optional[Page]) -> int:
+        nonlocal cursor, cards_found, first_error
+        capture = tab_collectors.get(id(on), collector) if on is not None else collector
+        if capture is not None:
+            rows = capture.drain()
+            if rows:
+                cards_found = len(rows)
+                log.debug("Captured %d products from JSON for %s/%s", len(rows), supplier.supplier, cat.name)
+                return sum(
+                    1 for row in rows
+                    if accept(item_from_capture(row, cat.name, supplier.supplier, supplier.base_url), "network")
+                )
+
+        cards = (on or page).locator(cat.card)
+
+        if extraction == "bulk":
+            try:
+                extracted = await extract_cards_bulk_async(
+                    cards, cat.name, supplier.supplier, supplier.base_url,
+                    mark=SEEN_MARKER if incremental else None, stats=session.selectors, plan=supplier.plan,
+                )
+            except Exception as e:
+                log.warning(
+                    "Bulk extraction failed for %s/%s, using per-card locators: %s", supplier.supplier, cat.name, e
+                )
+            else:
+                cards_found = len(extracted)
+                log.debug("Found %d new cards for %s/%s", len(extracted), supplier.supplier, cat.name)
+                return sum(1 for item in extracted if accept(item))
+
+        card_count = await cards.count()
+        cards_found = card_count
+        start = 0
+        if incremental:
+            start = cursor if cursor <= card_count else 0
+            cursor = card_count
+        log.debug("Found %d new cards for %s/%s", card_count - start, supplier.supplier, cat.name)
+
+        plan = supplier.plan.for_supplier(session.selectors, supplier.supplier)
+        collected = 0
+        for i in range(start, card_count):
+            try:
+                item = await extract_from_card_async(
+                    cards.nth(i), cat.name, supplier.supplier, supplier.base_url, session.selectors, plan
+                )
+                if accept(item):
+                    collected += 1
+            except Exception as e:
+                tally["errors"] += 1
+                first_error = first_error or f"card {i}: {e}"
+                if trace_cards and session.card_sample():
+                    log.debug("Error processing card %d", i, exc_info=True)
+        return collected
+
+    cut_short = False  # pagination stopped on an error, see scraper.py
+
+    async def click_next() -> bool:
+        nonlocal cut_short
+        if not cat.next_button:
+            log.info("No next_button configured, ending pagination")
+            return False
+        next_button = page.locator(cat.next_button).first
+        if not await next_button.is_visible():
+            log.info("No next page button found, ending pagination")
+            return False
+
+        async def attempt() -> bool:
+            await next_button.scroll_into_view_if_needed()
+            await pace_async(page, session, supplier)
+            old_url, old_first = page.url, await first_card_text_async(page, cat.card)
+            await next_button.click()
+            if not await wait_for_listing_change_async(page, cat.card, old_url, old_first, ready, session.waits):
+                return False
+            await wait_for_cards_async(page, cat.card, ready, session.waits)
+            return True
+
+        try:
+            with span("paginate", supplier.supplier, cat.name):
+                changed = await session.resilience.call_async(
+                    supplier.supplier, attempt, page_sleep_async(page), "Next click"
+                )
+            if not changed:
+                log.info("Listing did not change after clicking next, ending pagination")
+                cut_short = True
+                return False
+        except Exception as e:
+            log.warning("Error navigating to next page: %s", e)
+            cut_short = True
+            return False
+        return True
+
+    if cat.paging_mode == "infinite_scroll":
+        for _ in range(saved.page):
+            await pace_async(page, session, supplier)
+            before = await page.locator(cat.card).count()
+            await page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
+            await wait_for_cards_async(page, cat.card, ready, session.waits, min_count=before + 1,
+                                       timeout_ms=cat.scroll_wait_ms, kind="resume")
+
+        for scroll_step in range(saved.page, cat.scroll_steps):
+            with span("paginate", supplier.supplier, cat.name, scroll_step + 1):
+                await pace_async(page, session, supplier)
+                before = await page.locator(cat.card).count()
+                await page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
+                await wait_for_cards_async(page, cat.card, ready, session.waits, min_count=before + 1,
+                                           timeout_ms=cat.scroll_wait_ms, kind="scroll")
+
+            new_items = await collect_current_page(incremental=True, page_no=scroll_step + 1)
+            log.info("Scroll %d: Collected %d new items", scroll_step + 1, new_items, extra={"page": scroll_step + 1})
+            pages_seen = scroll_step + 1
+            checkpoint(pages_seen)
+
+            if len(items) >= target_min:
+                break
+            if new_items == 0 and scroll_step >= 2:
+                log.info("No new items found after multiple scrolls, stopping")
+                break
+        await save_snapshot(page, pages_seen)
+
+    elif cat.paging_mode == "url_template" and cat.page_template:
+        pages_seen = saved.page + 1
+        new_items = await collect_current_page(page_no=cat.first_page + saved.page)
+        log.info(
+            "Page %d: Collected %d items", cat.first_page + saved.page, new_items,
+            extra={"page": cat.first_page + saved.page},
+        )
+        checkpoint(pages_seen, page_url(cat, cat.first_page + pages_seen))
+        exhausted = cards_found == 0
+        next_n = cat.first_page + pages_seen
+        resume_at = ""
+        extra = 0
+        tabs = [page]
+
+        async def load(tab: Page, n: int) -> bool:
+            async def open_page():
+                await pace_async(tab, session, supplier)
+                response = await tab.goto(page_url(cat, n), wait_until="domcontentloaded",
+                                          timeout=ready.navigation_timeout_ms)
+                check_blocked(response.status if response else None, await tab.title())
+
+            try:
+                with span("goto", supplier.supplier, cat.name, n):
+                    await session.resilience.call_async(
+                        supplier.supplier, open_page, page_sleep_async(tab), f"Opening page {n}"
+                    )
+            except Exception as e:
+                log.warning("Error loading page %d: %s", n, e, extra={"page": n})
+                return False
+            with span("paginate", supplier.supplier, cat.name, n):
+                await wait_for_cards_async(tab, cat.card, ready, session.waits)
+            return True
+
+        try:
+            # Claimed inside the try so a failed new_page() still gives it back
+            extra = session.limiter.claim_pages(supplier.base_url, cat.parallel_pages - 1)
+            for _ in range(extra):
+                tabs.append(await page.context.new_page())
+            if collector is not None:
+                # One collector per tab, so a tab only drains its own responses
+                for tab in tabs[1:]:
+                    tab_collector = ResponseCollector(supplier.capture)
+                    tab.on("response", tab_collector.listener_async)
+                    tab_collectors[id(tab)] = tab_collector
+            while not exhausted and not cut_short and len(items) < target_min and pages_seen < cat.max_pages:
+                batch = list(range(next_n, next_n + min(len(tabs), cat.max_pages - pages_seen)))
+                next_n += len(batch)
+                loaded = await asyncio.gather(*(load(tab, n) for tab, n in zip(tabs, batch)))
+
+                # Collect in page order so output does not depend on load order
+                for tab, n, ok in zip(tabs, batch, loaded):
+                    pages_seen += 1
+                    if not ok:
+                        # Stop at the first gap; resuming reopens page n
+                        cut_short, resume_at = True, page_url(cat, n)
+                        break
+                    new_items = await collect_current_page(on=tab, page_no=n)
+                    log.info("Page %d: Collected %d items", n, new_items, extra={"page": n})
+                    checkpoint(pages_seen, page_url(cat, n + 1))
+                    if cards_found == 0:
+                        log.info("Page %d has no cards, stopping pagination", n, extra={"page": n})
+                        exhausted = True
+                        break
+        finally:
+            try:
+                for tab in tabs[1:]:
+                    await tab.close()
+            finally:
+                session.limiter.release_pages(supplier.base_url, extra)
+        if not cut_short and pages_seen >= cat.max_pages:
+            log.info("Reached max pages (%d), stopping pagination", cat.max_pages)
+
+    else:
+        pages_seen = saved.page
+        # Where the page being collected can be reopened, if it has its own URL
+        resume_at = url if url != cat.url else ""
+        if pages_seen and url == cat.url:
+            # The listing pages in place, so click through to the saved page
+            for _ in range(pages_seen):
+                if not await click_next():
+                    break
+        while True:
+            pages_seen += 1
+            log.debug("Processing page %d of %d", pages_seen, cat.max_pages)
+
+            new_items = await collect_current_page(page_no=pages_seen)
+            log.info("Page %d: Collected %d items", pages_seen, new_items, extra={"page": pages_seen})
+
+            if len(items) >= target_min:
+                log.info("Reached target of %d items, stopping pagination", target_min)
+                break
+            if pages_seen >= cat.max_pages:
+                log.info("Reached max pages (%d), stopping pagination", cat.max_pages)
+                break
+
+            previous_url = page.url
+            if not await click_next():
+                break
+            resume_at = page.url if page.url != previous_url else ""
+            checkpoint(pages_seen, resume_at)
+
+    if cut_short:
+        # Leave the category resumable at the page just collected; its
+        # cards are journaled with it, so a resumed run dedupes them
+        log.info("Pagination of %s/%s ended on an error; it stays resumable", supplier.supplier, cat.name)
+        checkpoint(pages_seen - 1, resume_at)
+    else:
+        checkpoint(pages_seen, done=True)
+    log.info("Finished scraping %s/%s: collected %d items", supplier.supplier, cat.name, len(items))
+    return items
+
+
+async def new_context_async(browser, cfg: ScraperConfig, supplier_cfg: SupplierConfig, session: CrawlSession):
+    context = await browser.new_context(
+        user_agent=cfg.user_agent,
+        viewport={"width": 1280, "height": 720},
+        storage_state=session.consent.storage_state(s.supplier for s in cfg.suppliers),
+        record_har_path=session.recorder.har_path() if session.recorder else None,
+    )
+    context.on("response", make_response_listener(session.blocking))
+    if cfg.block_resources and supplier_cfg.blocking.enabled:
+        await context.route(
+            "**/*", make_async_route_handler(supplier_cfg.blocking, session.blocking, supplier_cfg.base_url)
+        )
+    return context
+
+
+async def scrape_all_async(
+    cfg: ScraperConfig,
+    min_items: int,
+    sink: Optional[ItemSink] = None,
+    checkpoint: Optional[CheckpointStore] = None,
+    selector_stats: Optional[SelectorStats] = None,
+    session: Optional[CrawlSession] = None,
+) -> List[Dict[str, Any]]:
+    """Crawl every supplier from one event loop and one browser.
+
+    Up to `cfg.concurrency` work units run at once, each in its own context,
+    and no supplier exceeds its max_concurrency (or rate_limit.max_pages). With concurrency 1 the
+    min_items target is shared across units exactly like scraper.scrape_all;
+    otherwise each unit aims for it independently. Results are merged in
+    config order; with a `sink` they are streamed to it instead and the
+    returned list is empty. `checkpoint`, `selector_stats` and `session`
+    work as in scraper.scrape_all.
+    """
+    units = plan_work_units(cfg)
+    results: Dict[Tuple[int, int], List[Dict[str, Any]]] = {}
+    counts: Dict[Tuple[int, int], int] = {}
+    pool = asyncio.Semaphore(cfg.concurrency)
+    caps = [asyncio.Semaphore(s.context_cap) for s in cfg.suppliers]
+    shared_target = cfg.concurrency == 1
+    session = session or CrawlSession.for_config(cfg)
+    session.sink = sink
+    session.checkpoint = checkpoint
+    if selector_stats is not None:
+        session.selectors = selector_stats
+
+    async with async_playwright() as p:
+        browser = await p.chromium.launch(headless=cfg.headless)
+
+        async def run_unit(unit) -> None:
+            si, cat_indexes = unit
+            supplier_cfg = cfg.suppliers[si]
+            requeued = None
+            # Take the supplier slot first so a unit waiting on its host cap
+            # does not hold a pool slot another supplier could use.
+            async with caps[si], pool:
+                context = None
+                remaining = list(cat_indexes)  # categories not yet attempted
+                try:
+                    context = await new_context_async(browser, cfg, supplier_cfg, session)
+                    page = await context.new_page()
+                    collected = 0
+                    failures = 0
+                    for pos, ci in enumerate(cat_indexes):
+                        cat = supplier_cfg.categories[ci]
+                        if shared_target:
+                            target = min_items - sum(counts.values())
+                        else:
+                            target = min_items - collected
+                        try:
+                            items = await scrape_category_async(
+                                page, cat, supplier_cfg, target, cfg.extraction, session
+                            )
+                            log.info("Got %d items from %s/%s", len(items), supplier_cfg.supplier, cat.name)
+                            failures = 0
+                        except Exception as e:
+                            log.error("Error scraping %s/%s: %s", supplier_cfg.supplier, cat.name, e, exc_info=True)
+                            items = []
+                            failures += 1
+                            if session.resilience.claim_requeue(supplier_cfg.supplier, cat.name):
+                                log.info("Re-queueing %s/%s", supplier_cfg.supplier, cat.name)
+                                remaining = []
+                                requeued = (si, cat_indexes[pos:])
+                                break
+                            if failures >= session.resilience.cfg.recycle_after:
+                                remaining = cat_indexes[pos + 1:]
+                                await context.close()
+                                context = None
+                                context = await new_context_async(browser, cfg, supplier_cfg, session)
+                                page = await context.new_page()
+                                session.resilience.count(supplier_cfg.supplier, "recycled")
+                                failures = 0
+                        results[(si, ci)] = items if sink is None else []
+                        counts[(si, ci)] = len(items)
+                        collected += len(items)
+                        remaining = cat_indexes[pos + 1:]
+                except Exception as e:
+                    # A context that cannot be set up must not fail the whole gather()
+                    if retry_after_setup_failure(session, supplier_cfg, remaining, e):
+                        requeued = (si, remaining)
+                finally:
+                    if context is not None:
+                        await context.close()
+            if requeued is not None:
+                # Queue for the slots again behind the units already waiting
+                await run_unit(requeued)
+
+        try:
+            await asyncio.gather(*(run_unit(unit) for unit in units))
+        finally:
+            await browser.close()
+
+    all_items: List[Dict[str, Any]] = []
+    for si, supplier_cfg in enumerate(cfg.suppliers):
+        supplier_count = 0
+        for ci in range(len(supplier_cfg.categories)):
+            all_items.extend(results.get((si, ci), []))
+            supplier_count += counts.get((si, ci), 0)
+        log.info("Finished %s: collected %d items", supplier_cfg.supplier, supplier_count)
+    session.close()
+    log.info("Run summary:\n%s", session.report())
+    return all_items
@@ -0,0 +1,321 @@
+"""Full-text search over product names, brands and categories.
+
+SearchIndex is an in-memory inverted index with BM25 ranking, tuned for the
+way buyers type French product names:
+
+- accents and ligatures are folded ("résine" == "resine", "œ" == "oe")
+- dimensions stay whole tokens: "4,63 m²" -> "4.63m2" (plus "4.63"),
+  "30x30cm" and "30 x 30 cm" -> "30x30cm" (plus "30x30")
+- the last query word also matches as a prefix ("carrel" finds "carrelage")
+- words with no exact match fall back to trigram similarity ("carrelge")
+
+All query words must match (words that match nothing at all are ignored), and
+the candidate set comes from the rarest word's postings, so a query touches
+only the documents that can match. A single-word query reads a cached,
+impact-ordered posting list and scores only the page it returns.
+
+`sync(items)` ingests a snapshot incrementally: products are keyed by
+storage.dedupe_key, unchanged text is skipped, changed products are
+re-indexed and products missing from the snapshot are removed.
+"""
+from __future__ import annotations
+
+import heapq
+import math
+import re
+import threading
+import unicodedata
+from bisect import bisect_left
+from itertools import repeat
+from operator import add, mul
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from storage import dedupe_key
+
+K1 = 1.2
+B = 0.75
+
+# Term frequency weight per field
+FIELD_WEIGHTS = (("name", 1.0), ("brand", 2.0), ("category", 0.5))
+
+PREFIX_WEIGHT = 0.7
+TYPO_WEIGHT = 0.6
+MAX_EXPANSIONS = 10
+MIN_TRIGRAM_SIMILARITY = 0.45
+
+STOPWORDS = frozenset(
+    "a au aux avec d de des du en et l la le les ou par pour sans sur un une".split()
+)
+
+_NUM = r"\d+(?:[.,]\d+)?"
+_UNITS = r"mm|cm|dm|km|m2|m3|ml|cl|kg|mg|kw|mah|ah|bar|pcs|m|l|g|w|v"
+_DIMENSION = re.compile(rf"(?<![\w.,])({_NUM}(?:\s*[x*]\s*{_NUM})*)\s*({_UNITS})?(?![a-z0-9])")
+_WORD = re.compile(r"[a-z0-9]+")
+_LIGATURES = str.maketrans({"œ": "oe", "æ": "ae", "×": "x", "ß": "ss"})
+
+
+def fold(text: str) -> str:
+    """Lowercase, drop accents, expand ligatures; "m²" becomes "m2"."""
+    text = text.casefold()
+    if text.isascii():
+        return text
+    # NFKD splits accents (and "²") off the base letter; the ascii pass drops them
+    return unicodedata.normalize("NFKD", text.translate(_LIGATURES)).encode("ascii", "ignore").decode("ascii")
+
+
+def tokenize(text: Optional[str], query: bool = False) -> List[str]:
+    """Dimension tokens first, then the remaining words minus stopwords.
+
+    Documents also index a dimension without its unit ("4.63m2" and "4.63")
+    so a unitless query finds it; a query that names the unit only needs
+    the full token.
+    """
+    folded = fold(text or "")
+    tokens: List[str] = []
+
+    def dimension(match: re.Match) -> str:
+        numbers = re.sub(r"\s*[x*]\s*", "x", match.group(1)).replace(",", ".")
+        unit = match.group(2) or ""
+        tokens.append(numbers + unit)
+        if unit and not query:
+            tokens.append(numbers)
+        return " "
+
+    rest = _DIMENSION.sub(dimension, folded)
+    tokens.extend(w for w in _WORD.findall(rest) if w not in STOPWORDS)
+    return tokens
+
+
+def trigrams(term: str) -> Set[str]:
+    padded = f"${term}$"
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class SearchIndex:
+    def __init__(self, key: Callable[[Dict[str, Any]], Tuple] = dedupe_key):
+        self.key = key
+        self._lock = threading.RLock()
+        self.postings: Dict[str, Dict[int, float]] = {}
+        self.docs: Dict[int, Dict[str, Any]] = {}
+        self._doc_terms: Dict[int, Dict[str, float]] = {}
+        self._doc_text: Dict[int, Tuple[Any, ...]] = {}
+        self._doc_len: Dict[int, float] = {}
+        self._total_len = 0.0
+        self._by_key: Dict[Tuple, int] = {}
+        self._next_id = 0
+        self._trigrams: Dict[str, Set[str]] = {}
+        self._sorted_terms: Optional[List[str]] = None
+        # Per-term BM25 contribution of every posting, and the same docs
+        # sorted by it; built on first use, dropped on any change
+        self._impacts: Dict[str, Dict[int, float]] = {}
+        self._impact_orders: Dict[str, List[int]] = {}
+
+    def __len__(self) -> int:
+        return len(self.docs)
+
+    # --- ingestion ---------------------------------------------------------
+
+    @staticmethod
+    def _text(item: Dict[str, Any]) -> Tuple[Any, ...]:
+        return tuple(item.get(field) for field, _ in FIELD_WEIGHTS)
+
+    @staticmethod
+    def _terms(item: Dict[str, Any]) -> Dict[str, float]:
+        terms: Dict[str, float] = {}
+        for field, weight in FIELD_WEIGHTS:
+            for token in tokenize(item.get(field)):
+                terms[token] = terms.get(token, 0.0) + weight
+        return terms
+
+    def _add(self, item: Dict[str, Any], terms: Dict[str, float]) -> int:
+        doc = self._next_id
+        self._next_id += 1
+        self.docs[doc] = item
+        self._doc_terms[doc] = terms
+        self._doc_text[doc] = self._text(item)
+        length = sum(terms.values())
+        self._doc_len[doc] = length
+        self._total_len += length
+        for term, tf in terms.items():
+            postings = self.postings.get(term)
+            if postings is None:
+                postings = self.postings[term] = {}
+                self._sorted_terms = None
+                for gram in trigrams(term):
+                    self._trigrams.setdefault(gram, set()).add(term)
+            postings[doc] = tf
+        return doc
+
+    def _remove(self, doc: int):
+        del self.docs[doc]
+        del self._doc_text[doc]
+        self._total_len -= self._doc_len.pop(doc)
+        for term in self._doc_terms.pop(doc):
+            postings = self.postings[term]
+            del postings[doc]
+            if not postings:
+                del self.postings[term]
+                self._sorted_terms = None
+                for gram in trigrams(term):
+                    self._trigrams[gram].discard(term)
+
+    def _invalidate(self):
+        self._impacts.clear()
+        self._impact_orders.clear()
+
+    def upsert(self, item: Dict[str, Any]):
+        with self._lock:
+            self._upsert(item)
+            self._invalidate()
+
+    def _upsert(self, item: Dict[str, Any]) -> int:
+        k = self.key(item)
+        doc = self._by_key.get(k)
+        if doc is not None:
+            if self._doc_text[doc] == self._text(item):
+                self.docs[doc] = item  # price and other fields may still change
+                return doc
+            self._remove(doc)
+        doc = self._add(item, self._terms(item))
+        self._by_key[k] = doc
+        return doc
+
+    def sync(self, items: Iterable[Dict[str, Any]]) -> Dict[str, int]:
+        """Make the index match a snapshot; returns counts of what changed."""
+        with self._lock:
+            before = dict(self._by_key)
+            added = updated = 0
+            seen: Set[Tuple] = set()
+            for item in items:
+                k = self.key(item)
+                if k in seen:
+                    continue
+                seen.add(k)
+                old = before.get(k)
+                doc = self._upsert(item)
+                if old is None:
+                    added += 1
+                elif doc != old:
+                    updated += 1
+            removed = 0
+            for k, doc in before.items():
+                if k not in seen:
+                    self._remove(doc)
+                    del self._by_key[k]
+                    removed += 1
+            self._invalidate()
+            return {"added": added, "updated": updated, "removed": removed}
+
+    # --- querying ----------------------------------------------------------
+
+    def _impact(self, term: str) -> Dict[int, float]:
+        """BM25 contribution of `term` to each document containing it."""
+        impact = self._impacts.get(term)
+        if impact is None:
+            postings = self.postings[term]
+            n = len(self.docs)
+            df = len(postings)
+            idf = math.log(1 + (n - df + 0.5) / (df + 0.5))
+            avgdl = self._total_len / n if n else 1.0
+            k1b, kb, doc_len = K1 * (1 - B), K1 * B / avgdl, self._doc_len
+            impact = {d: idf * tf * (K1 + 1) / (tf + k1b + kb * doc_len[d]) for d, tf in postings.items()}
+            self._impacts[term] = impact
+        return impact
+
+    def _impact_order(self, term: str) -> List[int]:
+        order = self._impact_orders.get(term)
+        if order is None:
+            impact = self._impact(term)
+            order = sorted(impact, key=impact.__getitem__, reverse=True)
+            self._impact_orders[term] = order
+        return order
+
+    def _prefix_terms(self, prefix: str) -> List[str]:
+        if self._sorted_terms is None:
+            self._sorted_terms = sorted(self.postings)
+        terms = self._sorted_terms
+        found = []
+        i = bisect_left(terms, prefix)
+        while i < len(terms) and terms[i].startswith(prefix):
+            if terms[i] != prefix:
+                found.append(terms[i])
+            i += 1
+        return heapq.nlargest(MAX_EXPANSIONS, found, key=lambda t: len(self.postings[t]))
+
+    def _similar_terms(self, token: str) -> List[Tuple[str, float]]:
+        grams = trigrams(token)
+        shared: Dict[str, int] = {}
+        for gram in grams:
+            for term in self._trigrams.get(gram, ()):
+                shared[term] = shared.get(term, 0) + 1
+        scored = []
+        for term, common in shared.items():
+            similarity = 2 * common / (len(grams) + len(term))
+            if similarity >= MIN_TRIGRAM_SIMILARITY and term in self.postings:
+                scored.append((term, similarity))
+        return heapq.nlargest(MAX_EXPANSIONS, scored, key=lambda ts: (ts[1], len(self.postings[ts[0]])))
+
+    def expand(self, query: str) -> List[List[Tuple[str, float]]]:
+        """One group of (term, weight) alternatives per query word that matches anything."""
+        tokens = tokenize(query, query=True)
+        as_you_type = bool(query) and not query[-1].isspace()
+        groups = []
+        for i, token in enumerate(tokens):
+            group = [(token, 1.0)] if token in self.postings else []
+            if as_you_type and i == len(tokens) - 1 and len(token) >= 2:
+                group += [(t, PREFIX_WEIGHT) for t in self._prefix_terms(token)]
+            if not group and len(token) >= 4 and not token[0].isdigit():
+                group = [(t, TYPO_WEIGHT * s) for t, s in self._similar_terms(token)]
+            if group:
+                groups.append(group)
+        return groups
+
+    def search(self, query: str, limit: int = 20, offset: int = 0) -> Tuple[int, List[Tuple[float, Dict[str, Any]]]]:
+        """(total matches, [(score, item)] for the requested page), best first.
+
+        Matches come from set intersections over the posting lists and are
+        scored from cached per-term BM25 impacts.
+        """
+        with self._lock:
+            groups = self.expand(query)
+            if not groups:
+                return 0, []
+            k = offset + limit
+            # Per word: [(weight, impact dict)] for each alternative term
+            scorers = [[(w, self._impact(t)) for t, w in g] for g in groups]
+
+            if len(groups) == 1 and len(groups[0]) == 1:
+                (term, weight), = groups[0]
+                impact = scorers[0][0][1]
+                page = self._impact_order(term)[offset:k]
+                return len(impact), [(weight * impact[d], self.docs[d]) for d in page]
+
+            # Intersect starting from the word with the fewest postings. A
+            # dict view & a set only walks the smaller side.
+            def matching(group):
+                if len(group) == 1:
+                    return group[0][1].keys()
+                return set().union(*(impact.keys() for _, impact in group))
+
+            scorers.sort(key=lambda g: sum(len(impact) for _, impact in g))
+            candidates = set(matching(scorers[0]))
+            for group in scorers[1:]:
+                candidates = matching(group) & candidates
+                if not candidates:
+                    return 0, []
+            total = len(candidates)
+
+            # Score column by column with C-level map calls; a word with
+            # several alternative terms takes its best-scoring one
+            docs = list(candidates)
+            scores = [0.0] * total
+            for group in scorers:
+                column = None
+                for weight, impact in group:
+                    values = map(impact.get, docs, repeat(0.0)) if len(group) > 1 else map(impact.__getitem__, docs)
+                    if weight != 1.0:
+                        values = map(mul, values, repeat(weight))
+                    column = list(values) if column is None else list(map(max, column, values))
+                scores = list(map(add, scores, column))
+            scored = heapq.nlargest(k, zip(scores, docs))
+            return total, [(score, self.docs[d]) for score, d in scored[offset:]]
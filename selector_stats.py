@@ -0,0 +1,144 @@
+"""Which selector in each fallback list actually produces values.
+
+Every field is looked up through an ordered list of candidate selectors
+(NAME_HINTS, PRICE_HINTS, a supplier's extraction plan, ...), and the first
+one that yields a value wins. SelectorStats counts the winners per supplier
+and field so dead or misplaced selectors can be found and fixed in the
+config.
+
+The lists are in priority order, not just speed order: a generic selector
+such as `span:has-text('€')` sits behind specific ones because it also
+matches, say, a crossed-out price. Extraction therefore uses the configured
+order, except for fields whose spec sets `adaptive: true` to declare its
+selectors interchangeable. Those are tried most frequent winner first, via
+ranked(), and still fall back to every other selector.
+
+The counts are kept in a small JSON file between runs, and report() shows
+them, including selectors that have never produced a value.
+"""
+from __future__ import annotations
+
+import json
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+log = logging.getLogger(__name__)
+
+# Key under which the bulk and static extractors return the index of the
+# winning selector for each field of a card
+HITS_KEY = "__hits"
+
+
+class SelectorStats:
+    """Hit counts per supplier, field and selector, plus misses per field."""
+
+    def __init__(self, path: Optional[Path] = None):
+        self.path = Path(path) if path else None
+        self._lock = threading.Lock()
+        # (supplier, field) pairs registered by this run
+        self._registered: Set[Tuple[str, str]] = set()
+        # supplier -> field -> {"selectors": [...], "hits": {selector: n}, "misses": n}
+        self.fields: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        if self.path is not None and self.path.exists():
+            try:
+                self.fields = json.loads(self.path.read_text(encoding="utf-8"))["fields"]
+            except (ValueError, KeyError) as e:
+                log.warning("Ignoring unreadable selector stats %s: %s", self.path, e)
+
+    def _entry(self, supplier: str, key: str) -> Dict[str, Any]:
+        entry = self.fields.setdefault(supplier, {}).setdefault(key, {"selectors": [], "hits": {}, "misses": 0})
+        entry.setdefault("hits", {})
+        entry.setdefault("misses", 0)
+        return entry
+
+    def register(self, supplier: str, key: str, selectors: List[str]):
+        """Note a field's configured selectors, so ones that never win show up as dead.
+
+        Only the first call per supplier and field in a run does any work.
+        """
+        if (supplier, key) in self._registered:
+            return
+        with self._lock:
+            self._entry(supplier, key)["selectors"] = list(selectors)
+            self._registered.add((supplier, key))
+
+    def ranked(self, supplier: str, key: str, selectors: List[str]) -> List[str]:
+        """`selectors` by recorded hits, most first; ties keep their given order."""
+        with self._lock:
+            hits = dict(self.fields.get(supplier, {}).get(key, {}).get("hits", {}))
+        return sorted(selectors, key=lambda css: -hits.get(css, 0))
+
+    def record(self, supplier: str, key: str, selector: Optional[str]):
+        """Count a lookup: the selector that produced the value, or None for a miss."""
+        with self._lock:
+            entry = self._entry(supplier, key)
+            if selector is None:
+                entry["misses"] += 1
+            else:
+                entry["hits"][selector] = entry["hits"].get(selector, 0) + 1
+
+    def record_raws(self, supplier: str, plan: List[Dict[str, Any]], raws: List[Dict[str, Any]]):
+        """Count the winners reported by the bulk/static extractors and strip them from `raws`.
+
+        `plan` must be the compiled plan the raws were extracted with; fields
+        that collect every match ("all") have no single winner and are skipped.
+        """
+        fields = [f for f in plan if not f["all"]]
+        with self._lock:
+            for raw in raws:
+                hits = raw.pop(HITS_KEY, None) or {}
+                for f in fields:
+                    entry = self._entry(supplier, f["key"])
+                    i = hits.get(f["key"])
+                    if i is None:
+                        entry["misses"] += 1
+                    else:
+                        css = f["selectors"][i]["source"]
+                        entry["hits"][css] = entry["hits"].get(css, 0) + 1
+
+    def save(self):
+        if self.path is None:
+            return
+        with self._lock:
+            payload = json.dumps({"fields": self.fields}, indent=1, ensure_ascii=False)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        tmp.write_text(payload, encoding="utf-8")
+        os.replace(tmp, self.path)
+
+    def dead(self, supplier: str, key: str) -> List[str]:
+        """Configured selectors that have never produced a value."""
+        with self._lock:
+            entry = self.fields.get(supplier, {}).get(key)
+            if entry is None:
+                return []
+            return [css for css in entry["selectors"] if not entry["hits"].get(css)]
+
+    def report(self, full: bool = False) -> str:
+        """One line per supplier/field; `full` also lists every selector's count."""
+        with self._lock:
+            fields = json.loads(json.dumps(self.fields))
+        lines = []
+        for supplier, per in fields.items():
+            for key, entry in per.items():
+                hits, misses = entry["hits"], entry["misses"]
+                if not hits and not misses:
+                    continue
+                dead = [css for css in entry["selectors"] if not hits.get(css)]
+                ranked = sorted(hits.items(), key=lambda kv: -kv[1])
+                line = f"  {supplier}/{key}: {sum(hits.values())} hits, {misses} misses"
+                if ranked:
+                    line += "; best " + ", ".join(f"{css!r}={n}" for css, n in ranked[:2])
+                if dead:
+                    line += f"; {len(dead)} of {len(entry['selectors'])} selectors never matched"
+                lines.append(line)
+                if full:
+                    for css in entry["selectors"] or [css for css, _ in ranked]:
+                        n = hits.get(css, 0)
+                        lines.append(f"      {n:>7}  {css or '(card itself)'}" + ("" if n else "  dead"))
+        if not lines:
+            return "Selector hits: none"
+        return "\n".join(["Selector hits:"] + lines)
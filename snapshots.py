@@ -0,0 +1,181 @@
+"""Versioned, compressed snapshots of scraped items, with deltas between runs.
+
+Each run written with --write-versioned becomes a version under
+data/versions/:
+
+    manifest.json                 every version, newest last, with delta counts
+    snapshots/<version>.json.gz   full item list
+    deltas/<version>.json.gz      what changed since the previous version
+
+A delta holds the items added, removed, price-changed or otherwise updated,
+keyed by the scraper's dedupe key. The latest version always keeps its full
+snapshot; older ones only keep it every `keyframe_every` versions and are
+otherwise rebuilt by replaying deltas forward from the nearest keyframe. So
+history costs roughly one delta per run, and "what changed" is a single small
+file read.
+
+Fields that differ on every run without the product changing (`timestamp`,
+`source`) are ignored when comparing items, so a rebuilt version keeps the
+values from when the item last really changed.
+"""
+from __future__ import annotations
+
+import gzip
+import json
+import os
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+VOLATILE_FIELDS = ("timestamp", "source")
+
+Key = Tuple[str, ...]
+KeyFunc = Callable[[Dict[str, Any]], Key]
+
+
+def version_id(scraped_at: int) -> str:
+    return time.strftime("%Y%m%dT%H%M%SZ", time.gmtime(scraped_at))
+
+
+def _content(item: Dict[str, Any]) -> Dict[str, Any]:
+    return {k: v for k, v in item.items() if k not in VOLATILE_FIELDS}
+
+
+def index_rows(rows: List[Dict[str, Any]], key: KeyFunc) -> Dict[Key, Dict[str, Any]]:
+    """Rows by key, first occurrence winning, in row order."""
+    indexed: Dict[Key, Dict[str, Any]] = {}
+    for row in rows:
+        indexed.setdefault(key(row), row)
+    return indexed
+
+
+def compute_delta(old_rows: List[Dict[str, Any]], new_rows: List[Dict[str, Any]], key: KeyFunc) -> Dict[str, Any]:
+    old = index_rows(old_rows, key)
+    new = index_rows(new_rows, key)
+    added, price_changed, updated = [], [], []
+    for k, item in new.items():
+        before = old.get(k)
+        if before is None:
+            added.append(item)
+        elif (before.get("price"), before.get("currency")) != (item.get("price"), item.get("currency")):
+            price_changed.append({
+                "old_price": before.get("price"),
+                "new_price": item.get("price"),
+                "item": item,
+            })
+        elif _content(before) != _content(item):
+            updated.append(item)
+    removed = [item for k, item in old.items() if k not in new]
+    return {"added": added, "removed": removed, "price_changed": price_changed, "updated": updated}
+
+
+def apply_delta(rows: List[Dict[str, Any]], delta: Dict[str, Any], key: KeyFunc) -> List[Dict[str, Any]]:
+    """Rebuild the next version from `rows` (deduplicated by key)."""
+    state = index_rows(rows, key)
+    for item in delta["removed"]:
+        state.pop(key(item), None)
+    for item in [c["item"] for c in delta["price_changed"]] + delta["updated"]:
+        state[key(item)] = item
+    for item in delta["added"]:
+        state[key(item)] = item
+    return list(state.values())
+
+
+def _write_gz(path: Path, payload: Any):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(path.suffix + ".tmp")
+    with gzip.open(tmp_path, "wt", encoding="utf-8") as fh:
+        json.dump(payload, fh, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+def _read_gz(path: Path) -> Any:
+    with gzip.open(path, "rt", encoding="utf-8") as fh:
+        return json.load(fh)
+
+
+class SnapshotStore:
+    def __init__(self, root: Path, key: KeyFunc, keyframe_every: int = 6):
+        self.root = Path(root)
+        self.key = key
+        self.keyframe_every = max(1, keyframe_every)
+        self.manifest_path = self.root / "manifest.json"
+
+    def versions(self) -> List[Dict[str, Any]]:
+        if not self.manifest_path.exists():
+            return []
+        return json.loads(self.manifest_path.read_text(encoding="utf-8"))["versions"]
+
+    def _save_manifest(self, versions: List[Dict[str, Any]]):
+        tmp_path = self.manifest_path.with_suffix(".json.tmp")
+        tmp_path.write_text(json.dumps({"versions": versions}, indent=2), encoding="utf-8")
+        os.replace(tmp_path, self.manifest_path)
+
+    def write(self, rows: List[Dict[str, Any]], scraped_at: Optional[int] = None) -> Dict[str, Any]:
+        """Store `rows` as a new version and return its manifest entry."""
+        scraped_at = scraped_at if scraped_at is not None else int(time.time())
+        versions = self.versions()
+        version = version_id(scraped_at)
+        taken = {v["version"] for v in versions}
+        suffix = 2
+        while version in taken:
+            version = f"{version_id(scraped_at)}-{suffix}"
+            suffix += 1
+
+        rows = list(index_rows(rows, self.key).values())
+        base = versions[-1]["version"] if versions else None
+        entry: Dict[str, Any] = {"version": version, "scraped_at": scraped_at, "count": len(rows), "base": base}
+        if base is not None:
+            delta = compute_delta(self.load(base), rows, self.key)
+            delta_rel = f"deltas/{version}.json.gz"
+            _write_gz(self.root / delta_rel, {"version": version, "base": base, **delta})
+            entry["delta"] = delta_rel
+            entry.update({name: len(delta[name]) for name in ("added", "removed", "price_changed", "updated")})
+
+        snapshot_rel = f"snapshots/{version}.json.gz"
+        _write_gz(self.root / snapshot_rel, {"version": version, "scraped_at": scraped_at, "items": rows})
+        entry["snapshot"] = snapshot_rel
+
+        # The previous latest only keeps its full copy if it is a keyframe.
+        # Its file is removed after the manifest stops pointing at it.
+        stale = None
+        if versions and (len(versions) - 1) % self.keyframe_every:
+            stale = versions[-1].get("snapshot")
+            versions[-1]["snapshot"] = None
+        versions.append(entry)
+        self._save_manifest(versions)
+        if stale:
+            (self.root / stale).unlink(missing_ok=True)
+        return entry
+
+    def load(self, version: str) -> List[Dict[str, Any]]:
+        """Items of `version`, from its snapshot or rebuilt from the nearest keyframe."""
+        versions = self.versions()
+        index = next((i for i, v in enumerate(versions) if v["version"] == version), None)
+        if index is None:
+            raise KeyError(f"Unknown version: {version}")
+        start = index
+        while not versions[start].get("snapshot"):
+            start -= 1
+        rows = _read_gz(self.root / versions[start]["snapshot"])["items"]
+        for v in versions[start + 1:index + 1]:
+            rows = apply_delta(rows, self.delta(v["version"]), self.key)
+        return rows
+
+    def delta(self, version: str) -> Dict[str, Any]:
+        """What changed in `version` relative to the one before it."""
+        entry = next((v for v in self.versions() if v["version"] == version), None)
+        if entry is None:
+            raise KeyError(f"Unknown version: {version}")
+        if not entry.get("delta"):
+            return {"version": version, "base": None, "added": [], "removed": [], "price_changed": [], "updated": []}
+        return _read_gz(self.root / entry["delta"])
+
+
+def summarize(entry: Dict[str, Any]) -> str:
+    if not entry.get("base"):
+        return f"Version {entry['version']}: first snapshot, {entry['count']} items"
+    return (
+        f"Version {entry['version']}: {entry['count']} items, +{entry['added']} -{entry['removed']}, "
+        f"{entry['price_changed']} price changes, {entry['updated']} other updates since {entry['base']}"
+    )
@@ -0,0 +1,327 @@
+"""Output sinks for scraped items.
+
+JsonlSink appends every accepted item to a JSON-lines file as the crawl runs,
+so memory stays flat and a crash keeps everything written so far.
+materialize_json rebuilds the classic materials.json layout from that file
+one line at a time.
+
+SqliteSink upserts the same items into a normalized SQLite database
+(suppliers, categories, products, price observations) so downstream lookups
+hit an index instead of scanning one big JSON document.
+"""
+from __future__ import annotations
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+
+
+def dedupe_key(item: Dict[str, Any]) -> Tuple[str, str, str, str]:
+    """Identity of a product across pages, runs and sinks."""
+    return (item["supplier"], item["url"], item["name"], item.get("unit") or "")
+
+
+class JsonlSink:
+    """Append-only JSON-lines writer, safe to share between crawl threads."""
+
+    def __init__(self, path: Path, batch_size: int = 50, append: bool = False):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.batch_size = max(1, batch_size)
+        self.count = 0
+        self._buffer: List[str] = []
+        self._lock = threading.Lock()
+        self._fh = self.path.open("a" if append else "w", encoding="utf-8")
+
+    def write(self, item: Dict[str, Any]):
+        line = json.dumps(item, ensure_ascii=False)
+        with self._lock:
+            self._buffer.append(line)
+            self.count += 1
+            if len(self._buffer) >= self.batch_size:
+                self._flush_locked()
+
+    def flush(self):
+        with self._lock:
+            self._flush_locked()
+
+    def _flush_locked(self):
+        if self._buffer:
+            self._fh.write("\n".join(self._buffer) + "\n")
+            self._buffer = []
+        self._fh.flush()
+        os.fsync(self._fh.fileno())
+
+    def close(self):
+        with self._lock:
+            if self._fh.closed:
+                return
+            self._flush_locked()
+            self._fh.close()
+
+
+def iter_jsonl(path: Path) -> Iterator[Dict[str, Any]]:
+    """Yield items from a JSON-lines file, skipping a torn last line."""
+    with Path(path).open(encoding="utf-8") as fh:
+        for line in fh:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                continue
+
+
+def materialize_json(
+    jsonl_path: Path,
+    out_path: Path,
+    order: Optional[List[Tuple[str, str]]] = None,
+    scraped_at: Optional[int] = None,
+):
+    """Write the {"scraped_at", "count", "items"} layout from a JSONL file.
+
+    Output is byte-identical to json.dumps(payload, indent=2) but only one
+    item is held in memory at a time. With `order` (a list of
+    (supplier, category) pairs), items are emitted group by group in that
+    order, one pass over the file per group, followed by anything left over.
+    The file is replaced atomically.
+    """
+    count = sum(1 for _ in iter_jsonl(jsonl_path))
+    groups = list(order or [])
+    known = set(groups)
+
+    def passes() -> Iterator[Dict[str, Any]]:
+        if not groups:
+            yield from iter_jsonl(jsonl_path)
+            return
+        for group in groups:
+            for item in iter_jsonl(jsonl_path):
+                if (item.get("supplier"), item.get("category")) == group:
+                    yield item
+        for item in iter_jsonl(jsonl_path):
+            if (item.get("supplier"), item.get("category")) not in known:
+                yield item
+
+    out_path = Path(out_path)
+    tmp_path = out_path.with_suffix(out_path.suffix + ".tmp")
+    header = json.dumps({"scraped_at": scraped_at if scraped_at is not None else int(time.time()),
+                         "count": count}, indent=2, ensure_ascii=False)
+    with tmp_path.open("w", encoding="utf-8") as out:
+        # Reopen the header object to append the "items" array
+        out.write(header[:-2] + ',\n  "items": [')
+        first = True
+        for item in passes():
+            body = json.dumps(item, indent=2, ensure_ascii=False).replace("\n", "\n    ")
+            out.write(("\n    " if first else ",\n    ") + body)
+            first = False
+        out.write("]\n}" if first else "\n  ]\n}")
+    os.replace(tmp_path, out_path)
+
+
+SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS suppliers (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS categories (
+    id INTEGER PRIMARY KEY,
+    supplier_id INTEGER NOT NULL REFERENCES suppliers(id),
+    name TEXT NOT NULL,
+    UNIQUE (supplier_id, name)
+);
+-- One row per dedupe key; unit is '' rather than NULL so the key is unique.
+CREATE TABLE IF NOT EXISTS products (
+    id INTEGER PRIMARY KEY,
+    supplier_id INTEGER NOT NULL REFERENCES suppliers(id),
+    category_id INTEGER NOT NULL REFERENCES categories(id),
+    url TEXT NOT NULL,
+    name TEXT NOT NULL,
+    unit TEXT NOT NULL DEFAULT '',
+    brand TEXT,
+    image_url TEXT,
+    price REAL,
+    currency TEXT,
+    source TEXT,
+    first_seen INTEGER NOT NULL,
+    last_seen INTEGER NOT NULL,
+    UNIQUE (supplier_id, url, name, unit)
+);
+CREATE TABLE IF NOT EXISTS price_observations (
+    product_id INTEGER NOT NULL REFERENCES products(id),
+    observed_at INTEGER NOT NULL,
+    price REAL,
+    currency TEXT,
+    PRIMARY KEY (product_id, observed_at)
+);
+CREATE INDEX IF NOT EXISTS idx_products_supplier_category ON products (supplier_id, category_id);
+CREATE INDEX IF NOT EXISTS idx_products_category_price ON products (category_id, price);
+CREATE INDEX IF NOT EXISTS idx_products_url ON products (url);
+CREATE INDEX IF NOT EXISTS idx_products_price ON products (price);
+"""
+
+_UPSERT_PRODUCT = """
+INSERT INTO products (supplier_id, category_id, url, name, unit, brand, image_url, price, currency, source,
+                      first_seen, last_seen)
+VALUES (:supplier_id, :category_id, :url, :name, :unit, :brand, :image_url, :price, :currency, :source,
+        :seen, :seen)
+ON CONFLICT (supplier_id, url, name, unit) DO UPDATE SET
+    category_id = excluded.category_id,
+    brand = excluded.brand,
+    image_url = excluded.image_url,
+    price = excluded.price,
+    currency = excluded.currency,
+    source = excluded.source,
+    last_seen = MAX(products.last_seen, excluded.last_seen)
+"""
+
+_INSERT_OBSERVATION = """
+INSERT OR IGNORE INTO price_observations (product_id, observed_at, price, currency)
+SELECT id, :seen, :price, :currency FROM products
+WHERE supplier_id = :supplier_id AND url = :url AND name = :name AND unit = :unit
+"""
+
+_SELECT_ITEMS = """
+SELECT s.name, c.name, p.name, p.price, p.currency, p.url, p.brand, p.unit, p.image_url, p.last_seen, p.source
+FROM products p
+JOIN suppliers s ON s.id = p.supplier_id
+JOIN categories c ON c.id = p.category_id
+"""
+
+
+def connect_sqlite(path: Path) -> sqlite3.Connection:
+    """Open (and if needed create) an item database in WAL mode."""
+    conn = sqlite3.connect(str(path), check_same_thread=False)
+    # WAL lets readers query while a crawl is writing
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA foreign_keys=ON")
+    conn.executescript(SQLITE_SCHEMA)
+    return conn
+
+
+class SqliteSink:
+    """Batched, transactional upserts keyed by the scraper's dedupe key.
+
+    Same interface as JsonlSink. Every write also records a price
+    observation, so a product's price history survives re-crawls.
+    """
+
+    def __init__(self, path: Path, batch_size: int = 200):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.batch_size = max(1, batch_size)
+        self.count = 0
+        self._buffer: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+        self._conn = connect_sqlite(self.path)
+        self._closed = False
+        self._supplier_ids: Dict[str, int] = {}
+        self._category_ids: Dict[Tuple[int, str], int] = {}
+
+    def write(self, item: Dict[str, Any]):
+        with self._lock:
+            self._buffer.append(item)
+            self.count += 1
+            if len(self._buffer) >= self.batch_size:
+                self._flush_locked()
+
+    def flush(self):
+        with self._lock:
+            self._flush_locked()
+
+    def _id(self, select: str, insert: str, args: Tuple[Any, ...]) -> int:
+        row = self._conn.execute(select, args).fetchone()
+        if row:
+            return row[0]
+        return self._conn.execute(insert, args).lastrowid
+
+    def _supplier_id(self, name: str) -> int:
+        if name not in self._supplier_ids:
+            self._supplier_ids[name] = self._id(
+                "SELECT id FROM suppliers WHERE name = ?", "INSERT INTO suppliers (name) VALUES (?)", (name,)
+            )
+        return self._supplier_ids[name]
+
+    def _category_id(self, supplier_id: int, name: str) -> int:
+        key = (supplier_id, name)
+        if key not in self._category_ids:
+            self._category_ids[key] = self._id(
+                "SELECT id FROM categories WHERE supplier_id = ? AND name = ?",
+                "INSERT INTO categories (supplier_id, name) VALUES (?, ?)",
+                key,
+            )
+        return self._category_ids[key]
+
+    def _flush_locked(self):
+        if not self._buffer:
+            return
+        try:
+            with self._conn:  # one transaction per batch
+                rows = []
+                for item in self._buffer:
+                    supplier_id = self._supplier_id(item["supplier"])
+                    rows.append({
+                        "supplier_id": supplier_id,
+                        "category_id": self._category_id(supplier_id, item["category"]),
+                        "url": item["url"],
+                        "name": item["name"],
+                        "unit": item.get("unit") or "",
+                        "brand": item.get("brand"),
+                        "image_url": item.get("image_url"),
+                        "price": item.get("price"),
+                        "currency": item.get("currency"),
+                        "source": item.get("source"),
+                        "seen": int(item.get("timestamp") or time.time()),
+                    })
+                self._conn.executemany(_UPSERT_PRODUCT, rows)
+                self._conn.executemany(_INSERT_OBSERVATION, rows)
+        except sqlite3.Error:
+            # Ids cached inside the rolled-back transaction no longer exist
+            self._supplier_ids.clear()
+            self._category_ids.clear()
+            raise
+        self._buffer = []
+
+    def close(self):
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            try:
+                self._flush_locked()
+            finally:
+                self._conn.close()
+
+
+def iter_sqlite_items(path: Path, seen_since: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+    """Current products as item dicts, optionally only those seen since a timestamp."""
+    conn = sqlite3.connect(str(path))
+    try:
+        sql, args = _SELECT_ITEMS, ()
+        if seen_since is not None:
+            sql, args = sql + " WHERE p.last_seen >= ?", (seen_since,)
+        for row in conn.execute(sql + " ORDER BY p.id", args):
+            supplier, category, name, price, currency, url, brand, unit, image_url, seen, source = row
+            yield {
+                "supplier": supplier,
+                "category": category,
+                "name": name,
+                "price": price,
+                "currency": currency,
+                "url": url,
+                "brand": brand,
+                "unit": unit,
+                "image_url": image_url,
+                "timestamp": seen,
+                "source": source,
+            }
+    finally:
+        conn.close()
+
+
+ItemSink = Union[JsonlSink, SqliteSink]
@@ -0,0 +1,122 @@
+import json
+import os
+
+import pytest
+from fastapi.testclient import TestClient
+
+from api import MaterialIndex, create_app
+from storage import SqliteSink
+
+
+def item(supplier, category, name, price, brand="Acme"):
+    return {
+        "supplier": supplier, "category": category, "name": name, "price": price, "currency": "€",
+        "url": f"https://example.com/{name}", "brand": brand, "unit": None, "image_url": None,
+        "timestamp": 1, "source": "dom",
+    }
+
+
+ITEMS = [
+    item("Castorama", "Carrelage", "Tile B", 25.0),
+    item("Castorama", "Carrelage", "Tile A", 12.0, brand="GoodHome"),
+    item("Leroy Merlin", "Carrelage", "Tile C", 18.5),
+    item("Castorama", "Peinture", "Paint", None),
+    item("Castorama", "Carrelage", "Tile D", 19.99),
+]
+
+
+def write_snapshot(path, items):
+    path.write_text(json.dumps({"scraped_at": 1, "count": len(items), "items": items}), encoding="utf-8")
+
+
+@pytest.fixture
+def client(tmp_path):
+    source = tmp_path / "materials.json"
+    write_snapshot(source, ITEMS)
+    return TestClient(create_app(source, reload_interval_s=0)), source
+
+
+def names(rows):
+    return [r["name"] for r in rows]
+
+
+def test_index_filters_and_sorts():
+    index = MaterialIndex(ITEMS, "v1")
+    total, rows = index.query(supplier="castorama", category="Carrelage", max_price=20)
+    assert total == 2 and names(rows) == ["Tile A", "Tile D"]
+    assert names(index.query(sort="price")[1]) == ["Tile A", "Tile C", "Tile D", "Tile B", "Paint"]
+    assert names(index.query(sort="-price")[1]) == ["Tile B", "Tile D", "Tile C", "Tile A", "Paint"]
+    assert names(index.query(min_price=18, max_price=25, sort="-price")[1]) == ["Tile B", "Tile D", "Tile C"]
+    assert names(index.query(brand="goodhome")[1]) == ["Tile A"]
+    assert names(index.query(sort="name", offset=1, limit=2)[1]) == ["Tile A", "Tile B"]
+    assert index.query(supplier="nobody") == (0, [])
+    assert index.query(category="Peinture")[1][0]["id"] == 3
+
+
+@pytest.mark.parametrize("sort", [None, "price", "-price", "name", "-name"])
+def test_unfiltered_pages_match_the_full_ordering(sort):
+    index = MaterialIndex(ITEMS, "v1")
+    everything = names(index.query(sort=sort, limit=len(ITEMS))[1])
+    for offset in range(len(ITEMS) + 1):
+        for limit in (1, 2, 3):
+            total, rows = index.query(sort=sort, offset=offset, limit=limit)
+            assert total == len(ITEMS) and names(rows) == everything[offset:offset + limit]
+    if sort in ("price", "-price"):
+        assert everything[-1] == "Paint"
+
+
+def test_items_endpoint_paginates_and_validates(client):
+    c, _ = client
+    body = c.get("/items", params={"category": "carrelage", "sort": "price", "limit": 2, "offset": 1}).json()
+    assert body["total"] == 4 and body["offset"] == 1 and names(body["items"]) == ["Tile C", "Tile D"]
+    assert c.get("/items", params={"sort": "brand"}).status_code == 422
+    assert c.get("/items", params={"limit": 0}).status_code == 422
+    assert c.get("/items/1").json()["name"] == "Tile A"
+    assert c.get("/items/99").status_code == 404
+
+
+def test_etag_and_hot_reload(client):
+    c, source = client
+    first = c.get("/items", params={"supplier": "Castorama"})
+    etag = first.headers["etag"]
+    assert c.get("/items", params={"supplier": "Castorama"}, headers={"If-None-Match": etag}).status_code == 304
+    assert c.get("/items", params={"supplier": "Leroy Merlin"}).headers["etag"] != etag
+
+    write_snapshot(source, ITEMS + [item("Castorama", "Carrelage", "Tile E", 5.0)])
+    stat = source.stat()
+    os.utime(source, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    fresh = c.get("/items", params={"supplier": "Castorama"}, headers={"If-None-Match": etag})
+    assert fresh.status_code == 200 and fresh.json()["total"] == 5
+    assert c.get("/health").json()["reloads"] == 2
+
+
+def test_broken_snapshot_keeps_serving_previous(client, caplog):
+    c, source = client
+    assert c.get("/health").json()["items"] == 5
+    source.write_text('{"items": [', encoding="utf-8")
+    with caplog.at_level("WARNING", logger="api"):
+        assert c.get("/health").json()["items"] == 5
+    assert "keeping the previous snapshot" in caplog.text
+
+
+def test_serves_sqlite_database(tmp_path):
+    db = tmp_path / "materials.db"
+    sink = SqliteSink(db)
+    for row in ITEMS:
+        sink.write(row)
+    sink.close()
+    c = TestClient(create_app(db, reload_interval_s=0))
+    body = c.get("/items", params={"supplier": "Castorama", "min_price": 15}).json()
+    assert names(body["items"]) == ["Tile B", "Tile D"]
+
+
+def test_search_endpoint_ranks_and_follows_reloads(client):
+    c, source = client
+    body = c.get("/search", params={"q": "goodhome tile"}).json()
+    assert body["total"] == 1 and body["items"][0]["name"] == "Tile A" and body["items"][0]["score"] > 0
+    assert c.get("/search", params={"q": ""}).status_code == 422
+
+    write_snapshot(source, ITEMS + [item("Castorama", "Carrelage", "Tile E", 5.0, brand="GoodHome")])
+    stat = source.stat()
+    os.utime(source, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    assert c.get("/search", params={"q": "goodhome"}).json()["total"] == 2
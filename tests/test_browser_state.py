@@ -0,0 +1,59 @@
+import json
+import time
+
+from browser_state import ConsentState, filter_state, site_domain
+
+STATE = {
+    "cookies": [
+        {"name": "didomi_token", "value": "x", "domain": ".leroymerlin.fr", "path": "/", "expires": -1},
+        {"name": "old", "value": "x", "domain": "www.leroymerlin.fr", "path": "/", "expires": 1},
+        {"name": "ga", "value": "x", "domain": ".google-analytics.com", "path": "/", "expires": -1},
+    ],
+    "origins": [
+        {"origin": "https://www.leroymerlin.fr", "localStorage": [{"name": "consent", "value": "1"}]},
+        {"origin": "https://www.manomano.fr", "localStorage": []},
+    ],
+}
+
+
+def test_filter_state_keeps_live_site_cookies_and_origins():
+    assert site_domain("https://www.leroymerlin.fr/") == "leroymerlin.fr"
+    state = filter_state(STATE, "leroymerlin.fr", now=time.time())
+    assert [c["name"] for c in state["cookies"]] == ["didomi_token"]
+    assert [o["origin"] for o in state["origins"]] == ["https://www.leroymerlin.fr"]
+
+
+def test_clicked_consent_is_saved_and_reloaded(tmp_path):
+    consent = ConsentState(tmp_path)
+    assert not consent.known("Leroy Merlin") and consent.storage_state(["Leroy Merlin"]) is None
+    consent.record_clicked("Leroy Merlin", "https://www.leroymerlin.fr", 2.5, STATE)
+    assert consent.known("Leroy Merlin")
+    saved = json.loads((tmp_path / "leroy_merlin.json").read_text())
+    assert saved["consent_s"] == 2.5 and len(saved["storage_state"]["cookies"]) == 1
+
+    later = ConsentState(tmp_path)
+    assert later.known("Leroy Merlin") and not later.known("ManoMano")
+    merged = later.storage_state(["Castorama", "Leroy Merlin"])
+    assert [c["name"] for c in merged["cookies"]] == ["didomi_token"]
+
+
+def test_saved_time_estimate_and_report(tmp_path):
+    ConsentState(tmp_path).record_clicked("Leroy Merlin", "https://www.leroymerlin.fr", 2.5, STATE)
+    consent = ConsentState(tmp_path)
+    # The loaded state spares the first check's click, short probes the later full waits
+    consent.record_absent("Leroy Merlin", 0.5, known=True, timeout_s=3.0)
+    consent.record_absent("Leroy Merlin", 0.5, known=True, timeout_s=3.0)
+    consent.record_absent("Castorama", 3.0, known=False, timeout_s=3.0)
+    assert (consent.rows["Leroy Merlin"]["saved_s"], consent.rows["Leroy Merlin"]["probe_saved_s"]) == (2.0, 2.5)
+    report = consent.report()
+    assert "Leroy Merlin clicked 0, skipped 2 (1.0s spent, ~2.0s + ~2.5s saved)" in report
+    assert "Castorama clicked 0, skipped 0, no banner 1" in report
+    assert report.endswith("~2.0s of banner waits saved by browser state, ~2.5s by short probes")
+
+    fresh = ConsentState()
+    fresh.record_clicked("ManoMano", "https://www.manomano.fr", 1.0, None)
+    assert fresh.known("ManoMano")  # within the run, even without a state directory
+    fresh.record_absent("ManoMano", 0.5, known=True, timeout_s=3.0)
+    # Nothing was loaded, so nothing is credited to browser state
+    assert fresh.report().endswith("~0.0s of banner waits saved by browser state, ~2.5s by short probes")
+    assert ConsentState().report() == "Consent: none"
@@ -0,0 +1,76 @@
+from checkpoint import CategoryProgress, CheckpointStore
+from scraper import CategoryConfig, resume_url
+
+
+def item(name):
+    return {"supplier": "S", "category": "C", "name": name, "url": f"https://s.example/{name}", "unit": None}
+
+
+def key(i):
+    return ("S", i["url"], i["name"], "")
+
+
+def test_record_and_resume(tmp_path):
+    path = tmp_path / "checkpoint.jsonl"
+    store = CheckpointStore(path, started_at=100)
+    store.record("S", "C", 1, [item("a"), item("b")], [key(item("a")), key(item("b"))], next_url="https://s.example/?p=2")
+    store.record("S", "C", 2, [item("c")], [key(item("c"))])
+    store.record("S", "D", 1, [], [], done=True)
+    store.close()
+
+    resumed = CheckpointStore(path, resume=True, started_at=200)
+    assert resumed.started_at == 100  # the interrupted run's start
+    c = resumed.progress("S", "C")
+    assert c.page == 2 and not c.done and c.next_url == ""
+    assert [i["name"] for i in c.items] == ["a", "b", "c"]
+    assert key(item("b")) in c.keys
+    assert resumed.progress("S", "D").done
+    assert resumed.progress("S", "missing") == CategoryProgress()
+    assert "3 items (1 categories skipped, 1 restarted mid-way)" in resumed.report()
+    resumed.close(finished=True)
+    assert not path.exists()
+
+
+def test_fresh_run_truncates_and_torn_line_is_ignored(tmp_path):
+    path = tmp_path / "checkpoint.jsonl"
+    store = CheckpointStore(path)
+    store.record("S", "C", 1, [item("a")], [key(item("a"))])
+    store.close()
+    with path.open("a", encoding="utf-8") as fh:
+        fh.write('{"supplier": "S", "category": "C", "page": 9')
+
+    assert CheckpointStore(path, resume=True).progress("S", "C").page == 1
+    fresh = CheckpointStore(path)
+    assert fresh.progress("S", "C").page == 0
+    assert fresh.report() == "Checkpoint: fresh run"
+    fresh.close()
+    assert path.read_text(encoding="utf-8") == f'{{"started_at": {fresh.started_at}}}\n'
+
+
+def test_resume_url():
+    base = dict(name="C", url="https://s.example/list", card=".card")
+    paged = CategoryConfig(paging_mode="url_template", page_template="?page={n}", **base)
+    clicked = CategoryConfig(paging_mode="pagination", **base)
+    scrolled = CategoryConfig(paging_mode="infinite_scroll", **base)
+
+    assert resume_url(paged, CategoryProgress()) == base["url"]
+    assert resume_url(paged, CategoryProgress(page=3)) == "https://s.example/list?page=4"
+    assert resume_url(clicked, CategoryProgress(page=2, next_url="https://s.example/list/p3")) == "https://s.example/list/p3"
+    assert resume_url(clicked, CategoryProgress(page=2)) == base["url"]
+    assert resume_url(scrolled, CategoryProgress(page=5, next_url="x")) == base["url"]
+
+
+def test_streaming_store_journals_keys_only(tmp_path):
+    path = tmp_path / "checkpoint.jsonl"
+    store = CheckpointStore(path, items=False)
+    store.record("S", "C", 1, [item("a"), item("b")], [key(item("a")), key(item("b"))])
+    live = store.progress("S", "C")
+    assert (live.page, live.count, live.items) == (1, 2, [])
+    store.close()
+    assert "items" not in path.read_text(encoding="utf-8")
+
+    resumed = CheckpointStore(path, resume=True, items=False)
+    c = resumed.progress("S", "C")
+    assert (c.count, c.items, key(item("b")) in c.keys) == (2, [], True)
+    assert "resumed 2 items" in resumed.report()
+    resumed.close()
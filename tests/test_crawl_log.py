@@ -0,0 +1,105 @@
+import io
+import json
+import logging
+import threading
+
+import pytest
+
+from crawl_log import LoggingConfig, Sampler, log_context, parse_logging_config, setup_logging, stop_logging
+
+
+@pytest.fixture
+def restore_root():
+    root = logging.getLogger()
+    handlers, level = list(root.handlers), root.level
+    yield
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    for handler in handlers:
+        root.addHandler(handler)
+    root.setLevel(level)
+
+
+def _run(cfg, emit):
+    stream = io.StringIO()
+    listener = setup_logging(cfg, stream=stream)
+    try:
+        emit(logging.getLogger("scraper"))
+    finally:
+        stop_logging(listener)
+    return stream.getvalue().splitlines()
+
+
+def test_parse_logging_config_defaults_and_validation():
+    assert parse_logging_config(None) == LoggingConfig()
+    cfg = parse_logging_config({"level": "debug", "format": "text", "card_sample_rate": 0.5})
+    assert (cfg.level, cfg.format, cfg.card_sample_rate) == ("DEBUG", "text", 0.5)
+    with pytest.raises(ValueError):
+        parse_logging_config({"format": "xml"})
+
+
+def test_json_lines_carry_context_extra_fields_and_traceback(restore_root):
+    def emit(log):
+        with log_context(supplier="Castorama", category="Carrelage"):
+            log.info("Page %d: Collected %d items", 2, 24, extra={"page": 2})
+            try:
+                raise ValueError("bad card")
+            except ValueError:
+                log.error("Error scraping", exc_info=True)
+        log.info("outside")
+
+    lines = [json.loads(line) for line in _run(LoggingConfig(), emit)]
+    assert lines[0]["msg"] == "Page 2: Collected 24 items"
+    assert lines[0]["level"] == "INFO"
+    assert (lines[0]["supplier"], lines[0]["category"], lines[0]["page"]) == ("Castorama", "Carrelage", 2)
+    assert "ValueError: bad card" in lines[1]["exc"]
+    assert "supplier" not in lines[2]
+
+
+def test_default_level_drops_debug_and_context_is_per_thread(restore_root):
+    def emit(log):
+        def worker():
+            with log_context(supplier="ManoMano"):
+                log.info("from worker")
+
+        with log_context(supplier="Leroy Merlin"):
+            log.debug("per-card detail")
+            thread = threading.Thread(target=worker)
+            thread.start()
+            thread.join()
+            log.info("from main")
+
+    lines = [json.loads(line) for line in _run(LoggingConfig(), emit)]
+    assert [(r["msg"], r["supplier"]) for r in lines] == [
+        ("from worker", "ManoMano"),
+        ("from main", "Leroy Merlin"),
+    ]
+
+
+def test_text_format_prefixes_context(restore_root):
+    def emit(log):
+        with log_context(supplier="Castorama", category="Sol"):
+            log.warning("No settled cards")
+
+    (line,) = _run(LoggingConfig(format="text"), emit)
+    assert line.endswith("WARNING [Castorama/Sol] No settled cards")
+
+
+def test_records_after_stop_are_written_directly(restore_root):
+    log = logging.getLogger("scraper")
+    stream = io.StringIO()
+    listener = setup_logging(LoggingConfig(), stream=stream)
+    log.info("queued")
+    stop_logging(listener)
+    with log_context(supplier="Castorama"):
+        log.info("after stop")
+    lines = [json.loads(line) for line in stream.getvalue().splitlines()]
+    assert [r["msg"] for r in lines] == ["queued", "after stop"]
+    assert lines[1]["supplier"] == "Castorama"
+
+
+def test_sampler_keeps_one_in_n():
+    sample = Sampler(0.25)
+    assert sum(sample() for _ in range(100)) == 25
+    assert not any(Sampler(0)() for _ in range(10))
+    assert all(Sampler(1.0)() for _ in range(10))
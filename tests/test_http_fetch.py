@@ -0,0 +1,163 @@
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import pytest
+
+from checkpoint import CheckpointStore
+from http_fetch import HttpFetcher, TierStats, extract_static, next_link, parse_html
+from scraper import (
+    GENERIC_PLAN,
+    CategoryConfig,
+    CrawlSession,
+    ScraperConfig,
+    SupplierConfig,
+    scrape_category_static,
+)
+
+PAGE_1 = """<html><body>
+<div class="product-card">
+    <h3>Test Product 1</h3>
+    <span class="brand">Acme</span>
+    <span>49,99 €</span>
+    <a href="/p/product1">Details</a>
+    <img src="https://cdn.example.com/img1.jpg">
+</div>
+<div class="product-card">
+    <h3>Test Product 2</h3>
+    <div class="price">99,99 €</div>
+    <a href="/p/product2">Details</a>
+</div>
+<a class="next-page" href="/list?page=2">Next</a>
+</body></html>"""
+
+PAGE_2 = """<html><body>
+<div class="product-card"><h3>Test Product 3</h3><div class="price">5 €</div><a href="/p/product3">x</a></div>
+</body></html>"""
+
+EMPTY = "<html><body><div id='app'></div></body></html>"
+
+
+@pytest.fixture
+def site():
+    pages = {"/list": PAGE_1, "/list?page=2": PAGE_2, "/spa": EMPTY, "/broken": PAGE_1.replace("/list?page=2", "/gone")}
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            body = pages.get(self.path)
+            self.send_response(200 if body else 404)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.end_headers()
+            self.wfile.write((body or "not found").encode("utf-8"))
+
+        def log_message(self, *args):
+            pass
+
+    server = HTTPServer(("localhost", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://localhost:{server.server_port}"
+    server.shutdown()
+
+
+def test_extract_static_uses_compiled_plan():
+    raws = extract_static(parse_html(PAGE_1), ".product-card", GENERIC_PLAN.compiled())
+    assert [r["name"] for r in raws] == ["Test Product 1", "Test Product 2"]
+    assert raws[0]["price"] == "49,99 €"  # via span:has-text('€')
+    assert raws[0]["brand"] == "Acme"
+    assert raws[0]["image_url"] == "https://cdn.example.com/img1.jpg"
+    assert raws[1]["url"] == "/p/product2"
+
+
+def test_next_link():
+    root = parse_html(PAGE_1)
+    assert next_link(root, ".next-page") == "/list?page=2"
+    assert next_link(root, ".missing") == ""
+    assert next_link(root, None) == ""
+
+
+def _supplier(base_url, **cat_kwargs):
+    cat = CategoryConfig(name="Cat", card=".product-card", **cat_kwargs)
+    return cat, SupplierConfig(supplier="TestSupplier", base_url=base_url, categories=[cat])
+
+
+def test_scrape_category_static_follows_pagination(site):
+    cat, supplier = _supplier(site, url=f"{site}/list", paging_mode="pagination", next_button=".next-page")
+    session = CrawlSession(http=HttpFetcher())
+    try:
+        items = scrape_category_static(cat, supplier, 100, session)
+    finally:
+        session.close()
+    assert [i["name"] for i in items] == ["Test Product 1", "Test Product 2", "Test Product 3"]
+    assert {i["source"] for i in items} == {"html"}
+    assert session.tiers.rows[0]["tier"] == "http" and session.tiers.rows[0]["ok"]
+
+
+def test_scrape_category_static_escalates_without_cards(site):
+    cat, supplier = _supplier(site, url=f"{site}/spa", paging_mode="none")
+    session = CrawlSession(http=HttpFetcher())
+    try:
+        assert scrape_category_static(cat, supplier, 100, session) is None
+    finally:
+        session.close()
+    assert not session.tiers.rows[0]["ok"]
+    assert "escalated" in session.tiers.report()
+
+
+def test_scrape_category_static_failed_page_stays_resumable(site, tmp_path):
+    cat, supplier = _supplier(site, url=f"{site}/broken", paging_mode="pagination", next_button=".next-page")
+    session = CrawlSession(http=HttpFetcher(), checkpoint=CheckpointStore(tmp_path / "checkpoint.jsonl"))
+    try:
+        items = scrape_category_static(cat, supplier, 100, session)
+    finally:
+        session.close()
+        session.checkpoint.close()
+    assert len(items) == 2
+    saved = session.checkpoint.progress("TestSupplier", "Cat")
+    assert (saved.page, saved.next_url, saved.done) == (1, f"{site}/gone", False)
+
+
+def test_http_tier_is_opt_in_per_category():
+    def session(*renders, fetch="browser"):
+        cats = [
+            CategoryConfig(name=r, url="https://s.example", card=".c", paging_mode="none", render=r) for r in renders
+        ]
+        supplier = SupplierConfig(supplier="S", base_url="https://s.example", categories=cats)
+        cfg = ScraperConfig(headless=True, user_agent=None, suppliers=[supplier], fetch=fetch)
+        return CrawlSession.for_config(cfg), cats
+
+    browser, _ = session("auto", "required")
+    assert browser.http is None
+    for fetch, expected in (("browser", [False, True, False]), ("hybrid", [True, True, False])):
+        s, cats = session("auto", "optional", "required", fetch=fetch)
+        try:
+            assert [s.tries_http(c) for c in cats] == expected
+        finally:
+            s.close()
+
+
+def test_tier_stats_report():
+    stats = TierStats()
+    stats.record("S", "C", "browser", 1.234, True)
+    assert stats.report() == "Fetch tiers:\n  S/C: browser 1.23s ok"
+
+
+def test_scrape_category_static_resumes_from_checkpoint(site, tmp_path):
+    cat, supplier = _supplier(site, url=f"{site}/list", paging_mode="pagination", next_button=".next-page")
+    path = tmp_path / "checkpoint.jsonl"
+    session = CrawlSession(http=HttpFetcher(), checkpoint=CheckpointStore(path))
+    try:
+        scrape_category_static(cat, supplier, 100, session)
+    finally:
+        session.checkpoint.close()
+    # Keep the header and the first page's record, as if the run died on page 2
+    path.write_text("\n".join(path.read_text(encoding="utf-8").splitlines()[:2]) + "\n", encoding="utf-8")
+
+    resumed = CrawlSession(http=HttpFetcher(), checkpoint=CheckpointStore(path, resume=True))
+    try:
+        items = scrape_category_static(cat, supplier, 100, resumed)
+    finally:
+        resumed.close()
+        resumed.checkpoint.close()
+    assert [i["name"] for i in items] == ["Test Product 1", "Test Product 2", "Test Product 3"]
+    assert resumed.sources.counts == {"TestSupplier": {"html": 1}}
+    assert CheckpointStore(path, resume=True).progress("TestSupplier", "Cat").done
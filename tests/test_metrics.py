@@ -0,0 +1,70 @@
+import urllib.error
+import urllib.request
+
+import pytest
+
+from metrics import CONTENT_TYPE, CrawlCounters, MetricsServer, render
+from profiling import Profiler
+from scraper import CrawlSession
+
+
+def _samples(text):
+    return dict(line.rsplit(" ", 1) for line in text.splitlines() if line and not line.startswith("#"))
+
+
+def test_counters_accumulate_per_supplier():
+    counters = CrawlCounters()
+    counters.record("A", pages=1, cards=24, accepted=20, duplicates=4)
+    counters.record("A", pages=1, cards=24, accepted=23, errors=1)
+    counters.record("B", accepted=5)
+    assert counters.summary()["A"] == {"pages": 2, "cards": 48, "accepted": 43, "duplicates": 4, "errors": 1}
+    assert counters.summary()["B"]["pages"] == 0
+    assert counters.report().startswith("Pages: A 2 pages, 48 cards (43 accepted, 4 duplicates, 1 errors)")
+
+
+def test_render_exports_session_counters_and_histograms():
+    session = CrawlSession(profile=Profiler())
+    session.counters.record("Leroy Merlin", pages=2, cards=48, accepted=40, duplicates=8)
+    session.sources.record("Leroy Merlin", "dom", 40)
+    session.profile.record(("extract", "Leroy Merlin", "Sol", 1), 3.0)
+    session.profile.record(("extract", "Leroy Merlin", "Sol", 2), 40.0)
+    session.waits.record("ready", 1.5, True)
+    session.resilience.count("Leroy Merlin", "timeout", 2)
+    session.resilience.count("Leroy Merlin", "recycled")
+    session.blocking.record_response("2048")
+
+    text = render(session)
+    samples = _samples(text)
+    assert samples['scraper_items_accepted_total{supplier="Leroy Merlin"}'] == "40"
+    assert samples['scraper_items_duplicated_total{supplier="Leroy Merlin"}'] == "8"
+    assert samples['scraper_items_by_source_total{supplier="Leroy Merlin",source="dom"}'] == "40"
+    assert samples['scraper_wait_seconds_total{kind="ready"}'] == "1.5"
+    assert samples['scraper_failures_total{supplier="Leroy Merlin",kind="timeout"}'] == "2"
+    assert samples['scraper_browser_restarts_total{supplier="Leroy Merlin"}'] == "1"
+    assert samples['scraper_received_bytes_total{tier="browser"}'] == "2048"
+
+    # Buckets are cumulative and end with +Inf == _count
+    bucket = 'scraper_phase_duration_seconds_bucket{phase="extract",supplier="Leroy Merlin",le="%s"}'
+    assert samples[bucket % "0.001"] == "0"
+    assert samples[bucket % "0.005"] == "1"
+    assert samples[bucket % "0.05"] == "2"
+    assert samples[bucket % "+Inf"] == "2"
+    assert samples['scraper_phase_duration_seconds_count{phase="extract",supplier="Leroy Merlin"}'] == "2"
+    assert text.count("# TYPE scraper_phase_duration_seconds histogram") == 1
+
+
+def test_label_values_are_escaped():
+    session = CrawlSession()
+    session.counters.record('Say "hi"\\', pages=1)
+    assert 'scraper_pages_total{supplier="Say \\"hi\\"\\\\"} 1' in render(session)
+
+
+def test_server_serves_metrics_only_at_metrics_path():
+    session = CrawlSession()
+    session.counters.record("A", pages=3)
+    with MetricsServer(session, 0) as server:
+        with urllib.request.urlopen(server.url) as response:
+            assert response.headers["Content-Type"] == CONTENT_TYPE
+            assert 'scraper_pages_total{supplier="A"} 3' in response.read().decode()
+        with pytest.raises(urllib.error.HTTPError):
+            urllib.request.urlopen(server.url.replace("/metrics", "/"))
@@ -0,0 +1,67 @@
+import json
+import threading
+
+from profiling import BUCKETS_MS, Histogram, Profiler
+
+
+def test_disabled_profiler_records_nothing():
+    profiler = Profiler(enabled=False)
+    with profiler.span("goto", "S", "C", 1):
+        pass
+    assert profiler.span("goto") is profiler.span("extract")
+    assert profiler.phases == {}
+    assert profiler.report() == "Run profile: no spans recorded"
+
+
+def test_histogram_buckets_and_quantiles():
+    hist = Histogram()
+    for ms in [0.5, 3, 3, 4, 40, 40, 40, 40, 400, 60000]:
+        hist.add(ms)
+    assert hist.n == 10
+    assert hist.counts[BUCKETS_MS.index(1)] == 1
+    assert hist.counts[BUCKETS_MS.index(5)] == 3
+    assert hist.quantile(0.5) == 50
+    # The open bucket reports the observed maximum
+    assert hist.quantile(1.0) == 60000
+    assert hist.to_dict()["buckets"] == {"1": 1, "5": 3, "50": 4, "500": 1, "inf": 1}
+
+
+def test_spans_aggregate_per_phase_and_supplier_and_keep_slowest():
+    profiler = Profiler()
+    profiler.record(("goto", "A", "Sol", 1), 120.0)
+    profiler.record(("goto", "B", "Mur", 1), 30.0)
+    profiler.record(("extract", "A", "Sol", 2), 8.0)
+    with profiler.span("consent", "A", "Sol"):
+        pass
+
+    data = profiler.to_dict()
+    assert data["phases"]["goto"]["count"] == 2
+    assert data["phases"]["goto"]["total_ms"] == 150.0
+    assert set(data["suppliers"]["A"]) == {"goto", "extract", "consent"}
+    assert data["suppliers"]["B"]["goto"]["count"] == 1
+    assert data["slowest"][0] == {"phase": "goto", "supplier": "A", "category": "Sol", "page": 1, "ms": 120.0}
+    json.dumps(data)
+
+    report = profiler.report()
+    assert report.splitlines()[2].split()[0] == "goto"  # most total time first
+    assert "120.0 ms  goto A/Sol page 1" in report
+
+
+def test_span_records_from_many_threads(tmp_path):
+    profiler = Profiler()
+
+    def work():
+        for _ in range(200):
+            with profiler.span("extract", "S", "C"):
+                pass
+
+    threads = [threading.Thread(target=work) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert profiler.phases["extract"].n == 800
+    assert len(profiler.to_dict()["slowest"]) == 10
+
+    profiler.save(tmp_path / "profile.json")
+    assert json.loads((tmp_path / "profile.json").read_text())["phases"]["extract"]["count"] == 800
@@ -0,0 +1,90 @@
+import pytest
+
+from rate_limit import RateLimitConfig, RateLimiter, TokenBucket, host_of, parse_rate_limit_config
+from scraper import CONFIG_PATH, SupplierConfig, SupplierScheduler, load_config
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_token_bucket_allows_burst_then_paces():
+    clock = FakeClock()
+    bucket = TokenBucket(rate=2, burst=3, clock=clock)
+    assert [bucket.reserve() for _ in range(3)] == [0, 0, 0]
+    # Callers reserving at the same instant queue one interval apart
+    assert bucket.reserve() == pytest.approx(0.5)
+    assert bucket.reserve() == pytest.approx(1.0)
+    clock.now += 1.0
+    assert bucket.ready_in() == pytest.approx(0.5)
+    clock.now += 10
+    # A quiet spell refills up to the burst, not beyond
+    assert [bucket.reserve() for _ in range(3)] == [0, 0, 0]
+    assert bucket.reserve() > 0
+
+
+def test_limiter_is_per_host_and_counts_waits():
+    clock = FakeClock()
+    limiter = RateLimiter(clock=clock)
+    limiter.configure("https://www.castorama.fr", RateLimitConfig(requests_per_s=1, burst=1))
+    assert limiter.reserve("https://www.castorama.fr/sol") == 0
+    assert limiter.reserve("https://www.castorama.fr/mur?page=2") == pytest.approx(1.0)
+    # Unconfigured hosts are not paced
+    assert limiter.reserve("https://www.manomano.fr") == 0
+    assert limiter.ready_in("https://www.castorama.fr") == pytest.approx(2.0)
+
+    slept = []
+    assert limiter.wait("https://www.castorama.fr", sleep=slept.append) == pytest.approx(2.0)
+    assert slept == [pytest.approx(2.0)]
+    report = limiter.report()
+    assert "www.castorama.fr 3 requests, waited 3.0s (1/s burst 1)" in report
+    assert "www.manomano.fr 1 requests, waited 0.0s (unlimited)" in report
+
+
+def test_claim_pages_caps_extra_tabs():
+    limiter = RateLimiter()
+    limiter.configure("https://a.example", RateLimitConfig(max_pages=4))
+    assert limiter.claim_pages("https://a.example", 1, required=1) == 1
+    assert limiter.claim_pages("https://a.example", 1, required=1) == 1
+    assert limiter.claim_pages("https://a.example", 3) == 2
+    assert limiter.claim_pages("https://a.example", 3) == 0
+    # The main page of a context is granted even over the cap
+    assert limiter.claim_pages("https://a.example", 1, required=1) == 1
+    limiter.release_pages("https://a.example", 3)
+    assert limiter.claim_pages("https://a.example", 3) == 2
+    assert limiter.claim_pages("https://b.example", 7) == 7
+
+
+def test_parse_rate_limit_config_and_supplier_cap():
+    cfg = parse_rate_limit_config({"requests_per_s": 0.5, "burst": 0, "max_pages": 2})
+    assert cfg == RateLimitConfig(requests_per_s=0.5, burst=1, max_pages=2)
+    assert not parse_rate_limit_config(None).enabled
+    assert host_of("https://WWW.Example.com:8080/x") == "www.example.com"
+
+    supplier = SupplierConfig("S", "https://s.example", [], max_concurrency=3, rate_limit=cfg)
+    assert supplier.context_cap == 2
+    supplier.rate_limit = RateLimitConfig()
+    assert supplier.context_cap == 3
+
+
+def test_shipped_config_rate_limits_every_supplier():
+    cfg = load_config(CONFIG_PATH)
+    for supplier in cfg.suppliers:
+        assert supplier.rate_limit.enabled
+        assert supplier.rate_limit.max_pages >= 1
+
+
+def test_scheduler_prefers_host_that_is_free_soonest():
+    waits = {0: 1.5, 1: 0.0, 2: 0.0}
+    scheduler = SupplierScheduler([(0, [0]), (1, [0]), (2, [0]), (0, [1])], caps=[2, 1, 1], ready_in=waits.get)
+    # Supplier 0 is first in config order but its host is out of tokens
+    assert scheduler.acquire() == (1, [0])
+    assert scheduler.acquire() == (2, [0])
+    waits[0] = 0.0
+    assert scheduler.acquire() == (0, [0])
+    assert scheduler.acquire() == (0, [1])
+    assert scheduler.acquire() is None
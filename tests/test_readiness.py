@@ -0,0 +1,24 @@
+from readiness import ReadinessConfig, WaitStats, parse_readiness_config
+
+
+def test_parse_readiness_config():
+    cfg = parse_readiness_config({"stable_ms": "500", "politeness_delay_ms": 250})
+    assert cfg.stable_ms == 500
+    assert cfg.politeness_delay_ms == 250
+    assert cfg.ready_timeout_ms == ReadinessConfig().ready_timeout_ms
+    assert parse_readiness_config(None) == ReadinessConfig()
+
+
+def test_wait_stats_records_time_and_timeouts():
+    stats = WaitStats()
+    with stats.timed("scroll"):
+        pass
+    with stats.timed("scroll") as outcome:
+        outcome["met"] = False
+    stats.record("consent", 1.5, True)
+
+    summary = stats.summary()
+    assert summary["scroll"]["count"] == 2
+    assert summary["scroll"]["timeouts"] == 1
+    assert summary["consent"] == {"count": 1, "seconds": 1.5, "timeouts": 0}
+    assert stats.report().startswith("Waits: consent 1.5s/1")
@@ -0,0 +1,57 @@
+import json
+
+import pytest
+
+from recording import Recorder, Recording, diff_items, summarize_diff
+from storage import dedupe_key
+
+
+def _item(name, price, brand="B", url=None):
+    return {
+        "supplier": "S", "category": "C", "name": name, "price": price, "currency": "€",
+        "url": url or f"https://s/{name}", "brand": brand, "unit": "", "image_url": "",
+        "timestamp": 1, "source": "dom",
+    }
+
+
+def test_recorder_writes_manifest_pages_and_items(tmp_path):
+    recorder = Recorder(tmp_path / "run", har=True)
+    recorder.save_page("S", "C", 1, "https://s/c", "<html><body>one</body></html>")
+    recorder.add_items([_item("a", 1.0)])
+    recorder.save_page("S", "C", 2, "https://s/c?page=2", "<html><body>two</body></html>")
+    assert recorder.har_path() == str(tmp_path / "run" / "traffic-1.har")
+    recorder.close()
+
+    manifest = json.loads((tmp_path / "run" / "manifest.json").read_text())
+    assert [p["file"] for p in manifest["pages"]] == ["pages/00001.html", "pages/00002.html"]
+    assert manifest["pages"][1]["url"] == "https://s/c?page=2"
+    assert manifest["hars"] == ["traffic-1.har"]
+    assert (tmp_path / "run" / "pages" / "00002.html").read_text().endswith("two</body></html>")
+
+    recording = Recording(tmp_path / "run")
+    assert recording.items()[0]["name"] == "a"
+    assert recording.hars == []  # the HAR is only written when its context closes
+
+
+def test_recording_serves_snapshots_without_scripts_and_finds_latest(tmp_path):
+    for name in ("20260101T000000", "20260201T000000"):
+        recorder = Recorder(tmp_path / name)
+        recorder.save_page("S", "C", 1, "https://s/c", '<ul><li>x</li></ul><script src="a.js"></script>'
+                                                     "<SCRIPT>\nmore()\n</SCRIPT>")
+        recorder.close()
+    recording = Recording.latest(tmp_path)
+    assert recording.root.name == "20260201T000000"
+    assert recording.html(recording.pages[0]) == "<ul><li>x</li></ul>"
+    with pytest.raises(FileNotFoundError):
+        Recording.latest(tmp_path / "missing")
+
+
+def test_diff_items_reports_field_changes():
+    old = [_item("a", 1.0), _item("b", 2.0, brand="X"), _item("gone", 3.0)]
+    new = [_item("a", 1.0), _item("b", 2.5, brand="Y"), _item("new", 4.0)]
+    new[0]["timestamp"] = 99  # volatile fields are ignored
+    diff = diff_items(old, new, dedupe_key)
+    assert [i["name"] for i in diff["added"]] == ["new"]
+    assert [i["name"] for i in diff["removed"]] == ["gone"]
+    assert diff["changed"] == [{"key": list(dedupe_key(new[1])), "fields": {"brand": ["X", "Y"], "price": [2.0, 2.5]}}]
+    assert summarize_diff(diff) == "vs recording: 1 added, 1 removed, 1 changed (brand 1, price 1)"
@@ -0,0 +1,157 @@
+import asyncio
+import random
+
+import pytest
+
+from resilience import (
+    BLOCKED,
+    CIRCUIT,
+    NAVIGATION,
+    SELECTOR,
+    TIMEOUT,
+    CircuitOpen,
+    CrawlError,
+    Resilience,
+    RetryConfig,
+    backoff_s,
+    check_blocked,
+    classify,
+    html_title,
+    parse_retry_config,
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class PlaywrightTimeout(Exception):
+    pass
+
+
+PlaywrightTimeout.__name__ = "TimeoutError"
+
+
+def flaky(failures):
+    """A callable raising each exception in `failures`, then returning "ok"."""
+    failures = list(failures)
+    calls = []
+
+    def fn():
+        calls.append(1)
+        if failures:
+            raise failures.pop(0)
+        return "ok"
+
+    fn.calls = calls
+    return fn
+
+
+def test_classify_and_block_detection():
+    assert classify(PlaywrightTimeout("Timeout 10000ms exceeded")) == TIMEOUT
+    assert classify(TimeoutError()) == TIMEOUT
+    assert classify(RuntimeError("net::ERR_CONNECTION_RESET")) == NAVIGATION
+    assert classify(CrawlError(SELECTOR, "no cards")) == SELECTOR
+
+    check_blocked(200, "Carrelage sol - Castorama")
+    with pytest.raises(CrawlError) as e:
+        check_blocked(429)
+    assert e.value.kind == BLOCKED
+    with pytest.raises(CrawlError):
+        check_blocked(200, html_title("<html><head><title>Just a moment...</title></head></html>"))
+
+
+def test_backoff_doubles_up_to_the_cap_with_jitter():
+    cfg = RetryConfig(backoff_ms=500, max_backoff_ms=3000, jitter=0.0)
+    assert [backoff_s(cfg, n, random.Random(1)) for n in (1, 2, 3, 4)] == [0.5, 1.0, 2.0, 3.0]
+    jittered = RetryConfig(backoff_ms=1000, jitter=0.5)
+    delays = [backoff_s(jittered, 1, random.Random(seed)) for seed in range(20)]
+    assert all(0.5 <= d <= 1.0 for d in delays)
+    assert len(set(delays)) > 1
+
+
+def test_call_retries_transient_errors_then_gives_up():
+    res = Resilience(RetryConfig(attempts=3, jitter=0.0), rng=random.Random(0))
+    slept = []
+    fn = flaky([PlaywrightTimeout("slow"), RuntimeError("net::ERR_FAILED")])
+    assert res.call("S", fn, slept.append) == "ok"
+    assert len(fn.calls) == 3
+    assert slept == [0.5, 1.0]
+
+    fn = flaky([CrawlError(BLOCKED, "HTTP 403")] * 3)
+    with pytest.raises(CrawlError):
+        res.call("S", fn, slept.append)
+    assert len(fn.calls) == 3
+
+    # Errors of other kinds are not retried
+    fn = flaky([CrawlError(SELECTOR, "no cards")])
+    with pytest.raises(CrawlError):
+        res.call("S", fn, slept.append)
+    assert len(fn.calls) == 1
+
+    report = res.report()
+    assert "S timeout 1, navigation 1, blocked 3, selector 1" in report
+    assert "retries 4, recovered 1, gave up 2" in report
+
+
+def test_circuit_opens_after_consecutive_failures_and_recovers():
+    clock = FakeClock()
+    res = Resilience(RetryConfig(attempts=1, breaker_failures=2, breaker_cooldown_s=60), clock=clock)
+    for _ in range(2):
+        with pytest.raises(RuntimeError):
+            res.call("S", flaky([RuntimeError("down")]))
+    fn = flaky([])
+    with pytest.raises(CircuitOpen):
+        res.call("S", fn)
+    assert fn.calls == []
+    # Other suppliers are unaffected
+    assert res.call("Other", flaky([])) == "ok"
+
+    clock.now += 61
+    # After the cooldown one more failure opens it again straight away
+    with pytest.raises(RuntimeError):
+        res.call("S", flaky([RuntimeError("still down")]))
+    with pytest.raises(CircuitOpen):
+        res.call("S", fn)
+    clock.now += 61
+    assert res.call("S", fn) == "ok"
+    assert res.call("S", flaky([])) == "ok"
+    assert res.breaker.trips["S"] == 2
+    assert "circuit opened 2x, 2 requests refused" in res.report()
+    assert res.rows["S"][CIRCUIT] == 2
+
+
+def test_call_async_retries():
+    res = Resilience(RetryConfig(attempts=2, jitter=0.0))
+    slept = []
+    failures = [PlaywrightTimeout("slow")]
+
+    async def fn():
+        if failures:
+            raise failures.pop()
+        return 42
+
+    async def sleep(seconds):
+        slept.append(seconds)
+
+    assert asyncio.run(res.call_async("S", fn, sleep)) == 42
+    assert slept == [0.5]
+
+
+def test_requeue_is_bounded_per_category():
+    res = Resilience(RetryConfig(requeue=2))
+    assert res.claim_requeue("S", "Sol")
+    assert res.claim_requeue("S", "Sol")
+    assert not res.claim_requeue("S", "Sol")
+    assert res.claim_requeue("S", "Mur")
+    assert res.rows["S"]["requeued"] == 3
+
+
+def test_parse_retry_config():
+    cfg = parse_retry_config({"attempts": "5", "jitter": 0.25, "breaker_cooldown_s": 30})
+    assert (cfg.attempts, cfg.jitter, cfg.breaker_cooldown_s, cfg.requeue) == (5, 0.25, 30.0, 1)
+    assert parse_retry_config(None) == RetryConfig()
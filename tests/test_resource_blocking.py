@@ -0,0 +1,67 @@
+import pytest
+
+from resource_blocking import (
+    BlockingStats,
+    TYPICAL_BYTES,
+    host_matches,
+    parse_blocking_config,
+    registrable_domain,
+    should_block,
+)
+
+
+@pytest.fixture
+def blocking_cfg():
+    return parse_blocking_config({
+        "resource_types": ["Image", "font"],
+        "deny_domains": ["doubleclick.net"],
+        "allow_domains": ["media.castorama.fr"],
+    })
+
+
+def test_parse_blocking_config_defaults():
+    cfg = parse_blocking_config(None)
+    assert not cfg.enabled
+    assert cfg.resource_types == []
+
+
+def test_host_matches_subdomains_only():
+    assert host_matches("ad.doubleclick.net", ["doubleclick.net"])
+    assert host_matches("doubleclick.net", ["doubleclick.net"])
+    assert not host_matches("notdoubleclick.net", ["doubleclick.net"])
+
+
+def test_registrable_domain():
+    assert registrable_domain("https://www.castorama.fr") == "castorama.fr"
+    assert registrable_domain("http://localhost:8000/x") == "localhost"
+
+
+@pytest.mark.parametrize("url,resource_type,expected", [
+    ("https://www.castorama.fr/", "document", None),
+    ("https://www.castorama.fr/logo.png", "image", "resource_type"),
+    ("https://media.castorama.fr/x.woff2", "font", "resource_type"),
+    ("https://ad.doubleclick.net/pixel.js", "script", "deny_domain"),
+    ("https://api.castorama.fr/search", "fetch", None),
+    ("https://media.castorama.fr/app.js", "script", None),
+    ("https://cdn.tracker.io/t.js", "script", "third_party"),
+    ("data:image/png;base64,AAAA", "image", None),
+])
+def test_should_block(blocking_cfg, url, resource_type, expected):
+    assert should_block(blocking_cfg, url, resource_type, "castorama.fr") == expected
+
+
+def test_blocking_stats_summary():
+    stats = BlockingStats()
+    stats.record_blocked("image", "resource_type")
+    stats.record_blocked("image", "resource_type")
+    stats.record_blocked("script", "deny_domain")
+    stats.record_response("1500")
+    stats.record_response(None)
+
+    summary = stats.summary()
+    assert summary["blocked_requests"] == 3
+    assert summary["blocked_by_type"] == {"image": 2, "script": 1}
+    assert summary["blocked_by_reason"] == {"resource_type": 2, "deny_domain": 1}
+    assert summary["bytes_saved_est"] == 2 * TYPICAL_BYTES["image"] + TYPICAL_BYTES["script"]
+    assert summary["bytes_received"] == 1500
+    assert "Blocked 3 requests" in stats.report()
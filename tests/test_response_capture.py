@@ -0,0 +1,74 @@
+from response_capture import (
+    ResponseCollector,
+    SourceStats,
+    dig,
+    parse_capture_config,
+    rows_from_payload,
+)
+
+PAYLOAD = {
+    "data": {
+        "products": [
+            {"title": "Perceuse 18V", "url": "/p/perceuse", "price": {"amount": 89.9, "currency": "€"},
+             "images": [{"url": "https://cdn.example.com/p.jpg"}]},
+            {"title": "Scie", "url": "/p/scie", "price": {"amount": "12,50 €"}, "images": []},
+            "not-a-product",
+        ]
+    }
+}
+
+
+def capture_cfg():
+    return parse_capture_config({
+        "url_patterns": ["*/api/*/search*"],
+        "items_path": "data.products",
+        "fields": {
+            "name": "title",
+            "url": "url",
+            "price": "price.amount",
+            "currency": "price.currency",
+            "image_url": "images.0.url",
+            "ignored": "nope",
+        },
+    })
+
+
+def test_parse_capture_config():
+    assert parse_capture_config(None) is None
+    assert parse_capture_config({"url_patterns": []}) is None
+    cfg = capture_cfg()
+    assert "ignored" not in cfg.fields
+    assert cfg.matches("https://www.manomano.fr/api/v2/search?page=2")
+    assert not cfg.matches("https://www.manomano.fr/recherche/produits")
+
+
+def test_dig():
+    assert dig(PAYLOAD, "data.products.0.images.0.url") == "https://cdn.example.com/p.jpg"
+    assert dig(PAYLOAD, "data.products.1.images.0.url") is None
+    assert dig(PAYLOAD, "data.missing.path") is None
+    assert dig(PAYLOAD, "") is PAYLOAD
+
+
+def test_rows_from_payload():
+    rows = rows_from_payload(PAYLOAD, capture_cfg())
+    assert len(rows) == 2
+    assert rows[0]["name"] == "Perceuse 18V"
+    assert rows[0]["price"] == 89.9
+    assert rows[1]["image_url"] is None
+    assert rows_from_payload({"data": {}}, capture_cfg()) == []
+
+
+def test_collector_drain_empties_buffer():
+    collector = ResponseCollector(capture_cfg())
+    collector.add_payload(PAYLOAD)
+    assert len(collector.drain()) == 2
+    assert collector.drain() == []
+    assert collector.responses == 1
+
+
+def test_source_stats_report():
+    stats = SourceStats()
+    stats.record("ManoMano", "network", 3)
+    stats.record("ManoMano", "dom")
+    assert stats.counts == {"ManoMano": {"network": 3, "dom": 1}}
+    assert stats.report() == "Item sources: ManoMano dom=1/network=3"
@@ -10,6 +10,9 @@ from http.server import HTTPServer, SimpleHTTPRequestHandler
 import pytest
 from playwright.sync_api import sync_playwright, Page
 
+from http_fetch import extract_static, parse_html
+from recording import Recorder, Recording
+from selector_stats import SelectorStats
 from scraper import (
     parse_price_with_currency,
     resolve_url,
@@ -17,12 +20,37 @@ from scraper import (
     now_ts,
     first_text,
     first_attr,
+    compile_selector,
+    item_from_raw,
+    parse_extraction_config,
+    parse_consent_config,
+    DEFAULT_CONSENT_SELECTORS,
+    load_config,
+    CONFIG_PATH,
+    GENERIC_PLAN,
+    SELF,
+    item_from_capture,
+    pick_srcset_candidate,
+    extract_cards_bulk,
+    SEEN_MARKER,
+    CategoryConfig,
+    ScraperConfig,
+    SupplierConfig,
+    SupplierScheduler,
+    CrawlSession,
+    plan_work_units,
+    retry_after_setup_failure,
+    page_url,
+    replay_recording,
+    unmarked,
+    extract_from_card,
+    scrape_category,
     # Temporarily remove problematic imports
-    # extract_from_card,
-    # load_config,
     # scrape_all,
-    # scrape_category,
 )
+from checkpoint import CheckpointStore
+from readiness import ReadinessConfig
+from resilience import Resilience, RetryConfig
 
 
 @pytest.fixture
@@ -267,4 +295,350 @@ def test_first_attr_function(page):
     assert first_attr(page, [".non-existent"], "href") == ""
     
     # Test with multiple selectors
-    assert first_attr(page, [".non-existent", ".link-1"], "href") == "https://example.com/1"
\ No newline at end of file
+    assert first_attr(page, [".non-existent", ".link-1"], "href") == "https://example.com/1"
+
+
+def test_compile_selector_translates_has_text():
+    assert compile_selector("span:has-text('€')") == {"css": "span", "has_text": "€"}
+    assert compile_selector(".price") == {"css": ".price", "has_text": ""}
+
+
+def test_pick_srcset_candidate():
+    assert pick_srcset_candidate("https://a/1.jpg 1x, https://a/2.jpg 2x") == "https://a/2.jpg"
+    assert pick_srcset_candidate("https://a/1.jpg 300w") == "https://a/1.jpg"
+
+
+def test_item_from_raw_leroy_merlin():
+    plan = next(s.plan for s in load_config(CONFIG_PATH).suppliers if s.supplier == "Leroy Merlin")
+    raw = {
+        "name": "  Peinture   blanche ",
+        "name.1": "",
+        "url": "/produits/peinture.html",
+        "price": "48€90",
+        "brand": "LUXENS",
+        "unit": "soit 19,56 € / L",
+        "image_url": "",
+        "image_url.1": [
+            "https://media.lm.fr/a.jpg?width=200",
+            "https://media.lm.fr/b.jpg?width=600",
+        ],
+        "image_url.2": "",
+    }
+    item = item_from_raw(raw, "Paint", "Leroy Merlin", "https://www.leroymerlin.fr", plan)
+    assert item["name"] == "Peinture blanche"
+    assert item["url"] == "https://www.leroymerlin.fr/produits/peinture.html"
+    assert item["currency"] == "€"
+    assert item["unit"] == "L"
+    assert item["image_url"] == "https://media.lm.fr/b.jpg"
+
+
+def test_consent_selectors_come_from_config():
+    suppliers = {s.supplier: s for s in load_config(CONFIG_PATH).suppliers}
+    assert suppliers["Castorama"].consent[0] == "#onetrust-accept-btn-handler"
+    assert suppliers["ManoMano"].consent[0] == "button[data-testid='cookie-banner-accept-button']"
+    assert parse_consent_config(None) == DEFAULT_CONSENT_SELECTORS
+    assert parse_consent_config(["#mine", "default"]) == ["#mine"] + DEFAULT_CONSENT_SELECTORS
+    assert parse_consent_config([]) == []
+
+
+def test_extraction_config_compiles_field_chains():
+    plan = parse_extraction_config({
+        "name": [{"attr": "title"}, "default"],
+        "unit": [],
+        "image_url": [{"selectors": "img", "attr": "srcset", "pick": "srcset"}],
+    })
+    assert [spec.key for spec in plan.fields["name"]] == ["name", "name.1"]
+    assert plan.fields["name"][0].selectors == [SELF]
+    assert plan.fields["price"] == GENERIC_PLAN.fields["price"]
+    item = plan.item(
+        {"name": "", "name.1": "  Tile  ", "price": "12,50 €", "image_url": "https://a/1.jpg 1x, https://a/2.jpg 2x"},
+        "Cat", "S", "https://www.example.com",
+    )
+    assert (item["name"], item["price"], item["unit"], item["image_url"]) == ("Tile", 12.5, "", "https://a/2.jpg")
+    with pytest.raises(ValueError):
+        parse_extraction_config({"colour": []})
+    with pytest.raises(ValueError):
+        parse_extraction_config({"name": [{"pick": "largest"}]})
+
+
+def test_bulk_extraction(page):
+    page.set_content("""
+    <div class="product-card">
+        <h3>Test Product 1</h3>
+        <span class="brand">Acme</span>
+        <div class="price">49,99 €</div>
+        <a href="/p/product1">Details</a>
+        <img src="https://cdn.example.com/img1.jpg">
+    </div>
+    <div class="product-card">
+        <h3>Test Product 2</h3>
+        <span>99,99 €</span>
+        <a href="/p/product2">Details</a>
+        <img data-srcset="https://cdn.example.com/img2.jpg 2x">
+    </div>
+    """)
+    cards = page.locator(".product-card")
+    bulk = extract_cards_bulk(cards, "Cat", "TestSupplier", "https://www.example.com")
+    assert [i["name"] for i in bulk] == ["Test Product 1", "Test Product 2"]
+    assert [i["price"] for i in bulk] == [49.99, 99.99]
+    assert bulk[0]["brand"] == "Acme"
+    assert bulk[0]["image_url"] == "https://cdn.example.com/img1.jpg"
+    assert bulk[1]["image_url"] == "https://cdn.example.com/img2.jpg"
+    assert bulk[1]["url"] == "https://www.example.com/p/product2"
+
+
+def test_multi_attr_spec_reads_the_same_value_on_every_path(page):
+    # Selector by selector, then attribute by attribute: .a's data-y beats .b's data-x
+    plan = parse_extraction_config({"brand": [{"selectors": [".a", ".b"], "attrs": ["data-x", "data-y"]}]})
+    html = '<div class="card"><h3>Tile</h3><i class="a" data-y="A-y"></i><i class="b" data-x="B-x"></i></div>'
+    page.set_content(html)
+    cards = page.locator(".card")
+    base = "https://www.example.com"
+
+    stats = SelectorStats()
+    by_locator = extract_from_card(cards.first, "Cat", "S", base, stats, plan.for_supplier(stats, "S"))
+    (by_bulk,) = extract_cards_bulk(cards, "Cat", "S", base, plan=plan)
+    (raw,) = extract_static(parse_html(f"<html><body>{html}</body></html>"), ".card", plan.compiled())
+    by_static = plan.item(raw, "Cat", "S", base)
+    assert by_locator["brand"] == by_bulk["brand"] == by_static["brand"] == "A-y"
+    assert stats.fields["S"]["brand"]["hits"] == {".a": 1}
+
+
+def test_bulk_extraction_incremental(page):
+    page.set_content("""
+    <div id="list">
+        <div class="product-card"><h3>First</h3><a href="/p/1">x</a></div>
+    </div>
+    """)
+    cards = page.locator(".product-card")
+    first = extract_cards_bulk(cards, "Cat", "TestSupplier", "https://www.example.com", mark=SEEN_MARKER)
+    assert [i["name"] for i in first] == ["First"]
+
+    page.evaluate("""document.getElementById('list').insertAdjacentHTML(
+        'beforeend', '<div class="product-card"><h3>Second</h3><a href="/p/2">x</a></div>')""")
+    second = extract_cards_bulk(cards, "Cat", "TestSupplier", "https://www.example.com", mark=SEEN_MARKER)
+    assert [i["name"] for i in second] == ["Second"]
+
+    # A skeleton card is not stamped until its name renders
+    page.evaluate("""document.getElementById('list').insertAdjacentHTML(
+        'beforeend', '<div class="product-card" id="late"><a href="/p/3">x</a></div>')""")
+    skeleton = extract_cards_bulk(cards, "Cat", "TestSupplier", "https://www.example.com", mark=SEEN_MARKER)
+    assert [i["name"] for i in skeleton] == [""]
+    page.evaluate("document.getElementById('late').insertAdjacentHTML('afterbegin', '<h3>Third</h3>')")
+    third = extract_cards_bulk(cards, "Cat", "TestSupplier", "https://www.example.com", mark=SEEN_MARKER)
+    assert [i["name"] for i in third] == ["Third"]
+
+
+def test_unmarked_strips_seen_stamps():
+    html = f'<div class="c" {SEEN_MARKER}="1"><h3>a</h3></div><div class="c">b</div>'
+    assert unmarked(html) == '<div class="c"><h3>a</h3></div><div class="c">b</div>'
+
+
+def _config_with_categories(*counts, per_category=False):
+    suppliers = [
+        SupplierConfig(
+            supplier=f"S{i}",
+            base_url="https://www.example.com",
+            categories=[CategoryConfig(name=f"C{j}", url="https://www.example.com", card=".c", paging_mode="none")
+                        for j in range(n)],
+        )
+        for i, n in enumerate(counts)
+    ]
+    return ScraperConfig(headless=True, user_agent=None, suppliers=suppliers, per_category=per_category)
+
+
+def test_plan_work_units():
+    assert plan_work_units(_config_with_categories(2, 0, 1)) == [(0, [0, 1]), (2, [0])]
+    # Per-category units alternate between suppliers so consecutive units hit different hosts
+    assert plan_work_units(_config_with_categories(2, 1, per_category=True)) == [(0, [0]), (1, [0]), (0, [1])]
+
+
+def test_supplier_scheduler_respects_caps():
+    scheduler = SupplierScheduler([(0, [0]), (0, [1]), (1, [0])], caps=[1, 1])
+    first = scheduler.acquire()
+    second = scheduler.acquire()
+    # Supplier 0 is at its cap, so its second category waits behind supplier 1
+    assert first == (0, [0])
+    assert second == (1, [0])
+    scheduler.release(first)
+    assert scheduler.acquire() == (0, [1])
+    assert scheduler.acquire() is None
+
+
+def test_supplier_scheduler_requeue_goes_to_the_back():
+    scheduler = SupplierScheduler([(0, [0, 1]), (1, [0])], caps=[1, 1])
+    failed = scheduler.acquire()
+    scheduler.requeue((0, [1]))
+    scheduler.release(failed)
+    assert scheduler.acquire() == (1, [0])
+    assert scheduler.acquire() == (0, [1])
+    assert scheduler.acquire() is None
+
+
+def test_context_setup_failure_is_retried_once():
+    supplier = _config_with_categories(2).suppliers[0]
+    session = CrawlSession()
+    assert retry_after_setup_failure(session, supplier, [0, 1], RuntimeError("no context"))
+    assert not retry_after_setup_failure(session, supplier, [0, 1], RuntimeError("no context"))
+    assert not retry_after_setup_failure(session, supplier, [], RuntimeError("no context"))
+    assert session.resilience.summary()["S0"]["requeued"] == 1
+
+
+@pytest.mark.parametrize("url,template,n,expected", [
+    ("https://www.castorama.fr/sol", "?page={n}", 3, "https://www.castorama.fr/sol?page=3"),
+    ("https://www.leroymerlin.fr/sol?sort=asc", "&p={n}", 2, "https://www.leroymerlin.fr/sol?sort=asc&p=2"),
+    ("https://www.leroymerlin.fr/sol?sort=asc", "?p={n}", 2, "https://www.leroymerlin.fr/sol?sort=asc&p=2"),
+    ("https://www.example.com/cat", "https://www.example.com/cat/page-{n}", 4, "https://www.example.com/cat/page-4"),
+])
+def test_page_url(url, template, n, expected):
+    cat = CategoryConfig(name="C", url=url, card=".c", paging_mode="url_template", page_template=template)
+    assert page_url(cat, n) == expected
+
+
+def test_item_from_capture():
+    item = item_from_capture(
+        {"name": " Perceuse  18V ", "url": "/p/perceuse", "price": 89.9, "currency": None},
+        "Outils", "ManoMano", "https://www.manomano.fr",
+    )
+    assert item["name"] == "Perceuse 18V"
+    assert item["url"] == "https://www.manomano.fr/p/perceuse"
+    assert (item["price"], item["currency"]) == (89.9, "€")
+
+    item = item_from_capture({"name": "Scie", "price": "12,50 €"}, "Outils", "ManoMano", "https://www.manomano.fr")
+    assert (item["price"], item["currency"]) == (12.5, "€")
+
+
+def test_replay_recording_extracts_offline(tmp_path):
+    tile = (
+        '<div data-test-id="product-tile"><a href="/p/{n}" title="Carrelage {n}"></a>'
+        '<h3 data-test-id="product-title">Carrelage {n}</h3><div data-test-id="price">{n},90 €</div></div>'
+    )
+    recorder = Recorder(tmp_path)
+    # Page 2 repeats tile 2, which is deduped; its script is stripped, not run
+    recorder.save_page("Castorama", "All Products", 1, "https://www.castorama.fr/?page=1",
+                       "<html><body>" + tile.format(n=1) + tile.format(n=2) + "</body></html>")
+    recorder.save_page("Castorama", "All Products", 2, "https://www.castorama.fr/?page=2",
+                       "<html><body>" + tile.format(n=2) + tile.format(n=3)
+                       + "<script>document.body.innerHTML = ''</script></body></html>")
+    recorder.close()
+
+    items = replay_recording(load_config(CONFIG_PATH), Recording(tmp_path))
+    assert [i["name"] for i in items] == ["Carrelage 1", "Carrelage 2", "Carrelage 3"]
+    assert items[2]["url"] == "https://www.castorama.fr/p/3"
+    assert items[2]["price"] == 3.9
+
+
+# --- End-to-end paging against a local site ----------------------------------
+
+CARD = '<div class="product-card" style="height: 400px"><h3>{name}</h3><a href="/p/{slug}">x</a></div>'
+
+# Every scroll to the bottom appends three more cards, up to nine
+SCROLL_JS = """
+let shown = 3;
+window.addEventListener('scroll', () => {
+  if (shown >= 9 || innerHeight + scrollY < document.body.scrollHeight - 10) return;
+  for (let i = 0; i < 3; i++) {
+    shown += 1;
+    document.body.insertAdjacentHTML('beforeend', `CARD`.replace(/N/g, shown));
+  }
+});
+"""
+
+
+@pytest.fixture
+def listing_site(tmp_path, monkeypatch):
+    site = tmp_path / "site"
+    site.mkdir()
+    card = CARD.format(name="Item N", slug="N")
+    (site / "scroll.html").write_text(
+        "<html><body>" + "".join(card.replace("N", str(n)) for n in (1, 2, 3))
+        + "<script>" + SCROLL_JS.replace("CARD", card) + "</script></body></html>"
+    )
+    for n in range(1, 5):
+        cards = "".join(CARD.format(name=f"Page {n} item {i}", slug=f"{n}-{i}") for i in (1, 2))
+        (site / f"list{n}.html").write_text(f"<html><body>{cards}</body></html>")
+    (site / "page1.html").write_text(
+        "<html><body>" + CARD.format(name="First", slug="1") + '<a class="next-page" href="/page2.html">Next</a>'
+        + "</body></html>"
+    )
+    (site / "page2.html").write_text("<html><body>" + CARD.format(name="Second", slug="2") + "</body></html>")
+    monkeypatch.chdir(tmp_path)  # TestServer serves its cwd; give the original back afterwards
+    server = TestServer(site)
+    yield server
+    server.stop()
+
+
+def _paging_session(checkpoint=None):
+    return CrawlSession(
+        readiness=ReadinessConfig(ready_timeout_ms=3000, navigation_timeout_ms=3000, stable_ms=100),
+        resilience=Resilience(RetryConfig(attempts=1)),
+        checkpoint=checkpoint,
+    )
+
+
+def _supplier_for(server, cat):
+    return SupplierConfig(supplier="TestSupplier", base_url=server.url("/"), categories=[cat])
+
+
+def test_infinite_scroll_collects_each_card_once(page, listing_site):
+    cat = CategoryConfig(
+        name="Scroll", url=listing_site.url("/scroll.html"), card=".product-card",
+        paging_mode="infinite_scroll", scroll_steps=6, scroll_wait_ms=1000,
+    )
+    items = scrape_category(page, cat, _supplier_for(listing_site, cat), 100, session=_paging_session())
+    assert [i["name"] for i in items] == [f"Item {n}" for n in range(1, 10)]
+    assert page.locator(f"[{SEEN_MARKER}]").count() == 9
+
+
+def test_url_template_stops_at_a_failed_page_and_resumes_there(page, listing_site, tmp_path):
+    cat = CategoryConfig(
+        name="Pages", url=listing_site.url("/list1.html"), card=".product-card",
+        paging_mode="url_template", page_template="/list{n}.html", max_pages=4, parallel_pages=2,
+    )
+    supplier = _supplier_for(listing_site, cat)
+    path = tmp_path / "checkpoint.jsonl"
+    page.context.route("**/list3.html", lambda route: route.abort())
+    session = _paging_session(CheckpointStore(path))
+    try:
+        items = scrape_category(page, cat, supplier, 100, session=session)
+    finally:
+        session.checkpoint.close()
+    assert [i["name"] for i in items] == ["Page 1 item 1", "Page 1 item 2", "Page 2 item 1", "Page 2 item 2"]
+    saved = CheckpointStore(path, resume=True).progress("TestSupplier", "Pages")
+    assert (saved.page, saved.next_url, saved.done) == (2, listing_site.url("/list3.html"), False)
+
+    page.context.unroute("**/list3.html")
+    resumed = _paging_session(CheckpointStore(path, resume=True))
+    try:
+        items = scrape_category(page, cat, supplier, 100, session=resumed)
+    finally:
+        resumed.checkpoint.close()
+    assert [i["name"] for i in items] == [f"Page {n} item {i}" for n in range(1, 5) for i in (1, 2)]
+    assert CheckpointStore(path, resume=True).progress("TestSupplier", "Pages").done
+
+
+def test_pagination_resumes_after_a_mid_category_stop(page, listing_site, tmp_path):
+    cat = CategoryConfig(
+        name="Clicks", url=listing_site.url("/page1.html"), card=".product-card",
+        paging_mode="pagination", next_button=".next-page", max_pages=5,
+    )
+    supplier = _supplier_for(listing_site, cat)
+    path = tmp_path / "checkpoint.jsonl"
+    session = _paging_session(CheckpointStore(path))
+    try:
+        scrape_category(page, cat, supplier, 100, session=session)
+    finally:
+        session.checkpoint.close()
+    # Keep the header and the first page's record, as if the run died on page 2
+    path.write_text("\n".join(path.read_text(encoding="utf-8").splitlines()[:2]) + "\n", encoding="utf-8")
+    saved = CheckpointStore(path, resume=True).progress("TestSupplier", "Clicks")
+    assert (saved.page, saved.next_url) == (1, listing_site.url("/page2.html"))
+
+    resumed = _paging_session(CheckpointStore(path, resume=True))
+    try:
+        items = scrape_category(page, cat, supplier, 100, session=resumed)
+    finally:
+        resumed.checkpoint.close()
+    assert [i["name"] for i in items] == ["First", "Second"]
+    assert resumed.sources.counts == {"TestSupplier": {"dom": 1}}
+    assert CheckpointStore(path, resume=True).progress("TestSupplier", "Clicks").done
@@ -0,0 +1,63 @@
+import asyncio
+
+from playwright.async_api import async_playwright
+
+from scraper_async import (
+    extract_cards_bulk_async,
+    extract_from_card_async,
+    first_attr_async,
+    first_text_async,
+)
+
+CARDS_HTML = """
+<div class="product-card">
+    <h3>Test Product 1</h3>
+    <div class="price">49,99 €</div>
+    <a href="/p/product1">Details</a>
+    <img src="https://cdn.example.com/img1.jpg">
+</div>
+<div class="product-card">
+    <h3>Test Product 2</h3>
+    <span>99,99 €</span>
+    <a href="/p/product2">Details</a>
+</div>
+"""
+
+
+def run_with_page(html, fn):
+    async def runner():
+        async with async_playwright() as p:
+            browser = await p.chromium.launch()
+            page = await browser.new_page()
+            await page.set_content(html)
+            try:
+                return await fn(page)
+            finally:
+                await browser.close()
+
+    return asyncio.run(runner())
+
+
+def test_first_text_and_attr_async():
+    async def check(page):
+        assert await first_text_async(page, [".missing", "h3"]) == "Test Product 1"
+        assert await first_attr_async(page, [".missing", "a"], "href") == "/p/product1"
+        assert await first_attr_async(page, [".missing"], "href") == ""
+
+    run_with_page(CARDS_HTML, check)
+
+
+def test_locator_and_bulk_paths_agree_async():
+    async def extract(page):
+        cards = page.locator(".product-card")
+        per_card = [
+            await extract_from_card_async(cards.nth(i), "Cat", "TestSupplier", "https://www.example.com")
+            for i in range(await cards.count())
+        ]
+        bulk = await extract_cards_bulk_async(cards, "Cat", "TestSupplier", "https://www.example.com")
+        return per_card, bulk
+
+    per_card, bulk = run_with_page(CARDS_HTML, extract)
+    strip = lambda rows: [{k: v for k, v in r.items() if k != "timestamp"} for r in rows]
+    assert strip(per_card) == strip(bulk)
+    assert [r["price"] for r in bulk] == [49.99, 99.99]
@@ -0,0 +1,79 @@
+from search import SearchIndex, fold, tokenize
+
+
+def item(name, brand="", category="Jardin", price=10.0, url=None):
+    return {
+        "supplier": "Castorama", "category": category, "name": name, "price": price, "currency": "€",
+        "url": url or f"https://example.com/{name}", "brand": brand, "unit": None, "image_url": None,
+        "timestamp": 1, "source": "dom",
+    }
+
+
+ITEMS = [
+    item("Abri de jardin Darwin 68 en résine vert kaki 4,63 m² Keter", brand="Keter"),
+    item("Abri de jardin en bois 6 m²", brand="Forest Style"),
+    item("Carrelage sol grès cérame 30 x 30 cm gris", category="Carrelage"),
+    item("Carrelage mural faïence blanc 20x60cm", category="Carrelage"),
+    item("Cœur de chêne massif", category="Menuiserie"),
+]
+
+
+def index():
+    idx = SearchIndex()
+    idx.sync(ITEMS)
+    return idx
+
+
+def test_fold_and_dimension_tokens():
+    assert fold("Résine Cœur ÉTÉ") == "resine coeur ete"
+    assert tokenize("4,63 m²") == ["4.63m2", "4.63"]
+    assert tokenize("4,63 m²", query=True) == ["4.63m2"]
+    assert tokenize("30 x 30 cm")[0] == tokenize("30x30cm")[0] == "30x30cm"
+    assert tokenize("Abri de jardin en résine") == ["abri", "jardin", "resine"]
+
+
+def test_bm25_prefers_rarer_and_brand_terms():
+    idx = index()
+    total, hits = idx.search("abri resine")
+    assert total == 1 and "Darwin" in hits[0][1]["name"]
+    total, hits = idx.search("keter")
+    assert total == 1 and hits[0][1]["brand"] == "Keter"
+    total, hits = idx.search("carrelage gris")
+    assert total == 1 and "grès" in hits[0][1]["name"]
+    total, hits = idx.search("abri")
+    assert total == 2 and hits[0][0] >= hits[1][0]
+
+
+def test_dimensions_prefix_and_typos():
+    idx = index()
+    assert idx.search("4,63 m2")[0] == 1
+    assert idx.search("30x30 cm")[0] == 1
+    assert idx.search("20x60")[0] == 1
+    assert idx.search("carrel")[0] == 2  # last word matches as a prefix
+    assert idx.search("coeur chene")[0] == 1
+    total, hits = idx.search("carrelge faience")
+    assert total == 1 and "faïence" in hits[0][1]["name"]
+    assert idx.search("zzzz") == (0, [])
+
+
+def test_pagination_is_stable():
+    idx = index()
+    assert idx.search("abri carrelage")[0] == 0  # every word must match
+    total, first = idx.search("jardin", limit=1)
+    _, second = idx.search("jardin", limit=1, offset=1)
+    assert total == 2 and first[0][1] is not second[0][1]
+
+
+def test_sync_is_incremental():
+    idx = SearchIndex()
+    assert idx.sync(ITEMS) == {"added": 5, "updated": 0, "removed": 0}
+    changed = [dict(i) for i in ITEMS[1:]]
+    changed[0]["price"] = 99.0  # text unchanged: not re-indexed
+    changed[1]["brand"] = "Cerabati"
+    changed[2]["name"] += " promo"  # the name is part of the key: a new product
+    assert idx.sync(changed) == {"added": 1, "updated": 1, "removed": 2}
+    assert len(idx) == 4
+    assert idx.search("darwin")[0] == 0
+    assert idx.search("cerabati")[0] == 1
+    assert idx.search("promo")[0] == 1
+    assert idx.search("bois")[1][0][1]["price"] == 99.0
@@ -0,0 +1,94 @@
+from http_fetch import extract_static, parse_html
+from scraper import GENERIC_PLAN, NAME_HINTS, PRICE_HINTS, parse_extraction_config
+from selector_stats import HITS_KEY, SelectorStats
+
+PAGE = """<html><body>
+<div class="card"><span class="title">Tile</span><span class="price">12 €</span></div>
+<div class="card"><span class="title">Paint</span></div>
+</body></html>"""
+
+
+def test_register_and_dead_selectors():
+    stats = SelectorStats()
+    stats.register("S", "name", ["a", "b", "c", "d"])
+    for css in ["c", "c", "d"]:
+        stats.record("S", "name", css)
+    stats.record("S", "name", None)
+    assert stats.dead("S", "name") == ["a", "b"]
+    assert stats.fields["S"]["name"]["misses"] == 1
+    assert stats.dead("Other", "name") == []
+
+    # Only a run's first registration of a field counts
+    stats.register("S", "name", ["x"])
+    assert stats.fields["S"]["name"]["selectors"] == ["a", "b", "c", "d"]
+
+
+def test_static_extraction_records_winners_and_keeps_config_order():
+    stats = SelectorStats()
+    plan = GENERIC_PLAN.compiled(stats, "S")
+    raws = extract_static(parse_html(PAGE), ".card", plan)
+    assert HITS_KEY in raws[0]
+    stats.record_raws("S", plan, raws)
+    assert HITS_KEY not in raws[0] and raws[0]["name"] == "Tile"
+
+    entry = stats.fields["S"]["price"]
+    assert entry["hits"] == {".price": 1} and entry["misses"] == 1
+    assert stats.fields["S"]["name"]["hits"] == {".title": 2}
+
+    # Fallback lists are in priority order, so winners are not moved forward
+    again = GENERIC_PLAN.compiled(stats, "S")
+    name = next(f for f in again if f["key"] == "name")
+    assert [s["source"] for s in name["selectors"]] == NAME_HINTS
+    price = next(f for f in again if f["key"] == "price")
+    assert [s["source"] for s in price["selectors"]] == PRICE_HINTS
+
+
+def test_generic_price_never_overtakes_a_specific_one():
+    stats = SelectorStats()
+    plan = GENERIC_PLAN.compiled(stats, "S")
+    cards = "".join(f'<div class="card"><h3>p{i}</h3><span>{i} €</span></div>' for i in range(5))
+    stats.record_raws("S", plan, extract_static(parse_html(f"<html><body>{cards}</body></html>"), ".card", plan))
+    crossed = (
+        '<div class="card"><h3>sale</h3><span>20 €</span>'
+        '<div class="m-price -main"><div class="m-price__line">15 €</div></div></div>'
+    )
+    plan = GENERIC_PLAN.compiled(stats, "S")
+    (raw,) = extract_static(parse_html(f"<html><body>{crossed}</body></html>"), ".card", plan)
+    assert raw["price"] == "15 €"
+
+
+def test_adaptive_field_tries_winners_first_and_still_falls_back():
+    plan = parse_extraction_config({"brand": [{"selectors": [".a", ".b"], "adaptive": True}]})
+    stats = SelectorStats()
+    cards = '<div class="card"><span class="b">B</span></div>' * 3
+    compiled = plan.compiled(stats, "S")
+    stats.record_raws("S", compiled, extract_static(parse_html(f"<html><body>{cards}</body></html>"), ".card", compiled))
+
+    ranked = plan.compiled(stats, "S")
+    brand = next(f for f in ranked if f["key"] == "brand")
+    assert [s["source"] for s in brand["selectors"]] == [".b", ".a"]
+    name = next(f for f in ranked if f["key"] == "name")
+    assert [s["source"] for s in name["selectors"]] == NAME_HINTS
+
+    (raw,) = extract_static(parse_html('<html><body><div class="card"><i class="a">A</i></div></body></html>'),
+                            ".card", ranked)
+    assert raw["brand"] == "A"
+    assert plan.for_supplier(None, "S") is plan and GENERIC_PLAN.for_supplier(stats, "S") is GENERIC_PLAN
+
+
+def test_stats_persist_and_report(tmp_path):
+    path = tmp_path / "selector_stats.json"
+    stats = SelectorStats(path)
+    stats.register("S", "name", ["h3", ".title"])
+    stats.record("S", "name", ".title")
+    stats.save()
+
+    loaded = SelectorStats(path)
+    assert loaded.fields["S"]["name"]["hits"] == {".title": 1}
+    report = loaded.report()
+    assert "S/name: 1 hits, 0 misses" in report and "1 of 2 selectors never matched" in report
+    assert "h3  dead" in loaded.report(full=True)
+
+    path.write_text("{not json", encoding="utf-8")
+    assert SelectorStats(path).fields == {}
+    assert SelectorStats().report() == "Selector hits: none"
@@ -0,0 +1,70 @@
+import gzip
+import json
+
+from scraper import dedupe_key
+from snapshots import SnapshotStore, apply_delta, compute_delta, summarize, version_id
+
+
+def item(name, price, **extra):
+    row = {
+        "supplier": "S", "category": "C", "name": name, "price": price, "currency": "€",
+        "url": f"https://s.example/{name}", "brand": "", "unit": None, "image_url": None,
+        "timestamp": 1, "source": "dom",
+    }
+    row.update(extra)
+    return row
+
+
+def content(rows):
+    return {dedupe_key(r): {k: v for k, v in r.items() if k not in ("timestamp", "source")} for r in rows}
+
+
+def test_compute_and_apply_delta():
+    old = [item("a", 10.0), item("b", 5.0), item("c", 1.0)]
+    new = [item("a", 12.0, timestamp=2), item("b", 5.0, brand="Acme"), item("c", 1.0, source="network"), item("d", 3.0)]
+    delta = compute_delta(old, new, dedupe_key)
+
+    assert [i["name"] for i in delta["added"]] == ["d"]
+    assert delta["removed"] == []
+    assert [(c["old_price"], c["new_price"]) for c in delta["price_changed"]] == [(10.0, 12.0)]
+    assert [i["name"] for i in delta["updated"]] == ["b"]  # "c" only changed a volatile field
+    assert content(apply_delta(old, delta, dedupe_key)) == content(new)
+
+    gone = compute_delta(new, new[:1], dedupe_key)
+    assert [i["name"] for i in gone["removed"]] == ["b", "c", "d"]
+
+
+def test_store_writes_deltas_and_prunes_to_keyframes(tmp_path):
+    store = SnapshotStore(tmp_path, key=dedupe_key, keyframe_every=2)
+    runs = [
+        [item("a", 10.0), item("b", 5.0)],
+        [item("a", 11.0), item("b", 5.0), item("c", 2.0)],
+        [item("a", 11.0), item("c", 2.5)],
+        [item("a", 9.0), item("c", 2.5), item("c", 2.5), item("d", 1.0)],
+    ]
+    entries = [store.write(rows, scraped_at=1_700_000_000 + i) for i, rows in enumerate(runs)]
+
+    assert entries[0]["base"] is None and "delta" not in entries[0]
+    assert (entries[1]["added"], entries[1]["price_changed"]) == (1, 1)
+    assert (entries[2]["removed"], entries[2]["price_changed"]) == (1, 1)
+    assert entries[3]["count"] == 3  # duplicate key stored once
+
+    versions = store.versions()
+    assert [bool(v["snapshot"]) for v in versions] == [True, False, True, True]
+    assert len(list((tmp_path / "snapshots").iterdir())) == 3
+    for entry, rows in zip(entries, runs):
+        assert content(store.load(entry["version"])) == content(rows)
+
+    with gzip.open(tmp_path / entries[2]["delta"], "rt", encoding="utf-8") as fh:
+        assert json.load(fh)["base"] == entries[1]["version"]
+    assert [i["name"] for i in store.delta(entries[2]["version"])["removed"]] == ["b"]
+    assert "first snapshot" in summarize(entries[0])
+    assert "+1 -0, 1 price changes" in summarize(entries[1])
+
+
+def test_same_second_versions_get_a_suffix(tmp_path):
+    store = SnapshotStore(tmp_path, key=dedupe_key)
+    first = store.write([item("a", 1.0)], scraped_at=0)
+    second = store.write([item("a", 1.0)], scraped_at=0)
+    assert first["version"] == version_id(0) == "19700101T000000Z"
+    assert second["version"] == "19700101T000000Z-2"
@@ -0,0 +1,133 @@
+import json
+import sqlite3
+
+from storage import JsonlSink, SqliteSink, iter_jsonl, iter_sqlite_items, materialize_json
+
+
+def item(supplier, category, name):
+    return {
+        "supplier": supplier,
+        "category": category,
+        "name": name,
+        "price": 12.5,
+        "currency": "€",
+        "image_url": None,
+        "features": ["Épaisseur 10 mm", "Lot de 2"],
+    }
+
+
+def test_sink_batches_and_flushes(tmp_path):
+    path = tmp_path / "out.jsonl"
+    sink = JsonlSink(path, batch_size=2)
+    sink.write(item("A", "x", "one"))
+    assert path.read_text(encoding="utf-8") == ""
+    sink.write(item("A", "x", "two"))
+    assert len(path.read_text(encoding="utf-8").splitlines()) == 2
+    sink.write(item("A", "x", "three"))
+    sink.flush()
+    assert [r["name"] for r in iter_jsonl(path)] == ["one", "two", "three"]
+    sink.close()
+    sink.close()
+    assert sink.count == 3
+
+
+def test_sink_append_keeps_existing_lines(tmp_path):
+    path = tmp_path / "out.jsonl"
+    first = JsonlSink(path)
+    first.write(item("A", "x", "one"))
+    first.close()
+    again = JsonlSink(path, append=True)
+    again.write(item("A", "x", "two"))
+    again.close()
+    assert [r["name"] for r in iter_jsonl(path)] == ["one", "two"]
+
+
+def test_iter_jsonl_skips_torn_last_line(tmp_path):
+    path = tmp_path / "out.jsonl"
+    path.write_text(json.dumps({"name": "ok"}) + "\n\n" + '{"name": "tor', encoding="utf-8")
+    assert list(iter_jsonl(path)) == [{"name": "ok"}]
+
+
+def test_materialize_matches_write_json_layout(tmp_path):
+    rows = [item("B", "y", "b1"), item("A", "x", "a1"), item("A", "z", "a2"), item("B", "y", "b2")]
+    path = tmp_path / "out.jsonl"
+    sink = JsonlSink(path)
+    for row in rows:
+        sink.write(row)
+    sink.close()
+
+    out = tmp_path / "materials.json"
+    order = [("A", "x"), ("B", "y")]
+    materialize_json(path, out, order=order, scraped_at=123)
+
+    expected_rows = [rows[1], rows[0], rows[3], rows[2]]
+    payload = {"scraped_at": 123, "count": 4, "items": expected_rows}
+    assert out.read_text(encoding="utf-8") == json.dumps(payload, indent=2, ensure_ascii=False)
+
+
+def test_materialize_without_order_and_empty(tmp_path):
+    path = tmp_path / "out.jsonl"
+    out = tmp_path / "materials.json"
+    JsonlSink(path).close()
+    materialize_json(path, out, scraped_at=1)
+    assert out.read_text(encoding="utf-8") == json.dumps({"scraped_at": 1, "count": 0, "items": []}, indent=2)
+
+    sink = JsonlSink(path)
+    sink.write(item("A", "x", "only"))
+    sink.close()
+    materialize_json(path, out, scraped_at=1)
+    expected = {"scraped_at": 1, "count": 1, "items": [item("A", "x", "only")]}
+    assert out.read_text(encoding="utf-8") == json.dumps(expected, indent=2, ensure_ascii=False)
+
+
+def product(name, price, timestamp, category="Carrelage", **extra):
+    row = {
+        "supplier": "Castorama",
+        "category": category,
+        "name": name,
+        "price": price,
+        "currency": "€",
+        "url": f"https://www.castorama.fr/{name}",
+        "brand": "Acme",
+        "unit": None,
+        "image_url": None,
+        "timestamp": timestamp,
+        "source": "dom",
+    }
+    row.update(extra)
+    return row
+
+
+def test_sqlite_sink_upserts_and_keeps_price_history(tmp_path):
+    path = tmp_path / "materials.db"
+    sink = SqliteSink(path, batch_size=2)
+    sink.write(product("tile", 19.9, 100))
+    sink.write(product("tile", 19.9, 100))  # same observation twice
+    sink.write(product("paint", 35.0, 100, category="Peinture", unit="m²"))
+    sink.close()
+    sink.close()
+
+    again = SqliteSink(path)
+    again.write(product("tile", 17.5, 200))
+    again.close()
+
+    items = list(iter_sqlite_items(path))
+    assert [(i["name"], i["price"], i["unit"], i["timestamp"]) for i in items] == [
+        ("tile", 17.5, "", 200), ("paint", 35.0, "m²", 100),
+    ]
+    assert [i["name"] for i in iter_sqlite_items(path, seen_since=150)] == ["tile"]
+
+    conn = sqlite3.connect(str(path))
+    try:
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        assert conn.execute("SELECT COUNT(*) FROM suppliers").fetchone()[0] == 1
+        assert conn.execute("SELECT COUNT(*) FROM categories").fetchone()[0] == 2
+        history = conn.execute(
+            "SELECT o.price FROM price_observations o JOIN products p ON p.id = o.product_id "
+            "WHERE p.name = 'tile' ORDER BY o.observed_at"
+        ).fetchall()
+        assert history == [(19.9,), (17.5,)]
+        plan = conn.execute("EXPLAIN QUERY PLAN SELECT price FROM products WHERE url = ?", ("x",)).fetchall()
+        assert "idx_products_url" in " ".join(str(step[-1]) for step in plan)
+    finally:
+        conn.close()